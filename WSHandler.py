@@ -1,24 +1,105 @@
+import inspect
 import json
-from typing import Dict, Callable
+from typing import Dict, Callable, Tuple, Any, List, Optional, Set
 
 import tornado.websocket
-from tornado.ioloop import PeriodicCallback
+from tornado.ioloop import IOLoop, PeriodicCallback
 
 import programs
 import network_topology
 import custom_config
 import simulation
 import dict_keys
+import constants
 import ws_events
+import metrics
+import ws_instrumentation
+import reconciliation
 
 
 def set_custom_config_handler(data, send_func):
     old_custom_config = custom_config.get_custom_config()
     custom_config.set_custom_config(data)
     prev_self_connected_nodes = old_custom_config[dict_keys.CUSTOM_CONFIG_SELF_CONNECTED_NODES]
-    if prev_self_connected_nodes != data[dict_keys.CUSTOM_CONFIG_SELF_CONNECTED_NODES]:
-        network_topology.update_unpacked_topology_with_self_connected_nodes()
-        send_func(ws_events.UNPACKED_NETWORK_TOPOLOGY, network_topology.get_unpacked_network_topology())
+    self_connected_nodes = data[dict_keys.CUSTOM_CONFIG_SELF_CONNECTED_NODES]
+    if prev_self_connected_nodes != self_connected_nodes:
+        changed_nids = network_topology.update_unpacked_topology_with_self_connected_nodes(self_connected_nodes)
+        send_func(ws_events.UNPACKED_NETWORK_TOPOLOGY_SELF_CONNECTIONS,
+                  {dict_keys.CUSTOM_CONFIG_SELF_CONNECTED_NODES: self_connected_nodes,
+                   dict_keys.NETWORK_TOPOLOGY_CHANGED_NIDS: changed_nids})
+
+
+# Simulation events carry a simulation id in their data, or wrap data that is not a dict as {simulationId, data}.
+# Responses for simulations other than the default are wrapped in the same way, so clients of the default simulation
+# see no change.
+def unwrap_simulation_request(data) -> Tuple[str, Any]:
+    if isinstance(data, dict) and dict_keys.SIMULATION_ID in data:
+        return simulation.validate_simulation_id(data[dict_keys.SIMULATION_ID]), data.get(dict_keys.WS_DATA, data)
+    return constants.DEFAULT_SIMULATION_ID, data
+
+
+def make_simulation_send_func(simulation_id: str, send_func: Callable) -> Callable:
+    if simulation_id == constants.DEFAULT_SIMULATION_ID:
+        return send_func
+    return lambda event, data: send_func(event, {dict_keys.SIMULATION_ID: simulation_id, dict_keys.WS_DATA: data})
+
+
+def simulation_handler(handler: Callable[[str, Any, Callable], Any]) -> Callable:
+    def handle_simulation_event(data, send_func):
+        simulation_id, data = unwrap_simulation_request(data)
+        return handler(simulation_id, data, make_simulation_send_func(simulation_id, send_func))
+
+    return handle_simulation_event
+
+
+# Startup reconciliation runs after the server starts listening, so events that would race its repairs are refused
+def refused_while_reconciling(handler: Callable) -> Callable:
+    def handle_unless_reconciling(data, send_func):
+        reconciliation.check_not_reconciling()
+        return handler(data, send_func)
+
+    return handle_unless_reconciling
+
+
+# Pushes changed connection parameters to the nodes of running simulations through their live config
+def publish_connection_parameters(send_func: Callable, nids: Optional[Set[str]] = None):
+    for simulation_id, changed_nids in simulation.publish_connection_parameters_to_active_simulations(nids).items():
+        make_simulation_send_func(simulation_id, send_func)(ws_events.CONNECTION_PARAMETERS_PUBLISHED,
+                                                            {dict_keys.NETWORK_TOPOLOGY_CHANGED_NIDS: changed_nids})
+
+
+def modify_connection_parameters_handler(data, send_func):
+    network_topology.modify_connection_parameters(data[dict_keys.MODIFY_NODE_CONNECTIONS_FROM_NID],
+                                                  data[dict_keys.MODIFY_NODE_CONNECTIONS_TO_NID],
+                                                  data[dict_keys.MODIFY_NODE_CONNECTIONS_PARAMETERS])
+    publish_connection_parameters(send_func, {data[dict_keys.MODIFY_NODE_CONNECTIONS_FROM_NID],
+                                              data[dict_keys.MODIFY_NODE_CONNECTIONS_TO_NID]})
+
+
+def patch_connection_parameters_handler(data, send_func):
+    number_applied, skipped_connections = network_topology.patch_connection_parameters(
+        *network_topology.get_connection_parameters_patch_from_request(data))
+    send_func(ws_events.CONNECTION_PARAMETERS_PATCHED,
+              {dict_keys.PATCH_CONNECTION_PARAMETERS_NUMBER_APPLIED: number_applied,
+               dict_keys.PATCH_CONNECTION_PARAMETERS_SKIPPED_CONNECTIONS: skipped_connections})
+    if number_applied > 0:
+        publish_connection_parameters(send_func)
+
+
+def set_default_connection_parameters_handler(data, send_func):
+    network_topology.set_default_connection_parameters(data[dict_keys.MODIFY_NODE_CONNECTIONS_PARAMETERS],
+                                                       data.get(dict_keys.MODIFY_NODE_CONNECTIONS_GROUP))
+    publish_connection_parameters(send_func)
+
+
+def start_ws_event_profiling(event: str, invocations: int):
+    ws_instrumentation.start_profiling(event, invocations, handlers)
+
+
+def start_ws_event_profiling_handler(data, send_func):
+    data = data if isinstance(data, dict) else {}
+    start_ws_event_profiling(data.get(dict_keys.PROFILING_EVENT), data.get(dict_keys.PROFILING_INVOCATIONS))
+    send_func(ws_events.WS_EVENT_PROFILES, ws_instrumentation.get_profiles())
 
 
 handlers: Dict[str, Callable] = {
@@ -36,37 +117,68 @@ handlers: Dict[str, Callable] = {
     ws_events.GET_UNPACKED_NETWORK_TOPOLOGY: (
         lambda _, send_func: send_func(ws_events.UNPACKED_NETWORK_TOPOLOGY,
                                        network_topology.get_unpacked_network_topology())),
+    ws_events.GET_UNPACKED_NETWORK_TOPOLOGY_PAGE: (
+        lambda data, send_func: send_func(ws_events.UNPACKED_NETWORK_TOPOLOGY_PAGE,
+                                          network_topology.get_unpacked_network_topology_page_from_request(data))),
     ws_events.GET_CONNECTION_PARAMETERS:
-        (lambda _, send_func: send_func(ws_events.CONNECTION_PARAMETERS, network_topology.get_connection_parameters())),
-    ws_events.MODIFY_CONNECTION_PARAMETERS:
-        (lambda data, _: network_topology.modify_connection_parameters(
-            data[dict_keys.MODIFY_NODE_CONNECTIONS_FROM_NID],
-            data[dict_keys.MODIFY_NODE_CONNECTIONS_TO_NID],
-            data[dict_keys.MODIFY_NODE_CONNECTIONS_PARAMETERS])),
+        (lambda _, send_func: send_func(ws_events.CONNECTION_PARAMETERS,
+                                        network_topology.get_expanded_connection_parameters())),
+    ws_events.GET_SPARSE_CONNECTION_PARAMETERS:
+        (lambda _, send_func: send_func(ws_events.SPARSE_CONNECTION_PARAMETERS,
+                                        network_topology.get_connection_parameters())),
+    ws_events.MODIFY_CONNECTION_PARAMETERS: modify_connection_parameters_handler,
+    ws_events.PATCH_CONNECTION_PARAMETERS: patch_connection_parameters_handler,
+    ws_events.SET_DEFAULT_CONNECTION_PARAMETERS: set_default_connection_parameters_handler,
     ws_events.SET_CUSTOM_CONFIG: set_custom_config_handler,
     ws_events.GET_CUSTOM_CONFIG:
         (lambda _, send_func: send_func(ws_events.CUSTOM_CONFIG, custom_config.get_custom_config())),
-    ws_events.SET_UP_SIMULATION:
-        (lambda _, send_func: simulation.set_up_simulation(send_func)),
-    ws_events.STOP_AND_RESET_SIMULATION:
-        (lambda _, send_func: simulation.stop_and_reset_simulation(send_func)),
-    ws_events.GET_SIMULATION_NODES:
-        (lambda _, send_func: send_func(ws_events.SIMULATION_NODES, simulation.get_simulation_nodes())),
-    ws_events.GET_SIMULATION_STATE:
-        (lambda _, send_func: send_func(ws_events.SIMULATION_STATE, simulation.get_simulation_state())),
-    ws_events.PERFORM_NODE_ACTION:
-        (lambda data, send_func: simulation.perform_node_action(data)),
-    ws_events.STREAM_NODE_LOGS:
-        (lambda data, _: simulation.stream_node_logs(data)),
-    ws_events.GET_CURRENT_SIMULATION_HASH: (
-        lambda _, send_func: send_func(ws_events.CURRENT_SIMULATION_HASH, simulation.get_current_simulation_hash())),
-    ws_events.SET_CURRENT_SIMULATION_HASH: (
-        lambda data, _: simulation.store_simulation_current_simulation_hash(data))
+    ws_events.SET_UP_SIMULATION: refused_while_reconciling(simulation_handler(
+        lambda simulation_id, _, send_func: simulation.set_up_simulation(send_func, simulation_id))),
+    ws_events.STOP_AND_RESET_SIMULATION: refused_while_reconciling(simulation_handler(
+        lambda simulation_id, _, send_func: simulation.stop_and_reset_simulation(send_func, simulation_id))),
+    ws_events.GET_SIMULATIONS:
+        (lambda _, send_func: send_func(ws_events.SIMULATIONS, simulation.get_simulations())),
+    ws_events.GET_SIMULATION_NODES: simulation_handler(
+        lambda simulation_id, _, send_func: send_func(ws_events.SIMULATION_NODES,
+                                                      simulation.get_simulation_nodes(simulation_id))),
+    ws_events.GET_SIMULATION_STATE: simulation_handler(
+        lambda simulation_id, _, send_func: send_func(ws_events.SIMULATION_STATE,
+                                                      simulation.get_simulation_state(simulation_id))),
+    ws_events.PERFORM_NODE_ACTION: refused_while_reconciling(simulation_handler(
+        lambda simulation_id, data, _: simulation.perform_node_action(data, simulation_id))),
+    ws_events.PERFORM_BULK_NODE_ACTION: refused_while_reconciling(simulation_handler(
+        lambda simulation_id, data, send_func: simulation.perform_bulk_node_action(data, send_func, simulation_id))),
+    ws_events.STREAM_NODE_LOGS: simulation_handler(
+        lambda simulation_id, data, _: simulation.stream_node_logs(data, simulation_id)),
+    ws_events.GET_CURRENT_SIMULATION_HASH: simulation_handler(
+        lambda simulation_id, _, send_func: send_func(ws_events.CURRENT_SIMULATION_HASH,
+                                                      simulation.get_current_simulation_hash(simulation_id))),
+    ws_events.SET_CURRENT_SIMULATION_HASH: simulation_handler(
+        lambda simulation_id, data, _: simulation.store_simulation_current_simulation_hash(data, simulation_id)),
+    ws_events.START_WS_EVENT_PROFILING: start_ws_event_profiling_handler,
+    ws_events.GET_WS_EVENT_PROFILES: (
+        lambda _, send_func: send_func(ws_events.WS_EVENT_PROFILES, ws_instrumentation.get_profiles())),
+    ws_events.PLAN_SIMULATION_RESOURCES: (
+        lambda _, send_func: send_func(ws_events.SIMULATION_RESOURCE_PLAN, simulation.plan_resources()))
 }
 
+# Events whose responses only concern the client that asked for them, so are not sent to every client
+REPLY_TO_SENDER_EVENTS: Set[str] = {ws_events.GET_UNPACKED_NETWORK_TOPOLOGY_PAGE}
+# Exceptions raised for requests with invalid data, which are answered with an error event rather than raised
+INVALID_REQUEST_EXCEPTIONS: Tuple[type, ...] = (
+    network_topology.NetworkTopologyValidationException, ws_instrumentation.ProfilingRequestException,
+    simulation.SimulationIdException, simulation.NodeActionException, reconciliation.ReconciliationInProgressException)
+
+
+# Returns an awaitable if the handler is asynchronous. Responses are sent to every client unless a send_func is given.
+def handle(event: str, data, bytes_in: int = 0, send_func: Optional[Callable[[str, Any], int]] = None):
+    return ws_instrumentation.dispatch(event, data, bytes_in, handlers[event],
+                                       send_func if send_func else WSHandler.send_message)
+
 
-def handle(event: str, data):
-    handlers[event](data, WSHandler.send_message)
+def make_error(event: str, exception: Exception) -> Dict[str, Any]:
+    return {dict_keys.WS_EVENT: event, dict_keys.WS_ERROR_MESSAGE: getattr(exception, 'message', str(exception)),
+            dict_keys.WS_ERROR_DATA: getattr(exception, 'data', None)}
 
 
 class WSHandler(tornado.websocket.WebSocketHandler):
@@ -74,7 +186,9 @@ class WSHandler(tornado.websocket.WebSocketHandler):
 
     def __init__(self, application, request, **kwargs):
         super().__init__(application, request, **kwargs)
-        self.last_simulation_nodes: dict = simulation.get_simulation_nodes()
+        self.last_simulation_nodes: Dict[str, List[Dict[str, Any]]] = {
+            simulation_id: simulation.get_simulation_nodes(simulation_id)
+            for simulation_id in simulation.get_simulation_ids()}
         self.simulation_nodes_update_callback: PeriodicCallback = None
 
     @staticmethod
@@ -92,27 +206,61 @@ class WSHandler(tornado.websocket.WebSocketHandler):
         self.simulation_nodes_update_callback.start()
         print('new ws connection')
 
+    # Asynchronous handlers finish on their own, so this client's later events are handled in the meantime
     def on_message(self, message):
         event, data = self.parse_message(message)
-        handle(event, data)
+        try:
+            result = handle(event, data, len(message.encode()) if isinstance(message, str) else len(message),
+                            self.send_reply if event in REPLY_TO_SENDER_EVENTS else None)
+        except INVALID_REQUEST_EXCEPTIONS as e:
+            self.send_reply(ws_events.ERROR, make_error(event, e))
+            return
+        if inspect.isawaitable(result):
+            IOLoop.current().spawn_callback(self.finish_handling, event, result)
+
+    async def finish_handling(self, event: str, awaitable):
+        try:
+            await awaitable
+        except INVALID_REQUEST_EXCEPTIONS as e:
+            self.send_reply(ws_events.ERROR, make_error(event, e))
 
     def maybe_send_simulation_nodes_update(self):
-        simulation_nodes = simulation.get_simulation_nodes()
-        if not sorted(simulation_nodes, key=(lambda node: node[dict_keys.NODE_NID])) == sorted(
-                self.last_simulation_nodes, key=(lambda node: node[dict_keys.NODE_NID])):
-            self.last_simulation_nodes = simulation_nodes
-            self.send_message(ws_events.SIMULATION_NODES, simulation_nodes)
+        for simulation_id in simulation.get_simulation_ids():
+            simulation_nodes = simulation.get_simulation_nodes(simulation_id)
+            if not sorted(simulation_nodes, key=(lambda node: node[dict_keys.NODE_NID])) == sorted(
+                    self.last_simulation_nodes.get(simulation_id, []), key=(lambda node: node[dict_keys.NODE_NID])):
+                self.last_simulation_nodes[simulation_id] = simulation_nodes
+                make_simulation_send_func(simulation_id, self.send_message)(ws_events.SIMULATION_NODES,
+                                                                            simulation_nodes)
+
+    @staticmethod
+    def make_message(event, data) -> str:
+        return json.dumps({dict_keys.WS_EVENT: event, dict_keys.WS_DATA: json.dumps(data)})
 
+    # Returns the number of bytes written across all sockets
     @classmethod
-    def send_message(cls, event, data):
+    def send_message(cls, event, data) -> int:
+        message = cls.make_message(event, data)
+        message_bytes = len(message.encode())
+        bytes_written = 0
         removable = set()
         for ws in cls.live_web_sockets:
             if not ws.ws_connection or not ws.ws_connection.stream.socket:
                 removable.add(ws)
             else:
-                ws.write_message(json.dumps({dict_keys.WS_EVENT: event, dict_keys.WS_DATA: json.dumps(data)}))
+                ws.write_message(message)
+                bytes_written += message_bytes
         for ws in removable:
             cls.live_web_sockets.remove(ws)
+        return bytes_written
+
+    # Sends to this client only, returning the number of bytes written
+    def send_reply(self, event, data) -> int:
+        if not self.ws_connection or not self.ws_connection.stream.socket:
+            return 0
+        message = self.make_message(event, data)
+        self.write_message(message)
+        return len(message.encode())
 
     def on_close(self):
         self.simulation_nodes_update_callback.stop()
@@ -120,3 +268,15 @@ class WSHandler(tornado.websocket.WebSocketHandler):
 
     def check_origin(self, origin):
         return True
+
+    @classmethod
+    def get_outbound_buffer_bytes(cls) -> int:
+        return sum(getattr(ws.ws_connection.stream, '_write_buffer_size', 0) for ws in cls.live_web_sockets
+                   if ws.ws_connection and ws.ws_connection.stream)
+
+
+metrics.register(metrics.CallbackGauge('diorama_ws_live_sockets', 'Number of live WebSocket connections',
+                                       lambda: len(WSHandler.live_web_sockets)))
+metrics.register(metrics.CallbackGauge('diorama_ws_outbound_buffer_bytes',
+                                       'Bytes queued for sending across all WebSocket connections',
+                                       WSHandler.get_outbound_buffer_bytes))
@@ -0,0 +1,18 @@
+import os
+import sys
+
+REPOSITORY_DIRECTORY = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if REPOSITORY_DIRECTORY not in sys.path:
+    sys.path.insert(0, REPOSITORY_DIRECTORY)
+
+
+def use_in_memory_databases():
+    from tinydb.storages import MemoryStorage
+    import database
+    database.use_storage(MemoryStorage)
+
+
+def percentile(sorted_values, fraction: float) -> float:
+    if len(sorted_values) == 0:
+        return float('nan')
+    return sorted_values[min(len(sorted_values) - 1, int(round(fraction * (len(sorted_values) - 1))))]
@@ -0,0 +1,218 @@
+# Benchmarks the topology pipeline stages on synthetic topologies and compares them with a stored baseline.
+#
+# Run from the repository root:
+#   python benchmarks/topology_benchmark.py                        # all sizes, YAML and JSON
+#   python benchmarks/topology_benchmark.py --sizes 100 1000 --languages YAML
+#   python benchmarks/topology_benchmark.py --update-baseline      # store results as the new baseline
+#
+# Each size runs in its own process so that peak memory figures are independent and a size that takes too long can be
+# abandoned. The exit status is 1 if any stage regressed beyond the tolerances against the baseline, or any size timed
+# out.
+from typing import Dict, Any, List, Callable, Optional
+import argparse
+import json
+import math
+import multiprocessing
+import os
+import sys
+import time
+import tracemalloc
+
+import yaml
+
+from benchmark_support import REPOSITORY_DIRECTORY, use_in_memory_databases
+import dict_keys
+
+DEFAULT_SIZES: List[int] = [100, 1000, 10000, 100000]
+DEFAULT_LANGUAGES: List[str] = ['YAML', 'JSON']
+DEFAULT_BASELINE_PATH: str = os.path.join(REPOSITORY_DIRECTORY, 'benchmarks', 'topology_baseline.json')
+DEFAULT_REPEATS: int = 3
+DEFAULT_TIMEOUT_SECONDS: int = 600
+DEFAULT_TIME_TOLERANCE: float = 0.25
+DEFAULT_MEMORY_TOLERANCE: float = 0.10
+MINIMUM_SIGNIFICANT_SECONDS: float = 0.005
+MINIMUM_SIGNIFICANT_BYTES: int = 64 * 1024
+FULLY_CONNECTED_GROUP_MAX_SIZE: int = 64
+
+STAGES: List[str] = ['validate_raw_topology', 'unpack_node_groups', 'unpack_topology',
+                     'save_initial_connection_parameters', 'generate_connection_parameters_by_node']
+
+
+def generate_topology(number_nodes: int) -> Dict[str, Any]:
+    number_single_nodes: int = number_nodes // 10
+    fully_connected_size: int = max(2, min(FULLY_CONNECTED_GROUP_MAX_SIZE, number_nodes // 10))
+    line_size: int = number_nodes // 4
+    ring_size: int = number_nodes // 4
+    star_hosts: int = number_nodes // 5
+    remaining: int = number_nodes - number_single_nodes - fully_connected_size - line_size - ring_size - star_hosts - 1
+    tree_levels: int = max(1, int(math.log2(max(remaining, 1) + 1)))
+    line_size += remaining - (2 ** tree_levels - 1)
+
+    single_nodes: List[Dict[str, Any]] = [
+        {'nid': f's{index}', 'program': 'single', 'connections': ([f's{index - 1}'] if index > 0 else ['l0'])}
+        for index in range(0, number_single_nodes)]
+    node_groups: List[Dict[str, Any]] = [
+        {'type': 'line', 'name': 'line', 'program': 'line', 'number_nodes': line_size, 'nid_prefix': 'l'},
+        {'type': 'ring', 'name': 'ring', 'program': 'ring', 'number_nodes': ring_size, 'nid_prefix': 'r',
+         'connections': [{'from': 'r0', 'to': 'l0'}]},
+        {'type': 'fully_connected', 'name': 'fully_connected', 'program': 'fc', 'number_nodes': fully_connected_size,
+         'nid_prefix': 'f'},
+        {'type': 'star', 'name': 'star', 'hub_nid': 'hub', 'hub_program': 'hub', 'number_hosts': star_hosts,
+         'host_program': 'host', 'host_nid_prefix': 'h'},
+        {'type': 'tree', 'name': 'tree', 'number_levels': tree_levels, 'number_children': 2,
+         'programs': ['tree'] * tree_levels, 'nid_prefixes': [f't{level}_' for level in range(0, tree_levels)]}
+    ]
+    return {'single_nodes': single_nodes, 'node_groups': node_groups}
+
+
+def dump_topology(topology: Dict[str, Any], language: str) -> str:
+    if language == 'YAML':
+        return yaml.dump(topology, default_flow_style=False, Dumper=getattr(yaml, 'CDumper', yaml.Dumper))
+    return json.dumps(topology)
+
+
+def measure(stage: Callable[[], Any], repeats: int) -> Dict[str, Any]:
+    seconds: List[float] = []
+    for _ in range(0, repeats):
+        start: float = time.perf_counter()
+        stage()
+        seconds.append(time.perf_counter() - start)
+    tracemalloc.start()
+    stage()
+    _, peak_bytes = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return {'seconds': min(seconds), 'peak_bytes': peak_bytes}
+
+
+def load_simulation_module():
+    try:
+        import simulation
+        return simulation
+    except Exception as e:  # docker_interface connects to the Docker daemon on import
+        print(f'  skipping generate_connection_parameters_by_node: {e}', file=sys.stderr)
+        return None
+
+
+def run_size(language: str, number_nodes: int, repeats: int) -> Dict[str, Dict[str, Any]]:
+    use_in_memory_databases()
+    import network_topology
+
+    raw: str = dump_topology(generate_topology(number_nodes), language)
+    topology: Dict[str, Any] = network_topology.parse_and_validate_raw_topology(language, raw)[
+        dict_keys.NETWORK_TOPOLOGY_TOPOLOGY]
+    unpacked_topology: List[Dict[str, Any]] = network_topology.unpack_topology(topology)
+    network_topology.save_unpacked_network_topology(unpacked_topology)
+
+    stages: Dict[str, Callable[[], Any]] = {
+        'validate_raw_topology': lambda: network_topology.parse_and_validate_raw_topology(language, raw),
+        'unpack_node_groups': lambda: network_topology.unpack_node_groups(
+            topology[dict_keys.NETWORK_TOPOLOGY_NODE_GROUPS]),
+        'unpack_topology': lambda: network_topology.unpack_topology(topology),
+        'save_initial_connection_parameters': network_topology.save_initial_connection_parameters
+    }
+    simulation = load_simulation_module()
+    if simulation:
+        simulation.store_simulation_node_list(unpacked_topology)
+        stages['generate_connection_parameters_by_node'] = simulation.generate_connection_parameters_by_node
+
+    results: Dict[str, Dict[str, Any]] = {}
+    for stage_name, stage in stages.items():
+        results[stage_name] = measure(stage, repeats)
+        print(f'  {language:>4} {number_nodes:>7} {stage_name:<40} {results[stage_name]["seconds"]:>10.4f}s '
+              f'{results[stage_name]["peak_bytes"] / (1024 * 1024):>9.2f}MiB', flush=True)
+    return results
+
+
+def run_size_in_process(language: str, number_nodes: int, repeats: int, queue: multiprocessing.Queue):
+    queue.put(run_size(language, number_nodes, repeats))
+
+
+def run_size_with_timeout(language: str, number_nodes: int, repeats: int,
+                          timeout_seconds: int) -> Optional[Dict[str, Dict[str, Any]]]:
+    queue: multiprocessing.Queue = multiprocessing.Queue()
+    process = multiprocessing.Process(target=run_size_in_process, args=(language, number_nodes, repeats, queue))
+    process.start()
+    try:
+        return queue.get(timeout=timeout_seconds)
+    except Exception:
+        print(f'  {language:>4} {number_nodes:>7} timed out after {timeout_seconds}s', flush=True)
+        return None
+    finally:
+        process.join(timeout=1)
+        if process.is_alive():
+            process.terminate()
+
+
+def result_key(language: str, number_nodes: int, stage_name: str) -> str:
+    return f'{language}/{number_nodes}/{stage_name}'
+
+
+def find_regressions(results: Dict[str, Dict[str, Any]], baseline: Dict[str, Dict[str, Any]], time_tolerance: float,
+                     memory_tolerance: float) -> List[str]:
+    regressions: List[str] = []
+    for key, result in results.items():
+        if key not in baseline:
+            continue
+        expected: Dict[str, Any] = baseline[key]
+        if (result['seconds'] > expected['seconds'] * (1 + time_tolerance)
+                and result['seconds'] - expected['seconds'] > MINIMUM_SIGNIFICANT_SECONDS):
+            regressions.append(f'{key}: {result["seconds"]:.4f}s vs baseline {expected["seconds"]:.4f}s')
+        if (result['peak_bytes'] > expected['peak_bytes'] * (1 + memory_tolerance)
+                and result['peak_bytes'] - expected['peak_bytes'] > MINIMUM_SIGNIFICANT_BYTES):
+            regressions.append(f'{key}: peak {result["peak_bytes"]} bytes vs baseline {expected["peak_bytes"]} bytes')
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark topology parsing, validation and unpacking.')
+    parser.add_argument('--sizes', type=int, nargs='+', default=DEFAULT_SIZES)
+    parser.add_argument('--languages', nargs='+', choices=DEFAULT_LANGUAGES, default=DEFAULT_LANGUAGES)
+    parser.add_argument('--repeats', type=int, default=DEFAULT_REPEATS)
+    parser.add_argument('--timeout', type=int, default=DEFAULT_TIMEOUT_SECONDS, help='seconds allowed per size')
+    parser.add_argument('--baseline', default=DEFAULT_BASELINE_PATH)
+    parser.add_argument('--update-baseline', action='store_true')
+    parser.add_argument('--time-tolerance', type=float, default=DEFAULT_TIME_TOLERANCE)
+    parser.add_argument('--memory-tolerance', type=float, default=DEFAULT_MEMORY_TOLERANCE)
+    args = parser.parse_args()
+
+    results: Dict[str, Dict[str, Any]] = {}
+    timed_out: List[str] = []
+    for language in args.languages:
+        for number_nodes in args.sizes:
+            size_results = run_size_with_timeout(language, number_nodes, args.repeats, args.timeout)
+            if size_results is None:
+                timed_out.append(f'{language}/{number_nodes}: timed out after {args.timeout}s')
+            for stage_name, result in (size_results or {}).items():
+                results[result_key(language, number_nodes, stage_name)] = result
+
+    if args.update_baseline:
+        baseline: Dict[str, Dict[str, Any]] = {}
+        if os.path.exists(args.baseline):
+            with open(args.baseline) as baseline_file:
+                baseline = json.load(baseline_file)
+        baseline.update(results)
+        with open(args.baseline, 'w') as baseline_file:
+            json.dump(baseline, baseline_file, indent=2, sort_keys=True)
+        print(f'Baseline written to {args.baseline}')
+        for timeout in timed_out:
+            print(f'NOT IN BASELINE {timeout}')
+        if len(timed_out) > 0:
+            sys.exit(1)
+        return
+
+    if not os.path.exists(args.baseline):
+        print(f'No baseline at {args.baseline}; run with --update-baseline to create one')
+        sys.exit(1)
+    with open(args.baseline) as baseline_file:
+        # A size that times out has no results to compare, so would otherwise pass unnoticed
+        regressions: List[str] = timed_out + find_regressions(results, json.load(baseline_file), args.time_tolerance,
+                                                              args.memory_tolerance)
+    for regression in regressions:
+        print(f'REGRESSION {regression}')
+    if len(regressions) > 0:
+        sys.exit(1)
+    print('No regressions against the baseline')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,179 @@
+# Load-tests WebSocket fan-out and log ingestion without a Docker daemon.
+#
+# Run from the repository root:
+#   python benchmarks/ws_load_test.py --clients 50 --rate 500 --duration 10
+#
+# The server from server.make_server() runs in a child process with in-memory databases. The Docker clients are only
+# created when a simulation is set up, which the load test never does. This process opens the WebSocket clients and
+# posts log messages to /loggingMessage at the given rate.
+# Each posted message carries its send time so clients can measure end-to-end delivery latency.
+from typing import Dict, Any, List, Callable, Tuple
+import argparse
+import asyncio
+import json
+import multiprocessing
+import os
+import socket
+import tempfile
+import time
+from multiprocessing.connection import Connection
+
+from benchmark_support import use_in_memory_databases, percentile
+
+DEFAULT_CLIENTS: int = 10
+DEFAULT_RATE: float = 100
+DEFAULT_DURATION_SECONDS: float = 10
+DEFAULT_DRAIN_SECONDS: float = 2
+DEFAULT_MAX_CONCURRENT_POSTS: int = 100
+SERVER_STOP_POLL_MILLISECONDS: int = 100
+SERVER_SAMPLE_REQUEST: str = 'sample'
+SERVER_STOP_REQUEST: str = 'stop'
+LOAD_TEST_NID: str = 'load-test-node'
+LOAD_TEST_SEQUENCE: str = 'loadTestSequence'
+LOAD_TEST_SENT_AT: str = 'loadTestSentAt'
+
+
+def run_server(port: int, stop_connection: Connection):
+    use_in_memory_databases()
+    import constants
+    # Every message comes from one nid, so the per-node log rate limit would drop most of them
+    os.environ[constants.LOG_RATE_LIMIT_ENVIRONMENT_VARIABLE] = '0'
+    constants.LOG_STORE_DIRECTORY = tempfile.mkdtemp(prefix='diorama-load-test-logs-')
+    import tornado.ioloop
+    from tornado.ioloop import PeriodicCallback
+    import server
+
+    server.make_server().listen(port, address='127.0.0.1')
+    io_loop = tornado.ioloop.IOLoop.current()
+
+    # Each request is answered with the server's wall clock and CPU time, so both are measured over the same interval
+    def maybe_sample():
+        if stop_connection.poll():
+            request = stop_connection.recv()
+            stop_connection.send((time.monotonic(), time.process_time()))
+            if request == SERVER_STOP_REQUEST:
+                io_loop.stop()
+
+    PeriodicCallback(maybe_sample, SERVER_STOP_POLL_MILLISECONDS).start()
+    stop_connection.send(None)  # ready
+    io_loop.start()
+
+
+def find_free_port() -> int:
+    with socket.socket() as free_socket:
+        free_socket.bind(('127.0.0.1', 0))
+        return free_socket.getsockname()[1]
+
+
+# sample_server takes a request and returns the server's wall clock and CPU time when it handled it
+async def run_load(port: int, number_clients: int, rate: float, duration_seconds: float, drain_seconds: float,
+                   max_concurrent_posts: int, sample_server: Callable[[str], Tuple[float, float]]) -> Dict[str, Any]:
+    from tornado.httpclient import AsyncHTTPClient
+    from tornado.websocket import websocket_connect
+    import dict_keys
+    import ws_events
+
+    latencies: List[float] = []
+    received_counts: List[int] = [0] * number_clients
+
+    def make_on_message(client_index: int):
+        def on_message(message):
+            if message is None:
+                return
+            message_dict = json.loads(message)
+            if message_dict[dict_keys.WS_EVENT] != ws_events.SIMULATION_LOGS:
+                return
+            data = json.loads(message_dict[dict_keys.WS_DATA])
+            latencies.append(time.time() - data[LOAD_TEST_SENT_AT])
+            received_counts[client_index] += 1
+        return on_message
+
+    clients = [await websocket_connect(f'ws://127.0.0.1:{port}/ws', on_message_callback=make_on_message(index))
+               for index in range(0, number_clients)]
+
+    http_client = AsyncHTTPClient(max_clients=max_concurrent_posts)
+    posted: List[int] = [0, 0]  # succeeded, failed
+
+    async def post(sequence: int):
+        body: Dict[str, Any] = {
+            dict_keys.NODE_NID: LOAD_TEST_NID,
+            LOAD_TEST_SEQUENCE: sequence,
+            LOAD_TEST_SENT_AT: time.time(),
+            'logs': [{dict_keys.LOG_TIMESTAMP: str(time.time()), dict_keys.LOG_MESSAGE: f'message {sequence}'}]
+        }
+        try:
+            await http_client.fetch(f'http://127.0.0.1:{port}/loggingMessage', method='POST', body=json.dumps(body))
+            posted[0] += 1
+        except Exception:
+            posted[1] += 1
+
+    total_messages: int = int(rate * duration_seconds)
+    server_wall_start, server_cpu_start = sample_server(SERVER_SAMPLE_REQUEST)
+    start: float = time.monotonic()
+    pending_posts = []
+    for sequence in range(0, total_messages):
+        delay: float = start + sequence / rate - time.monotonic()
+        if delay > 0:
+            await asyncio.sleep(delay)
+        pending_posts.append(asyncio.ensure_future(post(sequence)))
+    await asyncio.gather(*pending_posts)
+    send_seconds: float = time.monotonic() - start
+    await asyncio.sleep(drain_seconds)
+    server_wall_end, server_cpu_end = sample_server(SERVER_STOP_REQUEST)
+
+    for client in clients:
+        client.close()
+    expected: int = posted[0] * number_clients
+    received: int = sum(received_counts)
+    sorted_latencies: List[float] = sorted(latencies)
+    return {
+        'clients': number_clients,
+        'target_rate': rate,
+        'achieved_rate': posted[0] / send_seconds if send_seconds > 0 else float('nan'),
+        'posted': posted[0],
+        'failed_posts': posted[1],
+        'expected_deliveries': expected,
+        'delivered': received,
+        'dropped': expected - received,
+        'p50_latency_ms': percentile(sorted_latencies, 0.5) * 1000,
+        'p99_latency_ms': percentile(sorted_latencies, 0.99) * 1000,
+        'elapsed_seconds': send_seconds + drain_seconds,
+        'server_cpu_seconds': server_cpu_end - server_cpu_start,
+        'server_cpu_percent': 100 * (server_cpu_end - server_cpu_start) / (server_wall_end - server_wall_start)
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Load-test WebSocket fan-out and /loggingMessage ingestion.')
+    parser.add_argument('--clients', type=int, default=DEFAULT_CLIENTS)
+    parser.add_argument('--rate', type=float, default=DEFAULT_RATE, help='log messages posted per second')
+    parser.add_argument('--duration', type=float, default=DEFAULT_DURATION_SECONDS, help='seconds to post for')
+    parser.add_argument('--drain', type=float, default=DEFAULT_DRAIN_SECONDS,
+                        help='seconds to wait for deliveries after the last post')
+    parser.add_argument('--max-concurrent-posts', type=int, default=DEFAULT_MAX_CONCURRENT_POSTS)
+    parser.add_argument('--json', action='store_true', help='print the report as JSON')
+    args = parser.parse_args()
+
+    port: int = find_free_port()
+    parent_connection, child_connection = multiprocessing.Pipe()
+    server_process = multiprocessing.Process(target=run_server, args=(port, child_connection), daemon=True)
+    server_process.start()
+    parent_connection.recv()
+
+    def sample_server(request: str) -> Tuple[float, float]:
+        parent_connection.send(request)
+        return parent_connection.recv()
+
+    report: Dict[str, Any] = asyncio.run(run_load(port, args.clients, args.rate, args.duration, args.drain,
+                                                  args.max_concurrent_posts, sample_server))
+    server_process.join()
+
+    if args.json:
+        print(json.dumps(report, indent=2))
+        return
+    for key, value in report.items():
+        print(f'{key:<22} {value:.2f}' if isinstance(value, float) else f'{key:<22} {value}')
+
+
+if __name__ == '__main__':
+    main()
@@ -1,10 +1,12 @@
 import os
+import sys
 from typing import Dict, Any
 
 import dict_keys
 
 DEFAULT_MAIN_SERVER_PORT = 2697
 LOGGING_SERVER_START_LOGGING_URL = 'http://localhost:2698/startLogging'
+SLOW_WS_EVENT_WARNING_SECONDS: float = 0.1
 
 DEFAULT_BASE_IP_ADDRESS = '172.190.0.1'
 DEFAULT_NETWORK_SUBNET = '172.190.0.0/16'
@@ -14,6 +16,12 @@ DEFAULT_SELF_CONNECTED_NODES = True
 DEFAULT_RAW_NETWORK_TOPOLOGY_CODE = ''
 DEFAULT_UNPACKED_NETWORK_TOPOLOGY = []
 DEFAULT_RAW_NETWORK_TOPOLOGY_LANGUAGE = 'YAML'
+DEFAULT_UNPACKED_NETWORK_TOPOLOGY_PAGE_SIZE: int = 500
+MAX_UNPACKED_NETWORK_TOPOLOGY_PAGE_SIZE: int = 5000
+VALIDATED_RAW_TOPOLOGY_CACHE_SIZE: int = 16
+TOPOLOGY_WORKER_PROCESSES: int = 1
+TOPOLOGY_SAVE_TIMEOUT_SECONDS: float = 60
+TOPOLOGY_WORKER_LIVENESS_INTERVAL_SECONDS: float = 0.5
 DEFAULT_CONNECTION_PARAMETERS: Dict[str, Any] = {
     dict_keys.NODE_CONNECTIONS_PARAMETERS_SUCCESS_RATE: 1,
     dict_keys.NODE_CONNECTIONS_PARAMETERS_DELAY_DISTRIBUTION: 'fixed',
@@ -22,9 +30,78 @@ DEFAULT_CONNECTION_PARAMETERS: Dict[str, Any] = {
 
 DOCKER_NETWORK_NAME = 'DIORAMA_NETWORK'
 
+DEFAULT_SIMULATION_ID: str = 'default'
+SIMULATION_LABEL: str = 'diorama.simulation'
+NID_LABEL: str = 'diorama.nid'
+PROGRAM_LABEL: str = 'diorama.program'
+VALID_SIMULATION_ID_REGEX: str = r'^[a-z0-9]+(-[a-z0-9]+)*$'
+SIMULATION_NAMESPACE_SEPARATOR: str = '--'
+SIMULATION_NAMESPACE_PORT_BLOCK_SIZE: int = 1000
+
+SIMULATION_BACKEND_ENVIRONMENT_VARIABLE = 'DIORAMA_SIMULATION_BACKEND'
+DOCKER_SIMULATION_BACKEND = 'docker'
+LOCAL_PROCESS_SIMULATION_BACKEND = 'local'
+DEFAULT_SIMULATION_BACKEND = DOCKER_SIMULATION_BACKEND
+LOCAL_BACKEND_DIRECTORY = os.path.join('out', 'local_backend')
+LOCAL_BACKEND_STOP_TIMEOUT_SECONDS = 10
+LOCAL_BACKEND_LOG_POLL_MILLISECONDS = 250
+LOCAL_BACKEND_LOGGING_MESSAGE_URL = f'http://localhost:{DEFAULT_MAIN_SERVER_PORT}/loggingMessage'
+
+NODE_ACTIONS = ['start', 'stop', 'kill', 'restart', 'pause', 'unpause']
+BULK_NODE_ACTION_MAX_WORKERS = 8
+
+CONTAINER_POOL_ENVIRONMENT_VARIABLE = 'DIORAMA_CONTAINER_POOL'
+CONTAINER_POOL_DIRECTORY = os.path.join('out', 'container_pool')
+CONTAINER_RUN_ARGS_FILE_PATH = '/diorama/run_args'
+CONTAINER_RUN_ARGS_SEPARATOR = '\x1f'
+
+LIVE_CONFIG_DIRECTORY = os.path.join('out', 'live_config')
+LIVE_CONFIG_DIRECTORY_ENVIRONMENT_VARIABLE = 'DIORAMA_LIVE_CONFIG_DIR'
+CONTAINER_LIVE_CONFIG_DIRECTORY_PATH = '/diorama/live_config'
+LIVE_CONFIG_FILE_EXTENSION = '.yml'
+
+LINK_EMULATION_ENVIRONMENT_VARIABLE = 'DIORAMA_LINK_EMULATION'
+USERSPACE_LINK_EMULATION = 'userspace'
+NETEM_LINK_EMULATION = 'netem'
+DEFAULT_LINK_EMULATION = USERSPACE_LINK_EMULATION
+LINK_EMULATION_SCRIPT_FILE_PREFIX = 'netem-'
+LINK_EMULATION_SCRIPT_FILE_EXTENSION = '.sh'
+LINK_EMULATION_SYSTEM_PACKAGES = ['iproute2']
+LINK_EMULATION_CAPABILITY = 'NET_ADMIN'
+# Delays in the connection parameters are in milliseconds
+NETEM_DELAY_UNIT = 'ms'
+NETEM_CLASS_RATE = '10gbit'
+
+LOG_TIMESTAMP_FORMAT = '%Y-%m-%dT%H:%M:%S.%fZ'
+
+LOG_RATE_LIMIT_ENVIRONMENT_VARIABLE = 'DIORAMA_LOG_RATE_LIMIT'
+LOG_BURST_ENVIRONMENT_VARIABLE = 'DIORAMA_LOG_BURST'
+LOG_SAMPLE_EVERY_ENVIRONMENT_VARIABLE = 'DIORAMA_LOG_SAMPLE_EVERY'
+DEFAULT_LOG_RATE_LIMIT_LINES_PER_SECOND = 200
+DEFAULT_LOG_BURST_LINES = 1000
+DEFAULT_LOG_SAMPLE_EVERY = 0
+LOG_SUPPRESSION_SUMMARY_INTERVAL_SECONDS = 5
+LOG_RATE_LIMIT_IDLE_BUCKET_SECONDS = 60
+
+LOG_STORE_DIRECTORY = os.path.join('out', 'log_store')
+LOG_STORE_SEGMENT_MAX_BYTES = 16 * 1024 * 1024
+LOG_STORE_MAX_BYTES_PER_SIMULATION = 1024 * 1024 * 1024
+LOG_STORE_MAX_AGE_SECONDS = 7 * 24 * 60 * 60
+LOG_STORE_EVICTION_INTERVAL_SECONDS = 60
+LOG_STORE_QUERY_FLUSH_LINES = 1000
+
 BASE_NODE_FILES_DIRECTORY = os.path.join('.', 'base_node_files')
 NODE_ADDRESSES_FILE_NAME: str = 'node_addresses.yml'
 CONNECTION_PARAMETERS_FILE_NAME: str = 'connection_parameters.yml'
+BINARY_NODE_CONFIG_ENVIRONMENT_VARIABLE = 'DIORAMA_BINARY_NODE_CONFIG'
+NODE_CONFIG_FILE_NAME: str = 'node_config.msgpack'
+# Files copied into a program's image alongside its runtime's base node files, such as the node config readers
+NODE_SUPPORT_FILES_DIRECTORY = os.path.join('.', 'node_support_files')
+TOPOLOGY_BINARY_CONTENT_TYPE: str = 'application/msgpack'
+REQUIREMENTS_FILE_NAME: str = 'requirements.txt'
+GENERATED_DOCKERFILE_NAME: str = 'Dockerfile.diorama'
+DEPENDENCY_IMAGE_REPOSITORY_PREFIX: str = 'diorama-dependencies-'
+DEPENDENCY_IMAGE_HASH_LENGTH: int = 16
 
 NODE_MAIN_FILE_NAME_FOR_RAW = 'node'
 USER_NODE_FILES_DIRECTORY_NAME = 'user_node_files'
@@ -39,7 +116,13 @@ FILE_EXTENSIONS_FOR_RUNTIME = {
 RUNTIME_DATA = {
     'python3': {
         dict_keys.RUNTIME_DATA_WORKING_DIRECTORY: '/usr/src/app',
-        dict_keys.RUNTIME_DATA_RUN_COMMAND: ['python', '-u', 'main.py']
+        dict_keys.RUNTIME_DATA_BASE_IMAGE: 'python:3',
+        dict_keys.RUNTIME_DATA_DEPENDENCY_INSTALL_COMMAND: ['pip', 'install', '--no-cache-dir', '-r'],
+        dict_keys.RUNTIME_DATA_SYSTEM_PACKAGE_INSTALL_COMMAND: [
+            'sh', '-c',
+            'apt-get update && apt-get install -y --no-install-recommends "$@" && rm -rf /var/lib/apt/lists/*', 'sh'],
+        dict_keys.RUNTIME_DATA_RUN_COMMAND: ['python', '-u', 'main.py'],
+        dict_keys.RUNTIME_DATA_LOCAL_RUN_COMMAND: [sys.executable, '-u', 'main.py']
     }
 }
 
@@ -47,3 +130,19 @@ DEFAULT_NID_STARTING_NUMBER: int = 0
 DEFAULT_NID_NUMBER_INCREMENT: int = 1
 DEFAULT_NID_PREFIX: str = ''
 DEFAULT_NID_SUFFIX: str = ''
+# Random group types are seeded, so saving the same topology again gives the same connections
+DEFAULT_GROUP_SEED: int = 0
+SMALL_WORLD_REWIRING_ATTEMPTS: int = 10
+
+# Docker's own lower bounds
+MIN_CPU_SHARES: int = 2
+MIN_CPU_PERIOD_MICROSECONDS: int = 1000
+MAX_CPU_PERIOD_MICROSECONDS: int = 1000000
+MIN_CPU_QUOTA_MICROSECONDS: int = 1000
+MIN_MEMORY_LIMIT_BYTES: int = 6 * 1024 * 1024
+DEFAULT_CPU_PERIOD_MICROSECONDS: int = 100000
+# The density planner counts nodes without a memory limit at this size, and warns once the nodes would use more than
+# this fraction of the host's memory
+NODE_MEMORY_ESTIMATE_ENVIRONMENT_VARIABLE = 'DIORAMA_NODE_MEMORY_ESTIMATE_BYTES'
+DEFAULT_NODE_MEMORY_ESTIMATE_BYTES: int = 48 * 1024 * 1024
+HOST_MEMORY_USABLE_FRACTION: float = 0.9
@@ -0,0 +1,143 @@
+from typing import List, Dict, Any, Optional
+import os
+
+from tinydb import Query
+
+import constants
+import database
+import dict_keys
+import docker_interface
+
+CONTAINER_RECORD_TYPE: str = 'container'
+NETWORK_RECORD_TYPE: str = 'network'
+
+
+def is_enabled() -> bool:
+    return (os.environ.get(constants.CONTAINER_POOL_ENVIRONMENT_VARIABLE, '').lower() in ['1', 'true', 'yes']
+            and docker_interface.supports_container_pool())
+
+
+# Pooled containers are renamed after their address slot, so the next run can hand them to any nid without clashing
+# with the names of other pooled containers
+def get_pool_container_name(network_name: str, ip_address: str, port: int) -> str:
+    return constants.SIMULATION_NAMESPACE_SEPARATOR.join([network_name, 'pool', ip_address, str(port)])
+
+
+def get_run_args_file_path(network_name: str, ip_address: str, port: int) -> str:
+    return os.path.abspath(os.path.join(constants.CONTAINER_POOL_DIRECTORY, network_name, f'{ip_address}-{port}'))
+
+
+# Rewritten in place rather than replaced, as a bind-mounted file keeps pointing at the original inode. Separated by a
+# non-whitespace character so that empty run args, such as an empty peer list, survive the shell's field splitting.
+def write_run_args_file(network_name: str, ip_address: str, port: int, run_args: List[str]) -> str:
+    run_args_file_path = get_run_args_file_path(network_name, ip_address, port)
+    os.makedirs(os.path.dirname(run_args_file_path), exist_ok=True)
+    with open(run_args_file_path, 'w') as run_args_file:
+        run_args_file.write(constants.CONTAINER_RUN_ARGS_SEPARATOR.join(run_args))
+    return run_args_file_path
+
+
+def get_pooled_containers(network_name: str) -> List[Dict[str, Any]]:
+    return database.container_pool_db.search((Query().type == CONTAINER_RECORD_TYPE)
+                                             & (getattr(Query(), dict_keys.CONTAINER_POOL_NETWORK) == network_name))
+
+
+# Each container is a dict with the container's name, image, ip address and port, whether it runs a link emulation
+# script, and its resource limits
+def release_containers(network_name: str, containers: List[Dict[str, Any]]):
+    image_ids: Dict[str, Optional[str]] = {}
+    docker_interface.stop_containers([container[dict_keys.CONTAINER_POOL_NAME] for container in containers])
+    for container in containers:
+        image_name = container[dict_keys.CONTAINER_POOL_IMAGE]
+        if image_name not in image_ids:
+            image_ids[image_name] = docker_interface.get_image_id(image_name)
+        ip_address = container[dict_keys.CONTAINER_POOL_IP_ADDRESS]
+        port = container[dict_keys.CONTAINER_POOL_PORT]
+        pool_container_name = get_pool_container_name(network_name, ip_address, port)
+        if image_ids[image_name] is None:
+            docker_interface.remove_containers([container[dict_keys.CONTAINER_POOL_NAME]])
+            continue
+        if not docker_interface.rename_container(container[dict_keys.CONTAINER_POOL_NAME], pool_container_name):
+            continue
+        database.container_pool_db.upsert({
+            dict_keys.CONTAINER_POOL_TYPE: CONTAINER_RECORD_TYPE,
+            dict_keys.CONTAINER_POOL_NAME: pool_container_name,
+            dict_keys.CONTAINER_POOL_NETWORK: network_name,
+            dict_keys.CONTAINER_POOL_IMAGE_ID: image_ids[image_name],
+            dict_keys.CONTAINER_POOL_IP_ADDRESS: ip_address,
+            dict_keys.CONTAINER_POOL_PORT: port,
+            dict_keys.CONTAINER_POOL_LINK_EMULATION: container.get(dict_keys.CONTAINER_POOL_LINK_EMULATION, False),
+            dict_keys.CONTAINER_POOL_RESOURCE_LIMITS: container.get(dict_keys.CONTAINER_POOL_RESOURCE_LIMITS, {})
+        }, (Query().type == CONTAINER_RECORD_TYPE)
+           & (getattr(Query(), dict_keys.CONTAINER_POOL_NAME) == pool_container_name))
+
+
+def get_pooled_container(pool_container_name: str) -> Optional[Dict[str, Any]]:
+    records = database.container_pool_db.search((Query().type == CONTAINER_RECORD_TYPE)
+                                                & (getattr(Query(), dict_keys.CONTAINER_POOL_NAME)
+                                                   == pool_container_name))
+    return records[0] if len(records) > 0 else None
+
+
+# Reuses the pooled container for this address slot if it was built from the same image, renaming it to the new name.
+# Its command reads the run args file for the slot, so it picks up the new run args when it is next started.
+# A reused container keeps the labels it was created with, so its nid label may be stale. Its link emulation script is
+# named after its address slot too, so it is only reused if it runs one exactly when the new container would. Resource
+# limits are fixed when a container is created, so it is only reused if they are the same.
+def create_or_reuse_container(image_name: str, image_id: str, name: str, runtime: str, run_args: List[str],
+                              ip_address: str, port: int, network_name: str, labels: Dict[str, str],
+                              live_config_directory_path: str, link_emulation_script_path: Optional[str] = None,
+                              resource_limits: Optional[Dict[str, Any]] = None):
+    run_args_file_path = write_run_args_file(network_name, ip_address, port, run_args)
+    pool_container_name = get_pool_container_name(network_name, ip_address, port)
+    pooled_container = get_pooled_container(pool_container_name)
+    if pooled_container is not None:
+        if (pooled_container[dict_keys.CONTAINER_POOL_IMAGE_ID] == image_id
+                and pooled_container.get(dict_keys.CONTAINER_POOL_LINK_EMULATION, False)
+                == bool(link_emulation_script_path)
+                and pooled_container.get(dict_keys.CONTAINER_POOL_RESOURCE_LIMITS, {}) == (resource_limits or {})):
+            database.container_pool_db.remove(getattr(Query(), dict_keys.CONTAINER_POOL_NAME) == pool_container_name)
+            if docker_interface.rename_container(pool_container_name, name):
+                return
+        else:
+            remove_containers([pool_container_name])
+    docker_interface.create_container_and_connect(image_name, name, runtime, run_args, ip_address, [port],
+                                                  network_name, run_args_file_path, labels, live_config_directory_path,
+                                                  link_emulation_script_path, resource_limits or None)
+
+
+def remove_containers(pool_container_names: List[str]):
+    docker_interface.remove_containers(pool_container_names)
+    for pool_container_name in pool_container_names:
+        database.container_pool_db.remove(getattr(Query(), dict_keys.CONTAINER_POOL_NAME) == pool_container_name)
+
+
+# Removes the containers still pooled on the network, such as ones left over after a run with fewer nodes
+def drain(network_name: str):
+    remove_containers([container[dict_keys.CONTAINER_POOL_NAME] for container in get_pooled_containers(network_name)])
+
+
+# Pooled containers stay connected to their network, so it is kept between runs unless its subnet changes
+def ensure_network(network_name: str, network_subnet: str, labels: Dict[str, str]):
+    network_query = ((Query().type == NETWORK_RECORD_TYPE)
+                     & (getattr(Query(), dict_keys.CONTAINER_POOL_NETWORK) == network_name))
+    records = database.container_pool_db.search(network_query)
+    if len(records) > 0 and records[0][dict_keys.CONTAINER_POOL_SUBNET] == network_subnet:
+        return
+    drain(network_name)
+    docker_interface.remove_network(network_name)
+    docker_interface.create_network(network_name, network_subnet, labels)
+    database.container_pool_db.upsert({dict_keys.CONTAINER_POOL_TYPE: NETWORK_RECORD_TYPE,
+                                       dict_keys.CONTAINER_POOL_NETWORK: network_name,
+                                       dict_keys.CONTAINER_POOL_SUBNET: network_subnet}, network_query)
+
+
+def is_network_pooled(network_name: str) -> bool:
+    return database.container_pool_db.contains((Query().type == NETWORK_RECORD_TYPE)
+                                               & (getattr(Query(), dict_keys.CONTAINER_POOL_NETWORK) == network_name))
+
+
+def forget_network(network_name: str):
+    drain(network_name)
+    database.container_pool_db.remove((Query().type == NETWORK_RECORD_TYPE)
+                                      & (getattr(Query(), dict_keys.CONTAINER_POOL_NETWORK) == network_name))
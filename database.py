@@ -1,6 +1,52 @@
+from typing import Dict, List
+
 from tinydb import TinyDB
+from tinydb.middlewares import Middleware
+from tinydb.storages import JSONStorage
+
+import metrics
+
+DATABASE_NAMES: List[str] = ['programs_db', 'network_topology_db', 'custom_config_db', 'simulation_db',
+                             'container_pool_db']
+
+storage_cls = JSONStorage
+databases: Dict[str, TinyDB] = {}
+
+
+class TimedMiddleware(Middleware):
+    def __init__(self, storage_cls, database_name: str):
+        super().__init__(storage_cls)
+        self.database_name: str = database_name
+
+    def read(self):
+        with metrics.DATABASE_OPERATION_SECONDS.time(self.database_name, 'read'):
+            return self.storage.read()
+
+    def write(self, data):
+        with metrics.DATABASE_OPERATION_SECONDS.time(self.database_name, 'write'):
+            self.storage.write(data)
+
+    def close(self):
+        self.storage.close()
+
+
+def open_database(database_name: str) -> TinyDB:
+    if storage_cls is JSONStorage:
+        return TinyDB(f'out/{database_name}.json', storage=TimedMiddleware(JSONStorage, database_name))
+    return TinyDB(storage=TimedMiddleware(storage_cls, database_name))
+
+
+# Databases opened from now on use this storage, e.g. MemoryStorage for tests and benchmarks
+def use_storage(new_storage_cls):
+    global storage_cls
+    storage_cls = new_storage_cls
+    databases.clear()
+
 
-programs_db: TinyDB = TinyDB('out/programs_db.json')
-network_topology_db: TinyDB = TinyDB('out/network_topology_db.json')
-custom_config_db: TinyDB = TinyDB('out/custom_config_db.json')
-simulation_db: TinyDB = TinyDB('out/simulation_db.json')
+# The databases are opened on first use as module attributes, e.g. database.programs_db
+def __getattr__(name: str) -> TinyDB:
+    if name not in DATABASE_NAMES:
+        raise AttributeError(f'module {__name__!r} has no attribute {name!r}')
+    if name not in databases:
+        databases[name] = open_database(name)
+    return databases[name]
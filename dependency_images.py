@@ -0,0 +1,53 @@
+from typing import List, Dict, Any, Optional
+import hashlib
+import os
+
+import constants
+import dict_keys
+import docker_interface
+import program_values
+
+
+# Comments, blank lines, duplicates and ordering do not change what gets installed, so they do not change the hash
+def normalise_requirements(requirements_text: str) -> List[str]:
+    requirements = set()
+    for line in requirements_text.splitlines():
+        requirement = line.split('#', 1)[0].strip()
+        if requirement:
+            requirements.add(requirement)
+    return sorted(requirements)
+
+
+def get_program_requirements(program: Dict[str, Any], program_dir: str) -> List[str]:
+    requirements_text = ''
+    base_requirements_file_path = os.path.join(program_dir, constants.REQUIREMENTS_FILE_NAME)
+    if os.path.exists(base_requirements_file_path):
+        with open(base_requirements_file_path) as base_requirements_file:
+            requirements_text = base_requirements_file.read()
+    if program[dict_keys.PROGRAM_CODE_SOURCE] == program_values.CODE_SOURCE_RAW:
+        requirements_text += '\n' + program[dict_keys.PROGRAM_CODE_DATA].get(
+            dict_keys.PROGRAM_CODE_DATA_RAW_CODE_DEPENDENCIES, '')
+    return normalise_requirements(requirements_text)
+
+
+# The base image's id is hashed along with its tag, so a floating tag such as python:3 that has moved on to a newly
+# pulled image gives a new dependency image
+def get_dependency_image_tag(runtime: str, requirements: List[str], system_packages: Optional[List[str]] = None) -> str:
+    base_image = constants.RUNTIME_DATA[runtime][dict_keys.RUNTIME_DATA_BASE_IMAGE]
+    requirements_hash = hashlib.sha256('\n'.join(
+        [runtime, base_image, str(docker_interface.resolve_base_image_id(base_image))] + requirements
+        + [f'system:{system_package}' for system_package in sorted(system_packages or [])]).encode('utf-8'))
+    return (f'{constants.DEPENDENCY_IMAGE_REPOSITORY_PREFIX}{runtime}:'
+            f'{requirements_hash.hexdigest()[:constants.DEPENDENCY_IMAGE_HASH_LENGTH]}')
+
+
+# Dependency images are shared by every program and simulation with the same runtime and requirements, and are kept
+# across simulations, so only a new set of requirements costs an install
+def ensure_dependency_image(program: Dict[str, Any], program_dir: str,
+                            system_packages: Optional[List[str]] = None) -> str:
+    runtime = program[dict_keys.PROGRAM_RUNTIME]
+    requirements = get_program_requirements(program, program_dir)
+    tag = get_dependency_image_tag(runtime, requirements, system_packages)
+    if not docker_interface.dependency_image_exists(tag):
+        docker_interface.create_dependency_image(tag, runtime, requirements, system_packages)
+    return tag
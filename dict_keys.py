@@ -3,6 +3,8 @@ SINGLETON_ID = 'SINGLETON'
 
 WS_EVENT = 'event'
 WS_DATA = 'data'
+WS_ERROR_MESSAGE = 'errorMessage'
+WS_ERROR_DATA = 'errorData'
 
 
 CUSTOM_CONFIG = 'customConfig'
@@ -15,12 +17,26 @@ NETWORK_TOPOLOGY_DATA = 'data'
 NETWORK_TOPOLOGY_TYPE = 'type'
 NETWORK_TOPOLOGY_ERROR_DATA = 'errorData'
 NETWORK_TOPOLOGY_ERROR_MESSAGE = 'errorMessage'
+NETWORK_TOPOLOGY_ERRORS = 'errors'
 NETWORK_TOPOLOGY_TOPOLOGY = 'topology'
 NETWORK_TOPOLOGY_IS_VALID = 'isValid'
 NETWORK_TOPOLOGY_SINGLE_NODES = 'single_nodes'
 NETWORK_TOPOLOGY_NODE_GROUPS = 'node_groups'
 NETWORK_TOPOLOGY_LANGUAGE = 'language'
+NETWORK_TOPOLOGY_PAGE_CURSOR = 'cursor'
+NETWORK_TOPOLOGY_PAGE_SIZE = 'pageSize'
+NETWORK_TOPOLOGY_PAGE_NEXT_CURSOR = 'nextCursor'
+NETWORK_TOPOLOGY_PAGE_NODES = 'nodes'
+NETWORK_TOPOLOGY_PAGE_CONNECTION_PARAMETERS = 'connectionParameters'
+NETWORK_TOPOLOGY_PAGE_TOTAL_NODES = 'totalNodes'
+NETWORK_TOPOLOGY_PAGE_TOTAL_CONNECTIONS = 'totalConnections'
+NETWORK_TOPOLOGY_NUMBER_CONNECTIONS = 'numberConnections'
+NETWORK_TOPOLOGY_CHANGED_NIDS = 'changedNids'
+NETWORK_TOPOLOGY_VALIDATION_RESULT = 'validationResult'
+NETWORK_TOPOLOGY_UNPACKED_TOPOLOGY = 'unpackedTopology'
+NETWORK_TOPOLOGY_EXPLICITLY_SELF_CONNECTED_NIDS = 'explicitlySelfConnectedNids'
 NETWORK_TOPOLOGY_GROUP_TYPE = 'type'
+NETWORK_TOPOLOGY_GROUP_NAME = 'name'
 NETWORK_TOPOLOGY_GROUP_NID_STARTING_NUMBER = 'nid_starting_number'
 NETWORK_TOPOLOGY_GROUP_NID_NUMBER_INCREMENT = 'nid_number_increment'
 NETWORK_TOPOLOGY_GROUP_NID_PREFIX = 'nid_prefix'
@@ -44,6 +60,13 @@ NETWORK_TOPOLOGY_GROUP_TREE_NID_PREFIXES = 'nid_prefixes'
 NETWORK_TOPOLOGY_GROUP_TREE_NID_STARTING_NUMBERS = 'nid_starting_numbers'
 NETWORK_TOPOLOGY_GROUP_TREE_NID_NUMBER_INCREMENTS = 'nid_number_increments'
 NETWORK_TOPOLOGY_GROUP_TREE_NID_SUFFIXES = 'nid_suffixes'
+NETWORK_TOPOLOGY_GROUP_GRID_NUMBER_ROWS = 'number_rows'
+NETWORK_TOPOLOGY_GROUP_GRID_NUMBER_COLUMNS = 'number_columns'
+NETWORK_TOPOLOGY_GROUP_RANDOM_CONNECTION_PROBABILITY = 'connection_probability'
+NETWORK_TOPOLOGY_GROUP_SMALL_WORLD_NUMBER_NEIGHBOURS = 'number_neighbours'
+NETWORK_TOPOLOGY_GROUP_SMALL_WORLD_REWIRING_PROBABILITY = 'rewiring_probability'
+NETWORK_TOPOLOGY_GROUP_BARABASI_ALBERT_NUMBER_ATTACHMENTS = 'number_attachments'
+NETWORK_TOPOLOGY_GROUP_SEED = 'seed'
 
 NODE_CONNECTIONS_PARAMETERS_SUCCESS_RATE = 'successRate'
 NODE_CONNECTIONS_PARAMETERS_DELAY_DISTRIBUTION = 'delayDistribution'
@@ -51,10 +74,22 @@ NODE_CONNECTIONS_PARAMETERS_DELAY_DISTRIBUTION_PARAMETERS = 'delayDistributionPa
 MODIFY_NODE_CONNECTIONS_FROM_NID = 'fromNid'
 MODIFY_NODE_CONNECTIONS_TO_NID = 'toNid'
 MODIFY_NODE_CONNECTIONS_PARAMETERS = 'parameters'
+MODIFY_NODE_CONNECTIONS_GROUP = 'group'
+MODIFY_NODE_CONNECTIONS_PATCHES = 'patches'
+MODIFY_NODE_CONNECTIONS_SELECTOR = 'selector'
+MODIFY_NODE_CONNECTIONS_FROM_NID_PREFIX = 'fromNidPrefix'
+MODIFY_NODE_CONNECTIONS_TO_NID_PREFIX = 'toNidPrefix'
+PATCH_CONNECTION_PARAMETERS_NUMBER_APPLIED = 'numberApplied'
+PATCH_CONNECTION_PARAMETERS_SKIPPED_CONNECTIONS = 'skippedConnections'
+CONNECTION_PARAMETERS_DEFAULT = 'default'
+CONNECTION_PARAMETERS_GROUP_DEFAULTS = 'groupDefaults'
+CONNECTION_PARAMETERS_OVERRIDES = 'overrides'
 
 NODE_CONNECTIONS = 'connections'
 NODE_NID = 'nid'
 NODE_PROGRAM = 'program'
+NODE_GROUP = 'group'
+NODE_RESOURCES = 'resources'
 
 PROGRAM_NAME = 'name'
 PROGRAM_CODE_SOURCE = 'codeSource'
@@ -62,6 +97,7 @@ PROGRAM_CODE_DATA = 'codeData'
 PROGRAM_RUNTIME = 'runtime'
 PROGRAM_DESCRIPTION = 'description'
 PROGRAM_MAIN_HANDLER = 'mainHandler'
+PROGRAM_RESOURCES = 'resources'
 PROGRAM_CODE_DATA_RAW_CODE = 'code'
 PROGRAM_CODE_DATA_RAW_CODE_DEPENDENCIES = 'dependencies'
 PROGRAM_CODE_DATA_GIT_REPO_URL = 'repositoryUrl'
@@ -76,6 +112,30 @@ SIMULATION_DATA: str = 'data'
 SIMULATION_TYPE: str = 'type'
 SIMULATION_STATE: str = 'state'
 SIMULATION_PROGRAMS: str = 'programs'
+SIMULATION_ID: str = 'simulationId'
+SIMULATION_NAMESPACE_SLOT: str = 'namespaceSlot'
+SIMULATION_CONTAINER_POOL: str = 'containerPool'
+SIMULATION_LINK_EMULATION: str = 'linkEmulation'
+SIMULATION_RESOURCE_PLAN: str = 'resourcePlan'
+
+CONTAINER_POOL_TYPE: str = 'type'
+CONTAINER_POOL_NAME: str = 'name'
+CONTAINER_POOL_IMAGE: str = 'image'
+CONTAINER_POOL_IMAGE_ID: str = 'imageId'
+CONTAINER_POOL_NETWORK: str = 'network'
+CONTAINER_POOL_SUBNET: str = 'subnet'
+CONTAINER_POOL_IP_ADDRESS: str = 'ipAddress'
+CONTAINER_POOL_PORT: str = 'port'
+CONTAINER_POOL_LINK_EMULATION: str = 'linkEmulation'
+CONTAINER_POOL_RESOURCE_LIMITS: str = 'resourceLimits'
+
+RECONCILIATION_ADOPTED_CONTAINERS: str = 'adoptedContainers'
+RECONCILIATION_CREATED_CONTAINERS: str = 'createdContainers'
+RECONCILIATION_REMOVED_CONTAINERS: str = 'removedContainers'
+RECONCILIATION_REBUILT_IMAGES: str = 'rebuiltImages'
+RECONCILIATION_REMOVED_IMAGES: str = 'removedImages'
+RECONCILIATION_RECREATED_NETWORK: str = 'recreatedNetwork'
+RECONCILIATION_RESET: str = 'reset'
 
 NODE_ADDRESSES_NID = 'nid'
 NODE_ADDRESSES_IP_ADDRESS = 'ip_address'
@@ -85,10 +145,52 @@ CONTAINER_STATUS = 'status'
 
 LOG_TIMESTAMP = 'timestamp'
 LOG_MESSAGE = 'message'
+LOG_ENTRIES = 'logs'
+LOG_SUPPRESSED_LINES = 'suppressedLines'
 
 RUNTIME_DATA_WORKING_DIRECTORY = 'workingDirectory'
 RUNTIME_DATA_RUN_COMMAND = 'runCommand'
+RUNTIME_DATA_LOCAL_RUN_COMMAND = 'localRunCommand'
+RUNTIME_DATA_BASE_IMAGE = 'baseImage'
+RUNTIME_DATA_DEPENDENCY_INSTALL_COMMAND = 'dependencyInstallCommand'
+RUNTIME_DATA_SYSTEM_PACKAGE_INSTALL_COMMAND = 'systemPackageInstallCommand'
 
 NODE_ACTION: str = 'action'
+BULK_NODE_ACTION_ALL: str = 'all'
+BULK_NODE_ACTION_NIDS: str = 'nids'
+BULK_NODE_ACTION_PROGRAM: str = 'program'
+BULK_NODE_ACTION_GROUP: str = 'group'
+BULK_NODE_ACTION_STAGGER_MILLISECONDS: str = 'staggerMilliseconds'
+BULK_NODE_ACTION_REQUESTED: str = 'requested'
+BULK_NODE_ACTION_SUCCEEDED: str = 'succeeded'
+BULK_NODE_ACTION_FAILED: str = 'failed'
+BULK_NODE_ACTION_SECONDS: str = 'seconds'
 
 STREAM_SINCE: str = 'since'
+LOG_QUERY_UNTIL: str = 'until'
+LOG_QUERY_LIMIT: str = 'limit'
+
+PROFILING_EVENT: str = 'event'
+PROFILING_INVOCATIONS: str = 'invocations'
+PROFILING_REMAINING_INVOCATIONS: str = 'remainingInvocations'
+PROFILING_COMPLETED_INVOCATIONS: str = 'completedInvocations'
+
+RESOURCE_LIMITS_CPU_SHARES: str = 'cpu_shares'
+RESOURCE_LIMITS_CPU_QUOTA: str = 'cpu_quota'
+RESOURCE_LIMITS_CPU_PERIOD: str = 'cpu_period'
+RESOURCE_LIMITS_CPUSET_CPUS: str = 'cpuset_cpus'
+RESOURCE_LIMITS_MEM_LIMIT: str = 'mem_limit'
+RESOURCE_LIMITS_PIDS_LIMIT: str = 'pids_limit'
+
+HOST_CAPACITY_CPUS: str = 'cpus'
+HOST_CAPACITY_MEMORY_BYTES: str = 'memoryBytes'
+
+RESOURCE_PLAN_NUMBER_NODES: str = 'numberNodes'
+RESOURCE_PLAN_HOST_CPUS: str = 'hostCpus'
+RESOURCE_PLAN_HOST_MEMORY_BYTES: str = 'hostMemoryBytes'
+RESOURCE_PLAN_CPU_QUOTA_DEMAND: str = 'cpuQuotaDemand'
+RESOURCE_PLAN_MEMORY_DEMAND_BYTES: str = 'memoryDemandBytes'
+RESOURCE_PLAN_NODES_WITHOUT_CPU_LIMIT: str = 'nodesWithoutCpuLimit'
+RESOURCE_PLAN_NODES_WITHOUT_MEMORY_LIMIT: str = 'nodesWithoutMemoryLimit'
+RESOURCE_PLAN_MAX_NODES_BY_MEMORY: str = 'maxNodesByMemory'
+RESOURCE_PLAN_WARNINGS: str = 'warnings'
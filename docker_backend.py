@@ -0,0 +1,276 @@
+from typing import List, Dict, Any, Tuple, Optional
+from ipaddress import IPv4Address
+import json
+import os
+import tempfile
+import threading
+
+import docker
+from docker.errors import APIError, NotFound
+from docker.models.networks import Network
+from docker.models.containers import Container
+from docker.types import IPAMConfig, IPAMPool
+from tornado.httpclient import AsyncHTTPClient
+from tornado.httputil import url_concat
+
+import dict_keys
+import constants
+from simulation_backend import SimulationBackend
+
+NETWORK_DRIVER = 'bridge'
+LATEST_TAG_SUFFIX = ':latest'
+RUNTIME_DOCKERFILE_NAME = 'Dockerfile'
+
+docker_client: Optional[docker.DockerClient] = None
+docker_api_client: Optional[docker.APIClient] = None
+docker_client_lock = threading.Lock()
+
+
+# Created on first use, so that importing this module does not need a Docker daemon. Locked as bulk node actions call
+# these from several threads.
+def get_docker_client() -> docker.DockerClient:
+    global docker_client
+    with docker_client_lock:
+        if docker_client is None:
+            docker_client = docker.from_env()
+    return docker_client
+
+
+def get_docker_api_client() -> docker.APIClient:
+    global docker_api_client
+    with docker_client_lock:
+        if docker_api_client is None:
+            docker_api_client = docker.APIClient()
+    return docker_api_client
+
+
+# The runtime's own Dockerfile with its first FROM swapped for the dependency image, so the runtime's other instructions
+# still apply. Installing the requirements again finds them already satisfied.
+def get_thin_dockerfile(path: str, dependency_image_tag: str) -> str:
+    runtime_dockerfile_path = os.path.join(path, RUNTIME_DOCKERFILE_NAME)
+    if not os.path.exists(runtime_dockerfile_path):
+        return f'FROM {dependency_image_tag}\nCOPY . .\n'
+    with open(runtime_dockerfile_path) as runtime_dockerfile:
+        lines = runtime_dockerfile.read().splitlines()
+    for index, line in enumerate(lines):
+        if line.strip().upper().startswith('FROM '):
+            lines[index] = f'FROM {dependency_image_tag}'
+            break
+    return '\n'.join(lines) + '\n'
+
+
+def get_container_run_command(runtime):
+    return constants.RUNTIME_DATA[runtime][dict_keys.RUNTIME_DATA_RUN_COMMAND]
+
+
+def get_container_working_directory(runtime):
+    return constants.RUNTIME_DATA[runtime][dict_keys.RUNTIME_DATA_WORKING_DIRECTORY]
+
+
+def get_container_run_args_file_command(runtime, link_emulation_script_path: Optional[str] = None):
+    separator_octal = f'\\{ord(constants.CONTAINER_RUN_ARGS_SEPARATOR):03o}'
+    run_command = ' '.join(get_container_run_command(runtime))
+    link_emulation_command = f'sh {link_emulation_script_path} && ' if link_emulation_script_path else ''
+    return ['sh', '-c', f'IFS=$(printf "{separator_octal}"); set -f; {link_emulation_command}'
+                        f'exec {run_command} $(cat {constants.CONTAINER_RUN_ARGS_FILE_PATH})']
+
+
+# The program only starts once its links are set up, so a node never sends over an unemulated link
+def get_container_link_emulation_command(command: List[str], link_emulation_script_path: str) -> List[str]:
+    return ['sh', '-c', f'sh {link_emulation_script_path} && exec "$@"', 'sh'] + command
+
+
+class DockerBackend(SimulationBackend):
+    def create_network(self, network_name: str, network_subnet: str, labels: Optional[Dict[str, str]] = None):
+        get_docker_client().networks.create(
+            name=network_name,
+            driver=NETWORK_DRIVER,
+            ipam=IPAMConfig(pool_configs=[IPAMPool(subnet=network_subnet)]),
+            internal=True,
+            labels=labels
+        )
+
+    def remove_network(self, network_name: str):
+        try:
+            existing_network: Network = get_docker_client().networks.get(network_name)
+            existing_network.remove()
+        except NotFound:
+            pass
+
+    def create_image(self, path: str, tag: str, dependency_image_tag: Optional[str] = None,
+                     labels: Optional[Dict[str, str]] = None):
+        if dependency_image_tag is None:
+            get_docker_client().images.build(path=path, tag=tag, rm=True, labels=labels)
+            return
+        with open(os.path.join(path, constants.GENERATED_DOCKERFILE_NAME), 'w') as dockerfile:
+            dockerfile.write(get_thin_dockerfile(path, dependency_image_tag))
+        get_docker_client().images.build(path=path, tag=tag, rm=True, dockerfile=constants.GENERATED_DOCKERFILE_NAME,
+                                         labels=labels)
+
+    def create_dependency_image(self, tag: str, runtime: str, requirements: List[str],
+                                system_packages: Optional[List[str]] = None):
+        runtime_data = constants.RUNTIME_DATA[runtime]
+        install_command = runtime_data[dict_keys.RUNTIME_DATA_DEPENDENCY_INSTALL_COMMAND] + [
+            constants.REQUIREMENTS_FILE_NAME]
+        system_package_install_line = (
+            f'RUN {json.dumps(runtime_data[dict_keys.RUNTIME_DATA_SYSTEM_PACKAGE_INSTALL_COMMAND] + system_packages)}\n'
+            if system_packages else '')
+        with tempfile.TemporaryDirectory() as build_context:
+            with open(os.path.join(build_context, constants.REQUIREMENTS_FILE_NAME), 'w') as requirements_file:
+                requirements_file.write('\n'.join(requirements))
+            with open(os.path.join(build_context, constants.GENERATED_DOCKERFILE_NAME), 'w') as dockerfile:
+                dockerfile.write(f'FROM {runtime_data[dict_keys.RUNTIME_DATA_BASE_IMAGE]}\n'
+                                 f'WORKDIR {runtime_data[dict_keys.RUNTIME_DATA_WORKING_DIRECTORY]}\n'
+                                 f'{system_package_install_line}'
+                                 f'COPY {constants.REQUIREMENTS_FILE_NAME} ./\n'
+                                 f'RUN {json.dumps(install_command)}\n')
+            get_docker_client().images.build(path=build_context, tag=tag, rm=True,
+                                             dockerfile=constants.GENERATED_DOCKERFILE_NAME)
+
+    def dependency_image_exists(self, tag: str) -> bool:
+        return self.get_image_id(tag) is not None
+
+    def resolve_base_image_id(self, tag: str) -> Optional[str]:
+        image_id = self.get_image_id(tag)
+        if image_id is None:
+            image_id = get_docker_client().images.pull(tag).id
+        return image_id
+
+    def remove_images(self, image_names: List[str]):
+        for image_name in image_names:
+            try:
+                get_docker_client().images.remove(image=image_name, force=True, noprune=False)
+            except NotFound:
+                pass
+
+    def create_container(self, image_name: str, name: str, runtime: str, run_args: List[str], ip_address: str,
+                         udp_ports: List[int], network_name: str, run_args_file_path: Optional[str] = None,
+                         labels: Optional[Dict[str, str]] = None, live_config_directory_path: Optional[str] = None,
+                         link_emulation_script_path: Optional[str] = None,
+                         resource_limits: Optional[Dict[str, Any]] = None):
+        command = get_container_run_command(runtime) + run_args
+        binds: Dict[str, Dict[str, str]] = {}
+        environment: Dict[str, str] = {}
+        capabilities: List[str] = []
+        if link_emulation_script_path:
+            command = get_container_link_emulation_command(command, link_emulation_script_path)
+            capabilities.append(constants.LINK_EMULATION_CAPABILITY)
+        if run_args_file_path:
+            command = get_container_run_args_file_command(runtime, link_emulation_script_path)
+            binds[run_args_file_path] = {'bind': constants.CONTAINER_RUN_ARGS_FILE_PATH, 'mode': 'ro'}
+        if live_config_directory_path:
+            binds[live_config_directory_path] = {'bind': constants.CONTAINER_LIVE_CONFIG_DIRECTORY_PATH, 'mode': 'ro'}
+            environment[constants.LIVE_CONFIG_DIRECTORY_ENVIRONMENT_VARIABLE] = \
+                constants.CONTAINER_LIVE_CONFIG_DIRECTORY_PATH
+        # The resource limits are named after the host config options they set
+        get_docker_api_client().create_container(
+            image_name,
+            name=name,
+            command=command,
+            detach=True,
+            working_dir=get_container_working_directory(runtime),
+            ports=[(p, 'udp') for p in udp_ports],
+            volumes=[bind['bind'] for bind in binds.values()] or None,
+            host_config=(get_docker_api_client().create_host_config(
+                binds=binds or None, cap_add=capabilities or None, **(resource_limits or {}))
+                if binds or capabilities or resource_limits else None),
+            environment=environment or None,
+            labels=labels
+        )
+        get_docker_client().networks.get(network_name).connect(name, ipv4_address=ip_address)
+
+    def remove_containers(self, container_names: List[str]):
+        for container_name in container_names:
+            try:
+                get_docker_client().containers.get(container_name).remove(force=True)
+            except NotFound:
+                pass
+
+    def action_container(self, name: str, action: str) -> Optional[str]:
+        try:
+            container: Container = get_docker_client().containers.get(name)
+            getattr(container, action)()
+        except NotFound:
+            return f'Container {name} not found'
+        except APIError as e:
+            return str(e)
+        return None
+
+    def get_container_statuses(self, names: List[str]) -> Dict[str, Any]:
+        all_containers: List[Container] = get_docker_client().containers.list(all=True)
+        return {container.name: container.status for container in all_containers if container.name in names}
+
+    def stream_container_logs(self, name: str, since):
+        AsyncHTTPClient().fetch(url_concat(f"{constants.LOGGING_SERVER_START_LOGGING_URL}/{name}",
+                                           ({dict_keys.STREAM_SINCE: since} if since else {})))
+
+    def get_node_address(self, index: int, base_ip_address: str, base_port: int) -> Tuple[str, int]:
+        return str(IPv4Address(int(IPv4Address(base_ip_address)) + index)), base_port
+
+    def list_labelled_containers(self, label: str) -> Dict[str, Dict[str, str]]:
+        return {container['Names'][0].lstrip('/'): container['Labels'] or {}
+                for container in get_docker_api_client().containers(all=True, filters={'label': label})}
+
+    # Images are listed under each of their tags, and also without the tag when it is the implicit latest
+    def list_labelled_images(self, label: str) -> Dict[str, Dict[str, str]]:
+        images: Dict[str, Dict[str, str]] = {}
+        for image in get_docker_api_client().images(filters={'label': label}):
+            for repo_tag in image['RepoTags'] or []:
+                images[repo_tag] = image['Labels'] or {}
+                if repo_tag.endswith(LATEST_TAG_SUFFIX):
+                    images[repo_tag[:-len(LATEST_TAG_SUFFIX)]] = image['Labels'] or {}
+        return images
+
+    def list_labelled_networks(self, label: str) -> Dict[str, Dict[str, str]]:
+        return {network['Name']: network['Labels'] or {}
+                for network in get_docker_api_client().networks(filters={'label': label})}
+
+    def supports_container_pool(self) -> bool:
+        return True
+
+    def get_image_id(self, tag: str) -> Optional[str]:
+        try:
+            return get_docker_client().images.get(tag).id
+        except NotFound:
+            return None
+
+    def rename_container(self, name: str, new_name: str) -> bool:
+        if name == new_name:
+            return True
+        try:
+            get_docker_client().containers.get(name).rename(new_name)
+            return True
+        except NotFound:
+            return False
+
+    # Pooled containers are started again for their next run, so are killed rather than stopped, which would wait for
+    # node programs running as PID 1, that ignore SIGTERM, to time out one container after another
+    def stop_containers(self, container_names: List[str]):
+        for container_name in container_names:
+            try:
+                get_docker_client().containers.get(container_name).kill()
+            except NotFound:
+                pass
+            except APIError as e:
+                # Killing a container that has already exited is a conflict
+                if e.status_code != 409:
+                    raise
+
+    def supports_link_emulation(self) -> bool:
+        return True
+
+    def run_in_container(self, name: str, command: List[str]) -> Optional[str]:
+        try:
+            exit_code, output = get_docker_client().containers.get(name).exec_run(command)
+        except NotFound:
+            return f'Container {name} not found'
+        except APIError as e:
+            return str(e)
+        if exit_code != 0:
+            return output.decode('utf-8', errors='replace').strip() or f'Exited with code {exit_code}'
+        return None
+
+    # The Docker daemon may be on another machine, such as the VM of Docker Desktop
+    def get_host_capacity(self) -> Dict[str, Any]:
+        info = get_docker_client().info()
+        return {dict_keys.HOST_CAPACITY_CPUS: info['NCPU'], dict_keys.HOST_CAPACITY_MEMORY_BYTES: info['MemTotal']}
@@ -1,78 +1,138 @@
-from typing import List, Dict, Any
-
-import docker
-from docker.errors import APIError, NotFound
-from docker.models.networks import Network
-from docker.models.containers import Container
-from docker.types import IPAMConfig, IPAMPool
-from tornado.httpclient import AsyncHTTPClient
-from tornado.httputil import url_concat
+from typing import List, Dict, Any, Tuple, Optional
+import os
 
 import dict_keys
 import constants
+import metrics
+from simulation_backend import SimulationBackend
+
+backend: SimulationBackend = None
 
-NETWORK_DRIVER = 'bridge'
 
-DOCKER_CLIENT = docker.from_env()
-DOCKER_API_CLIENT = docker.APIClient()
+def create_backend(backend_name: str) -> SimulationBackend:
+    if backend_name == constants.LOCAL_PROCESS_SIMULATION_BACKEND:
+        from local_process_backend import LocalProcessBackend
+        return LocalProcessBackend()
+    from docker_backend import DockerBackend
+    return DockerBackend()
 
 
-def get_container_run_command(runtime):
-    return constants.RUNTIME_DATA[runtime][dict_keys.RUNTIME_DATA_RUN_COMMAND]
+def get_backend() -> SimulationBackend:
+    global backend
+    if backend is None:
+        backend = create_backend(os.environ.get(constants.SIMULATION_BACKEND_ENVIRONMENT_VARIABLE,
+                                                constants.DEFAULT_SIMULATION_BACKEND))
+    return backend
 
 
-def get_container_working_directory(runtime):
-    return constants.RUNTIME_DATA[runtime][dict_keys.RUNTIME_DATA_WORKING_DIRECTORY]
+def set_backend(new_backend: SimulationBackend):
+    global backend
+    backend = new_backend
 
 
 def remove_network(network_id: str):
-    try:
-        existing_network: Network = DOCKER_CLIENT.networks.get(network_id)
-        existing_network.remove()
-    except NotFound:
-        pass
+    with metrics.DOCKER_INTERFACE_CALL_SECONDS.time('remove_network'):
+        get_backend().remove_network(network_id)
 
 
 def remove_containers(container_ids: List[str]):
-    for container_id in container_ids:
-        try:
-            DOCKER_CLIENT.containers.get(container_id).remove(force=True)
-        except NotFound:
-            pass
+    with metrics.DOCKER_INTERFACE_CALL_SECONDS.time('remove_containers'):
+        get_backend().remove_containers(container_ids)
 
 
 def remove_images(image_names: List[str]):
-    for image_name in image_names:
-        try:
-            DOCKER_CLIENT.images.remove(image=image_name, force=True, noprune=False)
-        except NotFound:
-            pass
+    with metrics.DOCKER_INTERFACE_CALL_SECONDS.time('remove_images'):
+        get_backend().remove_images(image_names)
+
+
+def create_image(path, tag: str, dependency_image_tag: Optional[str] = None, labels: Optional[Dict[str, str]] = None):
+    with metrics.DOCKER_INTERFACE_CALL_SECONDS.time('create_image'):
+        get_backend().create_image(path, tag, dependency_image_tag, labels)
+
+
+def create_dependency_image(tag: str, runtime: str, requirements: List[str],
+                            system_packages: Optional[List[str]] = None):
+    with metrics.DOCKER_INTERFACE_CALL_SECONDS.time('create_dependency_image'):
+        get_backend().create_dependency_image(tag, runtime, requirements, system_packages)
+
+
+def resolve_base_image_id(tag: str) -> Optional[str]:
+    with metrics.DOCKER_INTERFACE_CALL_SECONDS.time('resolve_base_image_id'):
+        return get_backend().resolve_base_image_id(tag)
 
 
-def create_image(path, tag: str):
-    DOCKER_CLIENT.images.build(path=path, tag=tag, rm=True)
+def dependency_image_exists(tag: str) -> bool:
+    with metrics.DOCKER_INTERFACE_CALL_SECONDS.time('dependency_image_exists'):
+        return get_backend().dependency_image_exists(tag)
 
 
-def create_network(network_name: str, network_subnet):
-    DOCKER_CLIENT.networks.create(
-        name=network_name,
-        driver=NETWORK_DRIVER,
-        ipam=IPAMConfig(pool_configs=[IPAMPool(subnet=network_subnet)]),
-        internal=True
-    )
+def create_network(network_name: str, network_subnet, labels: Optional[Dict[str, str]] = None):
+    with metrics.DOCKER_INTERFACE_CALL_SECONDS.time('create_network'):
+        get_backend().create_network(network_name, network_subnet, labels)
 
 
 def create_container_and_connect(program_name: str, name: str, runtime: str, run_args: List, ip_address: str,
-                                 udp_ports: List, network_name: str):
-    DOCKER_API_CLIENT.create_container(
-        program_name,
-        name=name,
-        command=get_container_run_command(runtime) + run_args,
-        detach=True,
-        working_dir=get_container_working_directory(runtime),
-        ports=[(p, 'udp') for p in udp_ports]
-    )
-    DOCKER_CLIENT.networks.get(network_name).connect(name, ipv4_address=ip_address)
+                                 udp_ports: List, network_name: str, run_args_file_path: Optional[str] = None,
+                                 labels: Optional[Dict[str, str]] = None,
+                                 live_config_directory_path: Optional[str] = None,
+                                 link_emulation_script_path: Optional[str] = None,
+                                 resource_limits: Optional[Dict[str, Any]] = None):
+    with metrics.DOCKER_INTERFACE_CALL_SECONDS.time('create_container_and_connect'):
+        get_backend().create_container(program_name, name, runtime, run_args, ip_address, udp_ports, network_name,
+                                       run_args_file_path, labels, live_config_directory_path,
+                                       link_emulation_script_path, resource_limits)
+
+
+def list_labelled_containers(label: str) -> Dict[str, Dict[str, str]]:
+    with metrics.DOCKER_INTERFACE_CALL_SECONDS.time('list_labelled_containers'):
+        return get_backend().list_labelled_containers(label)
+
+
+def list_labelled_images(label: str) -> Dict[str, Dict[str, str]]:
+    with metrics.DOCKER_INTERFACE_CALL_SECONDS.time('list_labelled_images'):
+        return get_backend().list_labelled_images(label)
+
+
+def list_labelled_networks(label: str) -> Dict[str, Dict[str, str]]:
+    with metrics.DOCKER_INTERFACE_CALL_SECONDS.time('list_labelled_networks'):
+        return get_backend().list_labelled_networks(label)
+
+
+def supports_container_pool() -> bool:
+    return get_backend().supports_container_pool()
+
+
+def supports_link_emulation() -> bool:
+    return get_backend().supports_link_emulation()
+
+
+def run_in_container(name: str, command: List[str]) -> Optional[str]:
+    with metrics.DOCKER_INTERFACE_CALL_SECONDS.time('run_in_container'):
+        return get_backend().run_in_container(name, command)
+
+
+def get_host_capacity() -> Dict[str, Any]:
+    with metrics.DOCKER_INTERFACE_CALL_SECONDS.time('get_host_capacity'):
+        return get_backend().get_host_capacity()
+
+
+def get_image_id(tag: str) -> Optional[str]:
+    with metrics.DOCKER_INTERFACE_CALL_SECONDS.time('get_image_id'):
+        return get_backend().get_image_id(tag)
+
+
+def rename_container(name: str, new_name: str) -> bool:
+    with metrics.DOCKER_INTERFACE_CALL_SECONDS.time('rename_container'):
+        return get_backend().rename_container(name, new_name)
+
+
+def stop_containers(container_names: List[str]):
+    with metrics.DOCKER_INTERFACE_CALL_SECONDS.time('stop_containers'):
+        get_backend().stop_containers(container_names)
+
+
+def get_node_address(index: int, base_ip_address: str, base_port: int) -> Tuple[str, int]:
+    return get_backend().get_node_address(index, base_ip_address, base_port)
 
 
 def parse_log(log_bytes_string: bytes) -> List[Dict[str, str]]:
@@ -92,20 +152,15 @@ def parse_log(log_bytes_string: bytes) -> List[Dict[str, str]]:
 
 
 def get_container_statuses(names: List[str]) -> Dict[str, Any]:
-    all_containers: List[Container] = DOCKER_CLIENT.containers.list(all=True)
-    return {container.name: container.status for container in all_containers if container.name in names}
+    with metrics.DOCKER_INTERFACE_CALL_SECONDS.time('get_container_statuses'):
+        return get_backend().get_container_statuses(names)
 
 
-def action_container(name: str, action: str):
-    try:
-        container: Container = DOCKER_CLIENT.containers.get(name)
-        getattr(container, action)()
-    except NotFound:
-        pass
-    except APIError:
-        pass
+def action_container(name: str, action: str) -> Optional[str]:
+    with metrics.DOCKER_INTERFACE_CALL_SECONDS.time('action_container'):
+        return get_backend().action_container(name, action)
 
 
 def stream_container_logs(name: str, since):
-    AsyncHTTPClient().fetch(url_concat(f"{constants.LOGGING_SERVER_START_LOGGING_URL}/{name}",
-                                       ({dict_keys.STREAM_SINCE: since} if since else {})))
+    with metrics.DOCKER_INTERFACE_CALL_SECONDS.time('stream_container_logs'):
+        get_backend().stream_container_logs(name, since)
@@ -0,0 +1,121 @@
+from typing import List, Tuple
+
+import numpy as np
+
+import constants
+
+# Edges are a pair of arrays of node indices, sources and targets. Generators may return self-loops and duplicate or
+# reversed edges, which get_adjacency drops.
+Edges = Tuple[np.ndarray, np.ndarray]
+
+
+def get_grid_edges(number_rows: int, number_columns: int, is_wrapped: bool) -> Edges:
+    indices = np.arange(number_rows * number_columns, dtype=np.int64).reshape(number_rows, number_columns)
+    sources = [indices[:, :-1].ravel(), indices[:-1, :].ravel()]
+    targets = [indices[:, 1:].ravel(), indices[1:, :].ravel()]
+    # Wrapping a row or column of one or two nodes would only add self-loops or repeat an edge
+    if is_wrapped and number_columns > 2:
+        sources.append(indices[:, -1])
+        targets.append(indices[:, 0])
+    if is_wrapped and number_rows > 2:
+        sources.append(indices[-1, :])
+        targets.append(indices[0, :])
+    return np.concatenate(sources), np.concatenate(targets)
+
+
+# Gives the row and column of each linear index into the upper triangle of an n by n matrix, read row by row
+def get_upper_triangle_pairs(linear_indices: np.ndarray, number_nodes: int) -> Edges:
+    n = number_nodes
+    rows = (n - 2 - np.floor(np.sqrt(-8.0 * linear_indices + 4.0 * n * (n - 1) - 7) / 2 - 0.5)).astype(np.int64)
+    # The square root can be off by one for large n, so each row is checked against where it starts
+    row_starts = rows * (2 * n - rows - 1) // 2
+    rows -= linear_indices < row_starts
+    rows += linear_indices >= (rows + 1) * (2 * n - rows - 2) // 2
+    row_starts = rows * (2 * n - rows - 1) // 2
+    return rows, linear_indices - row_starts + rows + 1
+
+
+# Erdős–Rényi G(n, p): the number of edges is drawn first and then that many distinct pairs, so the n^2 possible
+# pairs are never enumerated
+def get_random_edges(number_nodes: int, connection_probability: float, rng: np.random.Generator) -> Edges:
+    number_pairs = number_nodes * (number_nodes - 1) // 2
+    if number_pairs == 0:
+        return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.int64)
+    number_edges = rng.binomial(number_pairs, connection_probability)
+    linear_indices = rng.choice(number_pairs, size=number_edges, replace=False, shuffle=False).astype(np.int64)
+    return get_upper_triangle_pairs(linear_indices, number_nodes)
+
+
+# Watts–Strogatz: a ring lattice with each node joined to its number_neighbours // 2 nearest nodes on either side,
+# then each edge's target rewired with the given probability. Rewired edges that land on their source or repeat an
+# edge are drawn again a bounded number of times and otherwise dropped.
+def get_small_world_edges(number_nodes: int, number_neighbours: int, rewiring_probability: float,
+                          rng: np.random.Generator) -> Edges:
+    half_neighbours = number_neighbours // 2
+    sources = np.repeat(np.arange(number_nodes, dtype=np.int64), half_neighbours)
+    targets = (sources + np.tile(np.arange(1, half_neighbours + 1, dtype=np.int64), number_nodes)) % number_nodes
+    to_rewire = np.flatnonzero(rng.random(sources.size) < rewiring_probability)
+    for _ in range(constants.SMALL_WORLD_REWIRING_ATTEMPTS):
+        if to_rewire.size == 0:
+            break
+        targets[to_rewire] = rng.integers(0, number_nodes, to_rewire.size)
+        _, first_occurrences = np.unique(get_edge_keys(sources, targets, number_nodes), return_index=True)
+        is_repeated = np.ones(sources.size, dtype=bool)
+        is_repeated[first_occurrences] = False
+        to_rewire = to_rewire[(sources[to_rewire] == targets[to_rewire]) | is_repeated[to_rewire]]
+    return sources, targets
+
+
+# Barabási–Albert preferential attachment, by Batagelj and Brandes' method: edge e records its source node and a
+# uniformly drawn earlier entry, whose node is its target. An entry's node is found by following the references back to
+# a source entry, which is done for all edges at once by pointer jumping. Self-loops and repeated edges are dropped, so
+# nodes can have slightly fewer than number_attachments edges.
+def get_barabasi_albert_edges(number_nodes: int, number_attachments: int, rng: np.random.Generator) -> Edges:
+    number_edges = number_nodes * number_attachments
+    edge_indices = np.arange(number_edges, dtype=np.int64)
+    sources = edge_indices // number_attachments
+    entries = (rng.random(number_edges) * (2 * edge_indices + 1)).astype(np.int64)
+    is_source_entry = entries % 2 == 0
+    targets = np.where(is_source_entry, entries // 2 // number_attachments, 0)
+    references = np.where(is_source_entry, -1, (entries - 1) // 2)
+    pending = np.flatnonzero(references >= 0)
+    while pending.size > 0:
+        referenced = references[pending]
+        targets[pending] = targets[referenced]
+        references[pending] = references[referenced]
+        pending = pending[references[pending] >= 0]
+    return sources, targets
+
+
+def get_edge_keys(sources: np.ndarray, targets: np.ndarray, number_nodes: int) -> np.ndarray:
+    return np.minimum(sources, targets) * number_nodes + np.maximum(sources, targets)
+
+
+# Returns each node's neighbours in compressed sparse row form: node i's neighbours are
+# neighbours[offsets[i]:offsets[i + 1]], in ascending order
+def get_adjacency(edges: Edges, number_nodes: int) -> Tuple[List[int], List[int]]:
+    sources, targets = edges
+    is_loop = sources == targets
+    keys = np.unique(get_edge_keys(sources[~is_loop], targets[~is_loop], number_nodes))
+    low, high = keys // number_nodes, keys % number_nodes
+    directed_keys = np.sort(np.concatenate([low * number_nodes + high, high * number_nodes + low]))
+    offsets = np.zeros(number_nodes + 1, dtype=np.int64)
+    np.cumsum(np.bincount(directed_keys // number_nodes, minlength=number_nodes), out=offsets[1:])
+    return offsets.tolist(), (directed_keys % number_nodes).tolist()
+
+
+def generate_adjacency(group_type: str, number_nodes: int, seed: int, number_rows: int = 0, number_columns: int = 0,
+                       connection_probability: float = 0, number_neighbours: int = 0,
+                       rewiring_probability: float = 0, number_attachments: int = 0) -> Tuple[List[int], List[int]]:
+    rng = np.random.default_rng(seed)
+    if group_type in ['grid', 'torus']:
+        edges = get_grid_edges(number_rows, number_columns, group_type == 'torus')
+    elif group_type == 'random':
+        edges = get_random_edges(number_nodes, connection_probability, rng)
+    elif group_type == 'small_world':
+        edges = get_small_world_edges(number_nodes, number_neighbours, rewiring_probability, rng)
+    elif group_type == 'barabasi_albert':
+        edges = get_barabasi_albert_edges(number_nodes, number_attachments, rng)
+    else:
+        raise ValueError(f'Unknown generated group type {group_type}')
+    return get_adjacency(edges, number_nodes)
@@ -1,13 +1,24 @@
+import itertools
 import json
 from typing import List
 
 import tornado.web
+from tornado.ioloop import IOLoop
 
 import network_topology
 import programs
+import simulation
+import constants
 import dict_keys
 import ws_events
-from WSHandler import WSHandler
+import metrics
+import ws_instrumentation
+import log_store
+import log_rate_limiter
+import topology_worker
+import topology_binary
+import custom_config
+from WSHandler import WSHandler, make_simulation_send_func, start_ws_event_profiling
 
 
 class GeneralHTTPHandler(tornado.web.RequestHandler):
@@ -36,30 +47,191 @@ class ZipFileUploadHandler(GeneralHTTPHandler):
         self.write('Upload successful')
 
 
+def store_and_send_logs(simulation_id: str, logging_message):
+    if isinstance(logging_message, dict) and isinstance(logging_message.get(dict_keys.LOG_ENTRIES), list):
+        log_store.append(simulation_id, logging_message[dict_keys.NODE_NID], logging_message[dict_keys.LOG_ENTRIES])
+    make_simulation_send_func(simulation_id, WSHandler.send_message)(ws_events.SIMULATION_LOGS, logging_message)
+
+
+# Sent as log entries of the nodes whose lines were suppressed, so clients see them alongside those nodes' logs
+def send_log_suppression_summaries():
+    for simulation_id, nid, summary_entry in log_rate_limiter.get_limiter().take_suppression_summaries():
+        store_and_send_logs(simulation_id, {dict_keys.NODE_NID: nid, dict_keys.LOG_ENTRIES: [summary_entry]})
+
+
 class LoggingMessageHandler(GeneralHTTPHandler):
+    # Lines over a node's rate limit are dropped before they are stored or sent, and a message left with no lines is
+    # not sent at all. Responds with 400 if a batch of entries has no nid to store them under, or the nid is not a
+    # string.
     def post(self):
-        WSHandler.send_message(ws_events.SIMULATION_LOGS, json.loads(self.request.body))
+        logging_message = json.loads(self.request.body)
+        metrics.LOG_LINES_INGESTED.inc(len(logging_message.get(dict_keys.LOG_ENTRIES, [None]))
+                                       if isinstance(logging_message, dict) else 1)
+        has_entries = isinstance(logging_message, dict) and isinstance(logging_message.get(dict_keys.LOG_ENTRIES), list)
+        if ((has_entries or isinstance(logging_message, dict) and dict_keys.NODE_NID in logging_message)
+                and not isinstance(logging_message.get(dict_keys.NODE_NID), str)):
+            raise tornado.web.HTTPError(400, f'{dict_keys.NODE_NID} must be a string')
+        simulation_id = constants.DEFAULT_SIMULATION_ID
+        if isinstance(logging_message, dict) and dict_keys.NODE_NID in logging_message:
+            simulation_id, logging_message[dict_keys.NODE_NID] = simulation.split_container_name(
+                logging_message[dict_keys.NODE_NID])
+            if isinstance(logging_message.get(dict_keys.LOG_ENTRIES), list):
+                logging_message[dict_keys.LOG_ENTRIES] = log_rate_limiter.get_limiter().admit(
+                    simulation_id, logging_message[dict_keys.NODE_NID], logging_message[dict_keys.LOG_ENTRIES])
+                if not logging_message[dict_keys.LOG_ENTRIES]:
+                    return
+        store_and_send_logs(simulation_id, logging_message)
+
+
+class ExportNetworkTopologyHandler(GeneralHTTPHandler):
+    # Returns the unpacked topology and its connection parameters in the binary topology format
+    def get(self):
+        self.set_header('Content-Type', constants.TOPOLOGY_BINARY_CONTENT_TYPE)
+        self.set_header('Content-Disposition', 'attachment; filename="topology.msgpack"')
+        self.write(topology_binary.encode_unpacked_topology(network_topology.get_unpacked_network_topology(),
+                                                            network_topology.get_connection_parameters()))
+
+
+class ImportNetworkTopologyHandler(GeneralHTTPHandler):
+    # Saves an unpacked topology in the binary topology format in place of the raw topology, whose code is cleared and
+    # whose language is reset. Responds as SaveNetworkTopologyHandler does, or with 400 if the body is not in the
+    # format or its connection parameters are not in the sparse form. Each node is validated as a single node is, so
+    # its connections must be to nodes in the topology.
+    def post(self):
+        try:
+            unpacked_topology, connection_parameters = topology_binary.decode_unpacked_topology(self.request.body)
+        except topology_binary.TopologyFormatException as e:
+            raise tornado.web.HTTPError(400, str(e))
+        if connection_parameters is not None and not network_topology.is_valid_connection_parameters(
+                connection_parameters):
+            raise tornado.web.HTTPError(400, 'The connection parameters are not in the sparse form')
+        errors: List[dict] = []
+        nids: List[str] = []
+        connection_nids: List[str] = []
+        network_topology.validate_single_nodes(unpacked_topology, errors, nids, connection_nids)
+        network_topology.validate_nids(nids, connection_nids, errors)
+        if len(errors) > 0:
+            self.write({'isValidAndSaved': False, 'errorMessage': errors[0][dict_keys.NETWORK_TOPOLOGY_ERROR_MESSAGE],
+                        'errorData': errors[0][dict_keys.NETWORK_TOPOLOGY_ERROR_DATA],
+                        'errors': errors[:network_topology.MAX_REPORTED_VALIDATION_ERRORS]})
+            return
+        network_topology.save_raw_network_topology_code('')
+        network_topology.save_raw_network_topology_language(constants.DEFAULT_RAW_NETWORK_TOPOLOGY_LANGUAGE)
+        network_topology.save_unpacked_network_topology(unpacked_topology)
+        # Without the raw topology, a self-connection is only known to be explicit if nodes are not all self-connected
+        network_topology.save_explicitly_self_connected_nids(
+            [] if custom_config.get_custom_config()[dict_keys.CUSTOM_CONFIG_SELF_CONNECTED_NODES] else
+            [node[dict_keys.NODE_NID] for node in unpacked_topology
+             if node[dict_keys.NODE_NID] in node[dict_keys.NODE_CONNECTIONS]])
+        if connection_parameters is not None:
+            network_topology.save_connection_parameters(connection_parameters)
+        else:
+            network_topology.save_initial_connection_parameters()
+        self.write({'isValidAndSaved': True, 'unpackedTopology': unpacked_topology,
+                    'connectionParameters': network_topology.get_expanded_connection_parameters()})
+
+
+class LogQueryHandler(GeneralHTTPHandler):
+    # Streams the simulation's stored log entries as newline-delimited json, oldest segment first. The nid query
+    # argument can be repeated to select nodes, and since and until are in seconds since the epoch.
+    async def get(self, simulation_id: str):
+        try:
+            simulation.validate_simulation_id(simulation_id)
+        except simulation.SimulationIdException as e:
+            raise tornado.web.HTTPError(400, str(e))
+        nids = self.get_query_arguments(dict_keys.NODE_NID) or None
+        try:
+            since, until, limit = [None if value is None else convert(value) for value, convert in [
+                (self.get_query_argument(dict_keys.STREAM_SINCE, None), float),
+                (self.get_query_argument(dict_keys.LOG_QUERY_UNTIL, None), float),
+                (self.get_query_argument(dict_keys.LOG_QUERY_LIMIT, None), int)]]
+        except ValueError as e:
+            raise tornado.web.HTTPError(400, str(e))
+        self.set_header('Content-Type', 'application/x-ndjson')
+        lines = log_store.query(simulation_id, nids, since, until)
+        lines_written = 0
+        # The segments are read on the default executor, a batch of lines at a time, so the IOLoop keeps serving
+        while limit is None or lines_written < limit:
+            batch_size = constants.LOG_STORE_QUERY_FLUSH_LINES
+            if limit is not None:
+                batch_size = min(batch_size, limit - lines_written)
+            batch = await IOLoop.current().run_in_executor(None, lambda: list(itertools.islice(lines, batch_size)))
+            if not batch:
+                break
+            self.write(b''.join(batch))
+            lines_written += len(batch)
+            await self.flush()
+
+
+class WsEventProfileHandler(GeneralHTTPHandler):
+    # With no event, lists the profiles. Otherwise returns the event's profile as a pstats dump, or as text if the
+    # format query argument is text.
+    def get(self, event: str):
+        if not event:
+            self.write({'profiles': ws_instrumentation.get_profiles()})
+            return
+        if event not in ws_instrumentation.profiles:
+            raise tornado.web.HTTPError(404)
+        profile = ws_instrumentation.profiles[event]
+        if self.get_query_argument('format', None) == 'text':
+            self.set_header('Content-Type', 'text/plain; charset=utf-8')
+            self.write(profile.get_stats_text())
+        else:
+            self.set_header('Content-Type', 'application/octet-stream')
+            self.set_header('Content-Disposition', f'attachment; filename="{event}.prof"')
+            self.write(profile.get_stats_dump())
+
+    # Profiles the next invocations of the event, given by the invocations query argument. Responds with 400 if the
+    # event is not a WebSocket event or invocations is not a positive integer.
+    def post(self, event: str):
+        try:
+            start_ws_event_profiling(event, int(self.get_query_argument(dict_keys.PROFILING_INVOCATIONS, '1')))
+        except ValueError as e:
+            raise tornado.web.HTTPError(400, str(e))
+        except ws_instrumentation.ProfilingRequestException as e:
+            raise tornado.web.HTTPError(400, f'{e.message}: {e.data}')
+        self.write({'profiles': ws_instrumentation.get_profiles()})
+
+
+class MetricsHandler(GeneralHTTPHandler):
+    def get(self):
+        self.set_header('Content-Type', 'text/plain; version=0.0.4; charset=utf-8')
+        self.write(metrics.render())
 
 
 class SaveNetworkTopologyHandler(GeneralHTTPHandler):
     # Returns a json object of either:
     # - { isValidAndSaved: true, unpackedTopology: list of objects }
-    # - { isValidAndSaved: false, errorMessage: str }
-    def post(self):
+    # - { isValidAndSaved: true, unpackedTopologyPage: first page object } if the request has a pageSize
+    # - { isValidAndSaved: false, errorMessage: str, errorData, errors: list of { errorMessage, errorData } }
+    # Responds with 400 if the pageSize is not an integer.
+    # Validation fails with NT_ERROR_TIMEOUT if the topology took too long to unpack, NT_ERROR_WORKER_DIED if the
+    # process unpacking it died, or NT_ERROR_SUPERSEDED if another save, from any client, started before it finished
+    async def post(self):
         body = json.loads(self.request.body)
         language: str = body['language']
         raw_network_topology: str = body['rawNetworkTopology']
-        validation_result = network_topology.validate_raw_topology(language, raw_network_topology)
+        if type(body.get(dict_keys.NETWORK_TOPOLOGY_PAGE_SIZE, 0)) != int:
+            raise tornado.web.HTTPError(400, f'{dict_keys.NETWORK_TOPOLOGY_PAGE_SIZE} must be an integer')
+        result = await topology_worker.validate_and_unpack_raw_topology_in_worker(language, raw_network_topology)
+        validation_result = result[dict_keys.NETWORK_TOPOLOGY_VALIDATION_RESULT]
         if validation_result[dict_keys.NETWORK_TOPOLOGY_IS_VALID]:
-            topology = validation_result[dict_keys.NETWORK_TOPOLOGY_TOPOLOGY]
-            unpacked_topology: List[dict] = network_topology.unpack_topology(topology)
+            unpacked_topology: List[dict] = result[dict_keys.NETWORK_TOPOLOGY_UNPACKED_TOPOLOGY]
             network_topology.save_raw_network_topology_code(raw_network_topology)
             network_topology.save_unpacked_network_topology(unpacked_topology)
             network_topology.save_raw_network_topology_language(language)
+            network_topology.save_explicitly_self_connected_nids(
+                result[dict_keys.NETWORK_TOPOLOGY_EXPLICITLY_SELF_CONNECTED_NIDS])
             network_topology.save_initial_connection_parameters()
-            self.write({'isValidAndSaved': True, 'unpackedTopology': unpacked_topology,
-                        'connectionParameters': network_topology.get_connection_parameters()})
+            if dict_keys.NETWORK_TOPOLOGY_PAGE_SIZE in body:
+                self.write({'isValidAndSaved': True,
+                            'unpackedTopologyPage': network_topology.get_unpacked_network_topology_page(
+                                0, body[dict_keys.NETWORK_TOPOLOGY_PAGE_SIZE])})
+            else:
+                self.write({'isValidAndSaved': True, 'unpackedTopology': unpacked_topology,
+                            'connectionParameters': network_topology.get_expanded_connection_parameters()})
         else:
             self.write(
                 {'isValidAndSaved': False, 'errorMessage': validation_result[dict_keys.NETWORK_TOPOLOGY_ERROR_MESSAGE],
-                 'errorData': validation_result[dict_keys.NETWORK_TOPOLOGY_ERROR_DATA]})
+                 'errorData': validation_result[dict_keys.NETWORK_TOPOLOGY_ERROR_DATA],
+                 'errors': validation_result[dict_keys.NETWORK_TOPOLOGY_ERRORS]})
@@ -0,0 +1,141 @@
+from typing import List, Dict, Any, Optional, Tuple
+import os
+import posixpath
+import shlex
+
+import constants
+import dict_keys
+import docker_interface
+import live_config
+
+# What user-space emulation is left to do on a link that netem emulates
+NEUTRAL_CONNECTION_PARAMETERS: Dict[str, Any] = {
+    dict_keys.NODE_CONNECTIONS_PARAMETERS_SUCCESS_RATE: 1,
+    dict_keys.NODE_CONNECTIONS_PARAMETERS_DELAY_DISTRIBUTION: 'fixed',
+    dict_keys.NODE_CONNECTIONS_PARAMETERS_DELAY_DISTRIBUTION_PARAMETERS: {'value': 0}
+}
+
+# The first class id under the root qdisc, which has handle 1:
+FIRST_NETEM_CLASS_MINOR: int = 2
+
+
+def is_enabled() -> bool:
+    return (os.environ.get(constants.LINK_EMULATION_ENVIRONMENT_VARIABLE, constants.DEFAULT_LINK_EMULATION).lower()
+            == constants.NETEM_LINK_EMULATION and docker_interface.supports_link_emulation())
+
+
+# Named after the node's ip address rather than its nid, so a pooled container keeps running the script for its slot
+def get_script_file_name(ip_address: str) -> str:
+    return f'{constants.LINK_EMULATION_SCRIPT_FILE_PREFIX}{ip_address}{constants.LINK_EMULATION_SCRIPT_FILE_EXTENSION}'
+
+
+def format_delay(milliseconds: float) -> str:
+    return f'{milliseconds:g}{constants.NETEM_DELAY_UNIT}'
+
+
+def get_netem_delay_arguments(delay_distribution: str, delay_distribution_parameters: Dict[str, Any]) \
+        -> Optional[List[str]]:
+    try:
+        if delay_distribution == 'fixed':
+            value = float(delay_distribution_parameters['value'])
+            return None if value < 0 else ['delay', format_delay(value)] if value > 0 else []
+        if delay_distribution == 'uniform':
+            low, high = float(delay_distribution_parameters['min']), float(delay_distribution_parameters['max'])
+            if low < 0 or high < low:
+                return None
+            return ['delay', format_delay((low + high) / 2), format_delay((high - low) / 2)] if high > 0 else []
+        if delay_distribution == 'normal':
+            mean = float(delay_distribution_parameters['mean'])
+            standard_deviation = float(delay_distribution_parameters['standardDeviation'])
+            if mean < 0 or standard_deviation < 0:
+                return None
+            return ['delay', format_delay(mean), format_delay(standard_deviation), 'distribution', 'normal']
+    except (KeyError, TypeError, ValueError):
+        return None
+    return None
+
+
+# Returns the netem options that emulate these connection parameters, or None if netem cannot emulate them, in which
+# case the link is left to user-space emulation
+def get_netem_arguments(connection_parameters: Dict[str, Any]) -> Optional[List[str]]:
+    delay_arguments = get_netem_delay_arguments(
+        connection_parameters.get(dict_keys.NODE_CONNECTIONS_PARAMETERS_DELAY_DISTRIBUTION, 'fixed'),
+        connection_parameters.get(dict_keys.NODE_CONNECTIONS_PARAMETERS_DELAY_DISTRIBUTION_PARAMETERS, {'value': 0}))
+    if delay_arguments is None:
+        return None
+    try:
+        success_rate = float(connection_parameters.get(dict_keys.NODE_CONNECTIONS_PARAMETERS_SUCCESS_RATE, 1))
+    except (TypeError, ValueError):
+        return None
+    if not 0 <= success_rate <= 1:
+        return None
+    loss_arguments = ['loss', f'{(1 - success_rate) * 100:g}%'] if success_rate < 1 else []
+    return delay_arguments + loss_arguments
+
+
+# A node's messages to itself never leave the container, so only links to other nodes can be emulated by netem
+def is_emulated(nid: str, peer_nid: str, connection_parameters: Dict[str, Any]) -> bool:
+    return nid != peer_nid and get_netem_arguments(connection_parameters) is not None
+
+
+def get_user_space_connection_parameters_by_node(
+        connection_parameters_by_node: Dict[str, Dict[str, Dict[str, Any]]]) -> Dict[str, Dict[str, Dict[str, Any]]]:
+    return {
+        nid: {peer_nid: NEUTRAL_CONNECTION_PARAMETERS if is_emulated(nid, peer_nid, connection_parameters)
+              else connection_parameters
+              for peer_nid, connection_parameters in node_connection_parameters.items()}
+        for nid, node_connection_parameters in connection_parameters_by_node.items()
+    }
+
+
+# Links with the same parameters share one htb class and netem qdisc, and packets are sorted into classes by their
+# destination address. Traffic that matches no filter, such as to unemulated links, bypasses the classes.
+def generate_script(nid: str, ip_address: str, node_connection_parameters: Dict[str, Dict[str, Any]],
+                    ip_addresses: Dict[str, str]) -> str:
+    peer_ip_addresses_by_arguments: Dict[Tuple[str, ...], List[str]] = {}
+    for peer_nid, connection_parameters in sorted(node_connection_parameters.items()):
+        if peer_nid not in ip_addresses or not is_emulated(nid, peer_nid, connection_parameters):
+            continue
+        arguments = tuple(get_netem_arguments(connection_parameters))
+        if arguments:
+            peer_ip_addresses_by_arguments.setdefault(arguments, []).append(ip_addresses[peer_nid])
+    lines = [
+        '#!/bin/sh',
+        f'# Link emulation for {nid}, generated by the server',
+        'set -e',
+        f'DEV=$(ip -o -4 addr show | awk -v address={shlex.quote(ip_address)} '
+        '\'index($4, address "/") == 1 {print $2}\')',
+        f'if [ -z "$DEV" ]; then echo "No interface has address {ip_address}" >&2; exit 1; fi',
+        'tc qdisc del dev "$DEV" root 2>/dev/null || true'
+    ]
+    if peer_ip_addresses_by_arguments:
+        lines.append('tc qdisc add dev "$DEV" root handle 1: htb')
+    for index, (arguments, peer_ip_addresses) in enumerate(peer_ip_addresses_by_arguments.items()):
+        minor = f'{FIRST_NETEM_CLASS_MINOR + index:x}'
+        lines.append(f'tc class add dev "$DEV" parent 1: classid 1:{minor} htb rate {constants.NETEM_CLASS_RATE}')
+        lines.append(f'tc qdisc add dev "$DEV" parent 1:{minor} handle {minor}: netem {" ".join(arguments)}')
+        lines.extend(f'tc filter add dev "$DEV" protocol ip parent 1: prio 1 u32 match ip dst {peer_ip_address}/32 '
+                     f'flowid 1:{minor}' for peer_ip_address in peer_ip_addresses)
+    return '\n'.join(lines) + '\n'
+
+
+# Writes each node's script to the simulation's live config directory and returns the nids whose scripts changed
+def publish_scripts(simulation_id: str, connection_parameters_by_node: Dict[str, Dict[str, Dict[str, Any]]],
+                    ip_addresses: Dict[str, str]) -> List[str]:
+    file_names_to_nids = {get_script_file_name(ip_addresses[nid]): nid for nid in connection_parameters_by_node
+                          if nid in ip_addresses}
+    changed_file_names = live_config.publish(simulation_id, {
+        file_name: generate_script(nid, ip_addresses[nid], connection_parameters_by_node[nid],
+                                   ip_addresses).encode('utf-8')
+        for file_name, nid in file_names_to_nids.items()})
+    return [file_names_to_nids[file_name] for file_name in changed_file_names]
+
+
+def get_container_script_path(ip_address: str) -> str:
+    return posixpath.join(constants.CONTAINER_LIVE_CONFIG_DIRECTORY_PATH, get_script_file_name(ip_address))
+
+
+# Running containers only pick up a changed script when it is run again, which the container otherwise does when it
+# next starts. Returns an error message if the script could not be run, such as when the container is stopped.
+def apply_script(container_name: str, ip_address: str) -> Optional[str]:
+    return docker_interface.run_in_container(container_name, ['sh', get_container_script_path(ip_address)])
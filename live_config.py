@@ -0,0 +1,80 @@
+from typing import Dict, List, Any, Optional
+import hashlib
+import os
+
+import yaml
+
+import constants
+
+# Digests of the files last published for each simulation, by file name
+published_digests: Dict[str, Dict[str, str]] = {}
+
+
+def get_live_config_directory(simulation_id: str) -> str:
+    return os.path.abspath(os.path.join(constants.LIVE_CONFIG_DIRECTORY, simulation_id))
+
+
+def get_live_config_file_path(simulation_id: str, file_name: str) -> str:
+    return os.path.join(get_live_config_directory(simulation_id), file_name)
+
+
+def get_connection_parameters_file_name(nid: str) -> str:
+    return f'{nid}{constants.LIVE_CONFIG_FILE_EXTENSION}'
+
+
+def get_digest(content: bytes) -> str:
+    return hashlib.sha256(content).hexdigest()
+
+
+# Falls back to the file on disk, so a restarted server does not republish files that have not changed
+def get_published_digest(simulation_id: str, file_name: str) -> Optional[str]:
+    digests = published_digests.setdefault(simulation_id, {})
+    if file_name not in digests:
+        try:
+            with open(get_live_config_file_path(simulation_id, file_name), 'rb') as live_config_file:
+                digests[file_name] = get_digest(live_config_file.read())
+        except FileNotFoundError:
+            return None
+    return digests[file_name]
+
+
+# Written to a temporary file and renamed over the old one, so a node never reads a partly written file. The directory
+# is what gets mounted into containers, so they see the new file.
+def write_live_config_file(file_path: str, content: bytes):
+    temporary_file_path = f'{file_path}.tmp'
+    with open(temporary_file_path, 'wb') as temporary_file:
+        temporary_file.write(content)
+    os.replace(temporary_file_path, file_path)
+
+
+def clear(simulation_id: str):
+    published_digests.pop(simulation_id, None)
+    directory = get_live_config_directory(simulation_id)
+    if os.path.isdir(directory):
+        for file_name in os.listdir(directory):
+            os.remove(os.path.join(directory, file_name))
+
+
+# Writes the files that changed since they were last published and returns their names
+def publish(simulation_id: str, contents_by_file_name: Dict[str, bytes]) -> List[str]:
+    os.makedirs(get_live_config_directory(simulation_id), exist_ok=True)
+    changed_file_names: List[str] = []
+    for file_name, content in contents_by_file_name.items():
+        digest = get_digest(content)
+        if get_published_digest(simulation_id, file_name) == digest:
+            continue
+        write_live_config_file(get_live_config_file_path(simulation_id, file_name), content)
+        published_digests[simulation_id][file_name] = digest
+        changed_file_names.append(file_name)
+    return changed_file_names
+
+
+# Writes each node's slice of the connection parameters to its own file and returns the nids whose slices changed
+def publish_connection_parameters(simulation_id: str,
+                                  connection_parameters_by_node: Dict[str, Dict[str, Dict[str, Any]]]) -> List[str]:
+    file_names_to_nids = {get_connection_parameters_file_name(nid): nid for nid in connection_parameters_by_node}
+    changed_file_names = publish(simulation_id, {
+        get_connection_parameters_file_name(nid): yaml.dump(node_connection_parameters,
+                                                            default_flow_style=False).encode('utf-8')
+        for nid, node_connection_parameters in connection_parameters_by_node.items()})
+    return [file_names_to_nids[file_name] for file_name in changed_file_names]
@@ -0,0 +1,249 @@
+from typing import List, Dict, Any, Tuple, Optional, IO
+from datetime import datetime, timezone
+import json
+import os
+import shutil
+import signal
+import subprocess
+import sys
+import threading
+
+from tornado.httpclient import AsyncHTTPClient
+from tornado.ioloop import PeriodicCallback
+
+import dict_keys
+import constants
+import docker_interface
+from simulation_backend import SimulationBackend
+
+LOOPBACK_IP_ADDRESS = '127.0.0.1'
+
+
+def get_local_run_command(runtime) -> List[str]:
+    return constants.RUNTIME_DATA[runtime][dict_keys.RUNTIME_DATA_LOCAL_RUN_COMMAND]
+
+
+def get_image_directory(tag: str) -> str:
+    return os.path.join(constants.LOCAL_BACKEND_DIRECTORY, 'images', tag)
+
+
+def get_log_file_path(name: str) -> str:
+    return os.path.join(constants.LOCAL_BACKEND_DIRECTORY, 'logs', f'{name}.log')
+
+
+def timestamp_now() -> str:
+    return datetime.now(timezone.utc).strftime(constants.LOG_TIMESTAMP_FORMAT)
+
+
+def copy_output_to_log(output: IO[bytes], log_file_path: str):
+    with open(log_file_path, 'ab') as log_file:
+        for line in iter(output.readline, b''):
+            log_file.write(f'{timestamp_now()} '.encode('utf-8') + line)
+            log_file.flush()
+
+
+def get_dependency_directory(tag: str) -> str:
+    return os.path.abspath(os.path.join(constants.LOCAL_BACKEND_DIRECTORY, 'dependencies', tag.replace(':', '-')))
+
+
+class LocalContainer:
+    def __init__(self, image_name: str, command: List[str], env: Dict[str, str], labels: Dict[str, str]):
+        self.image_name: str = image_name
+        self.command: List[str] = command
+        self.env: Dict[str, str] = env
+        self.labels: Dict[str, str] = labels
+        self.process: Optional[subprocess.Popen] = None
+        self.is_paused: bool = False
+        self.lock: threading.Lock = threading.Lock()
+
+    def get_status(self) -> str:
+        if self.process is None:
+            return 'created'
+        if self.process.poll() is not None:
+            return 'exited'
+        return 'paused' if self.is_paused else 'running'
+
+
+# Runs each node's program as a subprocess of the server on the loopback interface, giving each node its own port.
+# Images are copies of the build context. Dependency images are directories that pip installs the requirements into,
+# which are put on the PYTHONPATH of the nodes whose images use them. Labels are only kept in memory, as the nodes do
+# not outlive the server. Node actions run on a thread pool, so the containers and log streams are only changed while
+# holding the backend's lock, and each container's process only while holding that container's lock.
+class LocalProcessBackend(SimulationBackend):
+    def __init__(self):
+        self.lock: threading.Lock = threading.Lock()
+        self.containers: Dict[str, LocalContainer] = {}
+        self.image_dependency_directories: Dict[str, str] = {}
+        self.image_labels: Dict[str, Dict[str, str]] = {}
+        self.network_labels: Dict[str, Dict[str, str]] = {}
+        self.log_streams: Dict[str, PeriodicCallback] = {}
+        os.makedirs(os.path.dirname(get_log_file_path('_')), exist_ok=True)
+
+    def create_network(self, network_name: str, network_subnet: str, labels: Optional[Dict[str, str]] = None):
+        self.network_labels[network_name] = labels or {}
+
+    def remove_network(self, network_name: str):
+        self.network_labels.pop(network_name, None)
+
+    def create_image(self, path: str, tag: str, dependency_image_tag: Optional[str] = None,
+                     labels: Optional[Dict[str, str]] = None):
+        image_directory: str = get_image_directory(tag)
+        shutil.rmtree(image_directory, ignore_errors=True)
+        shutil.copytree(path, image_directory)
+        self.image_labels[tag] = labels or {}
+        if dependency_image_tag is None:
+            self.image_dependency_directories.pop(tag, None)
+        else:
+            self.image_dependency_directories[tag] = get_dependency_directory(dependency_image_tag)
+
+    # Installed into a temporary directory first, so a failed install does not leave a directory that looks complete
+    # System packages are left to the host, which runs the nodes
+    def create_dependency_image(self, tag: str, runtime: str, requirements: List[str],
+                                system_packages: Optional[List[str]] = None):
+        dependency_directory = get_dependency_directory(tag)
+        partial_directory = f'{dependency_directory}.partial'
+        shutil.rmtree(partial_directory, ignore_errors=True)
+        os.makedirs(partial_directory)
+        requirements_file_path = os.path.join(partial_directory, constants.REQUIREMENTS_FILE_NAME)
+        with open(requirements_file_path, 'w') as requirements_file:
+            requirements_file.write('\n'.join(requirements))
+        subprocess.run([sys.executable, '-m', 'pip', 'install', '--target', partial_directory, '-r',
+                        requirements_file_path], check=True)
+        shutil.rmtree(dependency_directory, ignore_errors=True)
+        os.rename(partial_directory, dependency_directory)
+
+    def dependency_image_exists(self, tag: str) -> bool:
+        return os.path.isdir(get_dependency_directory(tag))
+
+    def remove_images(self, image_names: List[str]):
+        for image_name in image_names:
+            shutil.rmtree(get_image_directory(image_name), ignore_errors=True)
+
+    def create_container(self, image_name: str, name: str, runtime: str, run_args: List[str], ip_address: str,
+                         udp_ports: List[int], network_name: str, run_args_file_path: Optional[str] = None,
+                         labels: Optional[Dict[str, str]] = None, live_config_directory_path: Optional[str] = None,
+                         link_emulation_script_path: Optional[str] = None,
+                         resource_limits: Optional[Dict[str, Any]] = None):
+        # Local processes run without resource limits, which would need cgroups to apply as Docker does
+        env = dict(os.environ)
+        if live_config_directory_path:
+            env[constants.LIVE_CONFIG_DIRECTORY_ENVIRONMENT_VARIABLE] = live_config_directory_path
+        if image_name in self.image_dependency_directories:
+            env['PYTHONPATH'] = os.pathsep.join(
+                [self.image_dependency_directories[image_name]] + ([env['PYTHONPATH']] if 'PYTHONPATH' in env else []))
+        container = LocalContainer(image_name, get_local_run_command(runtime) + run_args, env, labels or {})
+        with self.lock:
+            self.containers[name] = container
+        if os.path.exists(get_log_file_path(name)):
+            os.remove(get_log_file_path(name))
+
+    def remove_containers(self, container_names: List[str]):
+        for container_name in container_names:
+            with self.lock:
+                container: Optional[LocalContainer] = self.containers.pop(container_name, None)
+                log_stream: Optional[PeriodicCallback] = self.log_streams.pop(container_name, None)
+            if container is not None:
+                with container.lock:
+                    self.stop(container)
+            if log_stream is not None:
+                log_stream.stop()
+
+    def start(self, container: LocalContainer, name: str):
+        if container.get_status() in ['running', 'paused']:
+            return
+        container.process = subprocess.Popen(container.command, cwd=get_image_directory(container.image_name),
+                                             env=container.env, stdout=subprocess.PIPE, stderr=subprocess.STDOUT)
+        container.is_paused = False
+        threading.Thread(target=copy_output_to_log, args=(container.process.stdout, get_log_file_path(name)),
+                         daemon=True).start()
+
+    def stop(self, container: LocalContainer, signal_number: int = signal.SIGTERM):
+        if container.get_status() not in ['running', 'paused']:
+            return
+        if container.is_paused:
+            container.process.send_signal(signal.SIGCONT)
+            container.is_paused = False
+        container.process.send_signal(signal_number)
+        try:
+            container.process.wait(timeout=constants.LOCAL_BACKEND_STOP_TIMEOUT_SECONDS)
+        except subprocess.TimeoutExpired:
+            container.process.kill()
+            container.process.wait()
+
+    def action_container(self, name: str, action: str) -> Optional[str]:
+        with self.lock:
+            container: Optional[LocalContainer] = self.containers.get(name)
+        if container is None:
+            return f'Container {name} not found'
+        with container.lock:
+            self.perform_action(container, name, action)
+        return None
+
+    def perform_action(self, container: LocalContainer, name: str, action: str):
+        if action == 'start':
+            self.start(container, name)
+        elif action == 'stop':
+            self.stop(container)
+        elif action == 'kill':
+            self.stop(container, signal.SIGKILL)
+        elif action == 'restart':
+            self.stop(container)
+            self.start(container, name)
+        elif action == 'pause' and container.get_status() == 'running':
+            container.process.send_signal(signal.SIGSTOP)
+            container.is_paused = True
+        elif action == 'unpause' and container.get_status() == 'paused':
+            container.process.send_signal(signal.SIGCONT)
+            container.is_paused = False
+
+    def list_labelled_containers(self, label: str) -> Dict[str, Dict[str, str]]:
+        with self.lock:
+            return {name: container.labels for name, container in self.containers.items()
+                    if label in container.labels}
+
+    def list_labelled_images(self, label: str) -> Dict[str, Dict[str, str]]:
+        return {tag: labels for tag, labels in self.image_labels.items()
+                if label in labels and os.path.isdir(get_image_directory(tag))}
+
+    def list_labelled_networks(self, label: str) -> Dict[str, Dict[str, str]]:
+        return {name: labels for name, labels in self.network_labels.items() if label in labels}
+
+    def get_container_statuses(self, names: List[str]) -> Dict[str, Any]:
+        with self.lock:
+            containers: Dict[str, LocalContainer] = dict(self.containers)
+        return {name: container.get_status() for name, container in containers.items() if name in names}
+
+    # Follows the node's log file, posting new lines to this server's logging message endpoint in the same form as
+    # the logging server does for Docker containers
+    def stream_container_logs(self, name: str, since):
+        with self.lock:
+            old_log_stream: Optional[PeriodicCallback] = self.log_streams.pop(name, None)
+        if old_log_stream is not None:
+            old_log_stream.stop()
+        since_timestamp: str = (
+            datetime.fromtimestamp(float(since), timezone.utc).strftime(constants.LOG_TIMESTAMP_FORMAT)
+            if since else '')
+        log_file_offset: List[int] = [0]
+
+        def post_new_log_lines():
+            log_file_path: str = get_log_file_path(name)
+            if not os.path.exists(log_file_path):
+                return
+            with open(log_file_path, 'rb') as log_file:
+                log_file.seek(log_file_offset[0])
+                new_log_bytes: bytes = log_file.read()
+            complete_log_bytes: bytes = new_log_bytes[:new_log_bytes.rfind(b'\n') + 1]
+            log_file_offset[0] += len(complete_log_bytes)
+            log: List[Dict[str, str]] = [entry for entry in docker_interface.parse_log(complete_log_bytes)
+                                         if entry[dict_keys.LOG_TIMESTAMP] >= since_timestamp]
+            if len(log) > 0:
+                AsyncHTTPClient().fetch(constants.LOCAL_BACKEND_LOGGING_MESSAGE_URL, method='POST',
+                                        body=json.dumps({dict_keys.NODE_NID: name, dict_keys.LOG_ENTRIES: log}))
+
+        log_stream = PeriodicCallback(post_new_log_lines, constants.LOCAL_BACKEND_LOG_POLL_MILLISECONDS)
+        with self.lock:
+            self.log_streams[name] = log_stream
+        log_stream.start()
+
+    def get_node_address(self, index: int, base_ip_address: str, base_port: int) -> Tuple[str, int]:
+        return LOOPBACK_IP_ADDRESS, base_port + index
@@ -0,0 +1,98 @@
+from typing import List, Dict, Any, Optional, Tuple
+from datetime import datetime, timezone
+import os
+import time
+
+import constants
+import dict_keys
+import metrics
+
+
+def get_setting(environment_variable: str, default: float) -> float:
+    return float(os.environ.get(environment_variable, default))
+
+
+# A token bucket for one node's log lines. Once it is empty, lines are dropped, or with sampling every nth line over
+# the limit is let through, and the dropped lines are counted until the next summary.
+class TokenBucket:
+    def __init__(self, rate: float, burst: float, now: float):
+        self.rate: float = rate
+        self.burst: float = burst
+        self.tokens: float = burst
+        self.last_refill: float = now
+        self.over_limit_lines: int = 0
+        self.suppressed_lines: int = 0
+
+    def refill(self, now: float):
+        self.tokens = min(self.burst, self.tokens + (now - self.last_refill) * self.rate)
+        self.last_refill = now
+
+    def admit(self, log_entries: List[Dict[str, Any]], sample_every: int, now: float) -> List[Dict[str, Any]]:
+        self.refill(now)
+        admitted_entries = []
+        for log_entry in log_entries:
+            if self.tokens >= 1:
+                self.tokens -= 1
+                admitted_entries.append(log_entry)
+                continue
+            self.over_limit_lines += 1
+            if sample_every > 0 and self.over_limit_lines % sample_every == 0:
+                admitted_entries.append(log_entry)
+            else:
+                self.suppressed_lines += 1
+        return admitted_entries
+
+
+class LogRateLimiter:
+    def __init__(self, rate: float, burst: float, sample_every: int):
+        self.rate: float = rate
+        self.burst: float = burst
+        self.sample_every: int = sample_every
+        self.buckets: Dict[Tuple[str, str], TokenBucket] = {}
+
+    # A rate of zero or less turns limiting off
+    def admit(self, simulation_id: str, nid: str, log_entries: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        if self.rate <= 0:
+            return log_entries
+        now = time.monotonic()
+        bucket = self.buckets.get((simulation_id, nid))
+        if bucket is None:
+            bucket = self.buckets[simulation_id, nid] = TokenBucket(self.rate, self.burst, now)
+        admitted_entries = bucket.admit(log_entries, self.sample_every, now)
+        metrics.LOG_LINES_SUPPRESSED.inc(len(log_entries) - len(admitted_entries))
+        return admitted_entries
+
+    # Returns a summary entry for each node that had lines suppressed since the last call, by simulation id and nid, and
+    # forgets the buckets of nodes that have been quiet long enough to have refilled
+    def take_suppression_summaries(self) -> List[Tuple[str, str, Dict[str, Any]]]:
+        now = time.monotonic()
+        timestamp = datetime.now(timezone.utc).strftime(constants.LOG_TIMESTAMP_FORMAT)
+        summaries = []
+        for (simulation_id, nid), bucket in list(self.buckets.items()):
+            if bucket.suppressed_lines > 0:
+                sampling = f' (1 in {self.sample_every} sampled)' if self.sample_every > 0 else ''
+                summaries.append((simulation_id, nid, {
+                    dict_keys.LOG_TIMESTAMP: timestamp,
+                    dict_keys.LOG_MESSAGE: f'{bucket.suppressed_lines} lines suppressed for nid {nid}{sampling}',
+                    dict_keys.LOG_SUPPRESSED_LINES: bucket.suppressed_lines
+                }))
+                bucket.suppressed_lines = 0
+                bucket.over_limit_lines = 0
+            elif now - bucket.last_refill > constants.LOG_RATE_LIMIT_IDLE_BUCKET_SECONDS:
+                del self.buckets[simulation_id, nid]
+        return summaries
+
+
+limiter: Optional[LogRateLimiter] = None
+
+
+# Configured from the environment when first used
+def get_limiter() -> LogRateLimiter:
+    global limiter
+    if limiter is None:
+        limiter = LogRateLimiter(
+            get_setting(constants.LOG_RATE_LIMIT_ENVIRONMENT_VARIABLE,
+                        constants.DEFAULT_LOG_RATE_LIMIT_LINES_PER_SECOND),
+            get_setting(constants.LOG_BURST_ENVIRONMENT_VARIABLE, constants.DEFAULT_LOG_BURST_LINES),
+            int(get_setting(constants.LOG_SAMPLE_EVERY_ENVIRONMENT_VARIABLE, constants.DEFAULT_LOG_SAMPLE_EVERY)))
+    return limiter
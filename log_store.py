@@ -0,0 +1,315 @@
+from typing import List, Dict, Any, Optional, Iterator, Tuple, BinaryIO
+from datetime import datetime
+import heapq
+import json
+import math
+import mmap
+import os
+import re
+import struct
+import threading
+import time
+import zlib
+
+import constants
+import dict_keys
+import metrics
+
+# Each index record is the crc32 of the entry's nid, its timestamp in seconds since the epoch, and the offset and
+# length of its line in the segment's data file
+INDEX_RECORD = struct.Struct('<IdQI')
+# A sorted index starts with the earliest and latest timestamps in its segment
+SORTED_INDEX_HEADER = struct.Struct('<dd')
+DATA_FILE_EXTENSION = '.jsonl'
+INDEX_FILE_EXTENSION = '.idx'
+SORTED_INDEX_FILE_EXTENSION = '.sidx'
+SEGMENT_NAME_PATTERN = re.compile(r'^(\d{8})\.jsonl$')
+FRACTIONAL_SECONDS_PATTERN = re.compile(r'\.(\d+)')
+
+
+def get_nid_hash(nid: str) -> int:
+    return zlib.crc32(nid.encode('utf-8'))
+
+
+# Log timestamps are Docker's RFC 3339 timestamps, with nanoseconds, or seconds since the epoch. Entries whose
+# timestamps cannot be read, or are not finite, which would break the sorted indexes' order, are indexed at the time
+# they were stored.
+def parse_timestamp(timestamp: Any) -> float:
+    try:
+        seconds = float(timestamp)
+        return seconds if math.isfinite(seconds) else time.time()
+    except (TypeError, ValueError):
+        pass
+    try:
+        return datetime.fromisoformat(FRACTIONAL_SECONDS_PATTERN.sub(
+            lambda match: '.' + match.group(1)[:6].ljust(6, '0'), str(timestamp)).replace('Z', '+00:00')).timestamp()
+    except ValueError:
+        return time.time()
+
+
+class Segment:
+    def __init__(self, directory: str, sequence: int):
+        self.sequence: int = sequence
+        self.data_path: str = os.path.join(directory, f'{sequence:08d}{DATA_FILE_EXTENSION}')
+        self.index_path: str = os.path.join(directory, f'{sequence:08d}{INDEX_FILE_EXTENSION}')
+        self.sorted_index_path: str = os.path.join(directory, f'{sequence:08d}{SORTED_INDEX_FILE_EXTENSION}')
+        # The range of timestamps in a sealed segment, which no longer changes, read from its sorted index
+        self.timestamp_range: Optional[Tuple[float, float]] = None
+        self.seal_lock: threading.Lock = threading.Lock()
+
+    def get_paths(self) -> List[str]:
+        return [path for path in [self.data_path, self.index_path, self.sorted_index_path] if os.path.exists(path)]
+
+    def get_size(self) -> int:
+        return sum(os.path.getsize(path) for path in self.get_paths())
+
+    # Sealing writes the sorted index, which does not make a segment any more recent
+    def get_modified_time(self) -> float:
+        return max((os.path.getmtime(path) for path in [self.data_path, self.index_path] if os.path.exists(path)),
+                   default=time.time())
+
+    def remove(self):
+        for path in self.get_paths():
+            os.remove(path)
+
+    # A crash can leave a partly written index record, or records for lines that never reached the data file
+    def repair(self):
+        data_size = os.path.getsize(self.data_path) if os.path.exists(self.data_path) else 0
+        if not os.path.exists(self.index_path):
+            return
+        index_size = os.path.getsize(self.index_path)
+        valid_index_size = index_size - index_size % INDEX_RECORD.size
+        with open(self.index_path, 'rb') as index_file:
+            while valid_index_size > 0:
+                index_file.seek(valid_index_size - INDEX_RECORD.size)
+                _, _, offset, length = INDEX_RECORD.unpack(index_file.read(INDEX_RECORD.size))
+                if offset + length <= data_size:
+                    break
+                valid_index_size -= INDEX_RECORD.size
+        if valid_index_size != index_size:
+            os.truncate(self.index_path, valid_index_size)
+
+    # Yields the index records one at a time from the memory-mapped index, so memory use does not grow with its size.
+    # With an index size, only the records written before the index was that size are read.
+    def iterate_index(self, index_size: Optional[int] = None) -> Iterator[Tuple[int, float, int, int]]:
+        if not os.path.exists(self.index_path):
+            return
+        with open(self.index_path, 'rb') as index_file:
+            if index_size is None:
+                index_size = os.fstat(index_file.fileno()).st_size
+            index_size -= index_size % INDEX_RECORD.size
+            if index_size == 0:
+                return
+            with mmap.mmap(index_file.fileno(), index_size, access=mmap.ACCESS_READ) as index:
+                for position in range(0, index_size, INDEX_RECORD.size):
+                    yield INDEX_RECORD.unpack_from(index, position)
+
+    # Sealed segments no longer change, so their index records are sorted once, by nid hash, timestamp and offset, into
+    # a run that queries can binary-search. Done on the first query of the segment, which is off the IOLoop.
+    def seal(self):
+        with self.seal_lock:
+            if os.path.exists(self.sorted_index_path):
+                return
+            records = sorted(self.iterate_index())
+            timestamps = [timestamp for _, timestamp, _, _ in records]
+            partial_path = f'{self.sorted_index_path}.partial'
+            with open(partial_path, 'wb') as sorted_index_file:
+                sorted_index_file.write(SORTED_INDEX_HEADER.pack(min(timestamps, default=float('inf')),
+                                                                 max(timestamps, default=float('-inf'))))
+                sorted_index_file.write(b''.join(INDEX_RECORD.pack(*record) for record in records))
+            os.replace(partial_path, self.sorted_index_path)
+
+    def get_timestamp_range(self) -> Tuple[float, float]:
+        if self.timestamp_range is None:
+            self.seal()
+            with open(self.sorted_index_path, 'rb') as sorted_index_file:
+                self.timestamp_range = SORTED_INDEX_HEADER.unpack(sorted_index_file.read(SORTED_INDEX_HEADER.size))
+        return self.timestamp_range
+
+    def read_line(self, data_file: BinaryIO, nid_hashes: Optional[Dict[int, str]], nid_hash: int, offset: int,
+                  length: int) -> Optional[bytes]:
+        data_file.seek(offset)
+        line = data_file.read(length)
+        # Different nids can share a crc32, so a match on the hash alone is checked against the line
+        if nid_hashes is not None and json.loads(line)[dict_keys.NODE_NID] != nid_hashes[nid_hash]:
+            return None
+        return line
+
+    # Scans the index in append order, reading only as much of it as the given size
+    def query_active(self, nid_hashes: Optional[Dict[int, str]], since: Optional[float], until: Optional[float],
+                     index_size: int) -> Iterator[bytes]:
+        with open(self.data_path, 'rb') as data_file:
+            for nid_hash, timestamp, offset, length in self.iterate_index(index_size):
+                if ((nid_hashes is not None and nid_hash not in nid_hashes)
+                        or (since is not None and timestamp < since) or (until is not None and timestamp > until)):
+                    continue
+                line = self.read_line(data_file, nid_hashes, nid_hash, offset, length)
+                if line is not None:
+                    yield line
+
+    # Finds each selected nid's run of records in the sorted index, or every nid's run without a selection, narrows it
+    # to the timestamps in range by binary search, and merges the runs into timestamp order
+    def query_sealed(self, nid_hashes: Optional[Dict[int, str]], since: Optional[float], until: Optional[float]) \
+            -> Iterator[bytes]:
+        self.seal()
+        since = float('-inf') if since is None else since
+        until = float('inf') if until is None else until
+        with open(self.sorted_index_path, 'rb') as sorted_index_file, open(self.data_path, 'rb') as data_file:
+            records_size = os.fstat(sorted_index_file.fileno()).st_size - SORTED_INDEX_HEADER.size
+            if records_size <= 0:
+                return
+            with mmap.mmap(sorted_index_file.fileno(), 0, access=mmap.ACCESS_READ) as sorted_index:
+                number_records = records_size // INDEX_RECORD.size
+
+                def get_record(position: int) -> Tuple[int, float, int, int]:
+                    return INDEX_RECORD.unpack_from(sorted_index, SORTED_INDEX_HEADER.size
+                                                    + position * INDEX_RECORD.size)
+
+                # The position of the first record whose nid hash and timestamp are after the key, or not before it
+                def search(key: Tuple[int, float], after: bool) -> int:
+                    low, high = 0, number_records
+                    while low < high:
+                        middle = (low + high) // 2
+                        if get_record(middle)[:2] < key or (after and get_record(middle)[:2] == key):
+                            low = middle + 1
+                        else:
+                            high = middle
+                    return low
+
+                if nid_hashes is not None:
+                    selected_nid_hashes = sorted(nid_hashes)
+                else:
+                    selected_nid_hashes, position = [], 0
+                    while position < number_records:
+                        selected_nid_hashes.append(get_record(position)[0])
+                        position = search((selected_nid_hashes[-1], float('inf')), True)
+
+                def iterate_run(nid_hash: int) -> Iterator[Tuple[int, float, int, int]]:
+                    for position in range(search((nid_hash, since), False), search((nid_hash, until), True)):
+                        yield get_record(position)
+
+                for nid_hash, _, offset, length in heapq.merge(*map(iterate_run, selected_nid_hashes),
+                                                               key=lambda record: (record[1], record[2])):
+                    line = self.read_line(data_file, nid_hashes, nid_hash, offset, length)
+                    if line is not None:
+                        yield line
+
+
+# Entries are appended to the newest segment of the simulation's log, and a new segment is started once it is full.
+# Only the newest segment has open files.
+class SimulationLogStore:
+    def __init__(self, simulation_id: str):
+        self.directory: str = os.path.join(constants.LOG_STORE_DIRECTORY, simulation_id)
+        os.makedirs(self.directory, exist_ok=True)
+        self.segments: List[Segment] = [Segment(self.directory, sequence) for sequence in sorted(
+            int(match.group(1)) for match in map(SEGMENT_NAME_PATTERN.match, os.listdir(self.directory)) if match)]
+        if not self.segments:
+            self.segments.append(Segment(self.directory, 0))
+        self.segments[-1].repair()
+        self.evict()
+        self.data_file: Optional[BinaryIO] = None
+        self.index_file: Optional[BinaryIO] = None
+        self.data_size: int = 0
+
+    def open_active_segment(self):
+        active_segment = self.segments[-1]
+        self.data_file = open(active_segment.data_path, 'ab')
+        self.index_file = open(active_segment.index_path, 'ab')
+        self.data_size = self.data_file.tell()
+
+    def close(self):
+        for file in [self.data_file, self.index_file]:
+            if file is not None:
+                file.close()
+        self.data_file, self.index_file = None, None
+
+    def flush(self):
+        for file in [self.data_file, self.index_file]:
+            if file is not None:
+                file.flush()
+
+    def roll_over(self):
+        self.close()
+        self.segments.append(Segment(self.directory, self.segments[-1].sequence + 1))
+        self.evict()
+
+    def append(self, nid: str, log_entries: List[Dict[str, Any]]):
+        if self.data_file is None:
+            self.open_active_segment()
+        bytes_written = 0
+        for log_entry in log_entries:
+            line = (json.dumps({dict_keys.NODE_NID: nid, **log_entry}, separators=(',', ':')) + '\n').encode('utf-8')
+            self.data_file.write(line)
+            self.index_file.write(INDEX_RECORD.pack(get_nid_hash(nid),
+                                                    parse_timestamp(log_entry.get(dict_keys.LOG_TIMESTAMP)),
+                                                    self.data_size, len(line)))
+            self.data_size += len(line)
+            bytes_written += len(line) + INDEX_RECORD.size
+        metrics.LOG_STORE_BYTES_WRITTEN.inc(bytes_written)
+        if self.data_size >= constants.LOG_STORE_SEGMENT_MAX_BYTES:
+            self.roll_over()
+
+    # Removes the oldest segments while the log is over its size limit, and any segment not written to within the age
+    # limit. The newest segment is always kept.
+    def evict(self):
+        total_size = sum(segment.get_size() for segment in self.segments)
+        oldest_kept_time = time.time() - constants.LOG_STORE_MAX_AGE_SECONDS
+        while len(self.segments) > 1 and (total_size > constants.LOG_STORE_MAX_BYTES_PER_SIMULATION
+                                          or self.segments[0].get_modified_time() < oldest_kept_time):
+            total_size -= self.segments[0].get_size()
+            self.segments.pop(0).remove()
+            metrics.LOG_STORE_SEGMENTS_EVICTED.inc()
+
+    # Returns an iterator over the stored lines, oldest segment first and in timestamp order within each sealed
+    # segment, skipping sealed segments whose timestamps are all out of range. The active segment is read only as far
+    # as it was written when this was called, so the iterator can be consumed off the IOLoop while entries are
+    # appended. Segments evicted in the meantime are skipped.
+    def query(self, nids: Optional[List[str]] = None, since: Optional[float] = None, until: Optional[float] = None) \
+            -> Iterator[bytes]:
+        self.flush()
+        nid_hashes = {get_nid_hash(nid): nid for nid in nids} if nids is not None else None
+        segments = list(self.segments)
+        active_index_size = os.path.getsize(segments[-1].index_path) if os.path.exists(segments[-1].index_path) else 0
+
+        def iterate_lines() -> Iterator[bytes]:
+            for segment in segments:
+                try:
+                    if segment is segments[-1]:
+                        if os.path.exists(segment.data_path):
+                            yield from segment.query_active(nid_hashes, since, until, active_index_size)
+                        continue
+                    earliest, latest = segment.get_timestamp_range()
+                    if (since is not None and latest < since) or (until is not None and earliest > until):
+                        continue
+                    yield from segment.query_sealed(nid_hashes, since, until)
+                except FileNotFoundError:
+                    continue
+
+        return iterate_lines()
+
+
+stores: Dict[str, SimulationLogStore] = {}
+
+
+def get_store(simulation_id: str) -> SimulationLogStore:
+    if simulation_id not in stores:
+        stores[simulation_id] = SimulationLogStore(simulation_id)
+    return stores[simulation_id]
+
+
+def append(simulation_id: str, nid: str, log_entries: List[Dict[str, Any]]):
+    get_store(simulation_id).append(nid, log_entries)
+
+
+def query(simulation_id: str, nids: Optional[List[str]] = None, since: Optional[float] = None,
+          until: Optional[float] = None) -> Iterator[bytes]:
+    if simulation_id not in stores and not os.path.isdir(os.path.join(constants.LOG_STORE_DIRECTORY, simulation_id)):
+        return iter([])
+    return get_store(simulation_id).query(nids, since, until)
+
+
+def evict_all():
+    if not os.path.isdir(constants.LOG_STORE_DIRECTORY):
+        return
+    for simulation_id in os.listdir(constants.LOG_STORE_DIRECTORY):
+        get_store(simulation_id).evict()
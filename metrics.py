@@ -0,0 +1,143 @@
+from abc import ABC, abstractmethod
+from typing import Dict, List, Tuple, Callable, Iterator
+from contextlib import contextmanager
+import threading
+import time
+
+DEFAULT_BUCKETS: List[float] = [0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300]
+
+LabelValues = Tuple[str, ...]
+
+
+def escape_label_value(value: str) -> str:
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def format_labels(label_names: List[str], label_values: LabelValues, extra: Dict[str, str] = None) -> str:
+    pairs: List[Tuple[str, str]] = list(zip(label_names, label_values)) + list((extra or {}).items())
+    if len(pairs) == 0:
+        return ''
+    return '{' + ','.join(f'{name}="{escape_label_value(value)}"' for name, value in pairs) + '}'
+
+
+def format_value(value: float) -> str:
+    return repr(float(value)) if value != float('inf') else '+Inf'
+
+
+class Metric(ABC):
+    type_name: str = ''
+
+    def __init__(self, name: str, help_text: str, label_names: List[str] = None):
+        self.name: str = name
+        self.help_text: str = help_text
+        self.label_names: List[str] = label_names or []
+        self.lock = threading.Lock()
+
+    @abstractmethod
+    def render_samples(self) -> List[str]:
+        pass
+
+    def render(self) -> List[str]:
+        return [f'# HELP {self.name} {self.help_text}', f'# TYPE {self.name} {self.type_name}'] + self.render_samples()
+
+
+class Counter(Metric):
+    type_name = 'counter'
+
+    def __init__(self, name: str, help_text: str, label_names: List[str] = None):
+        super().__init__(name, help_text, label_names)
+        self.values: Dict[LabelValues, float] = {}
+
+    def inc(self, amount: float = 1, *label_values: str):
+        with self.lock:
+            self.values[label_values] = self.values.get(label_values, 0) + amount
+
+    def render_samples(self) -> List[str]:
+        with self.lock:
+            return [f'{self.name}{format_labels(self.label_names, label_values)} {format_value(value)}'
+                    for label_values, value in self.values.items()]
+
+
+# A gauge whose value is read from a callback when the metrics are rendered
+class CallbackGauge(Metric):
+    type_name = 'gauge'
+
+    def __init__(self, name: str, help_text: str, callback: Callable[[], float]):
+        super().__init__(name, help_text)
+        self.callback: Callable[[], float] = callback
+
+    def render_samples(self) -> List[str]:
+        return [f'{self.name} {format_value(self.callback())}']
+
+
+class Histogram(Metric):
+    type_name = 'histogram'
+
+    def __init__(self, name: str, help_text: str, label_names: List[str] = None, buckets: List[float] = None):
+        super().__init__(name, help_text, label_names)
+        self.buckets: List[float] = (buckets or DEFAULT_BUCKETS) + [float('inf')]
+        self.bucket_counts: Dict[LabelValues, List[int]] = {}
+        self.sums: Dict[LabelValues, float] = {}
+
+    def observe(self, value: float, *label_values: str):
+        with self.lock:
+            if label_values not in self.bucket_counts:
+                self.bucket_counts[label_values] = [0] * len(self.buckets)
+                self.sums[label_values] = 0
+            for index, upper_bound in enumerate(self.buckets):
+                if value <= upper_bound:
+                    self.bucket_counts[label_values][index] += 1
+            self.sums[label_values] += value
+
+    @contextmanager
+    def time(self, *label_values: str) -> Iterator[None]:
+        start: float = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, *label_values)
+
+    def render_samples(self) -> List[str]:
+        samples: List[str] = []
+        with self.lock:
+            for label_values, bucket_counts in self.bucket_counts.items():
+                for upper_bound, count in zip(self.buckets, bucket_counts):
+                    samples.append(f'{self.name}_bucket'
+                                   f'{format_labels(self.label_names, label_values, {"le": format_value(upper_bound)})}'
+                                   f' {count}')
+                labels: str = format_labels(self.label_names, label_values)
+                samples.append(f'{self.name}_sum{labels} {format_value(self.sums[label_values])}')
+                samples.append(f'{self.name}_count{labels} {bucket_counts[-1]}')
+        return samples
+
+
+registry: List[Metric] = []
+
+
+def register(metric: Metric) -> Metric:
+    registry.append(metric)
+    return metric
+
+
+# Renders every registered metric in the Prometheus text exposition format
+def render() -> str:
+    return '\n'.join(line for metric in registry for line in metric.render()) + '\n'
+
+
+SIMULATION_SETUP_PHASE_SECONDS: Histogram = register(Histogram(
+    'diorama_simulation_setup_phase_seconds', 'Time spent in each phase of setting up a simulation', ['phase']))
+DOCKER_INTERFACE_CALL_SECONDS: Histogram = register(Histogram(
+    'diorama_docker_interface_call_seconds', 'Time spent in each docker_interface call', ['call']))
+WS_EVENT_HANDLER_SECONDS: Histogram = register(Histogram(
+    'diorama_ws_event_handler_seconds', 'Time spent handling each type of WebSocket event', ['event']))
+DATABASE_OPERATION_SECONDS: Histogram = register(Histogram(
+    'diorama_database_operation_seconds', 'Time spent reading and writing each TinyDB database',
+    ['database', 'operation']))
+LOG_LINES_INGESTED: Counter = register(Counter(
+    'diorama_log_lines_ingested_total', 'Log lines received on /loggingMessage'))
+LOG_LINES_SUPPRESSED: Counter = register(Counter(
+    'diorama_log_lines_suppressed_total', 'Log lines dropped by the per-node log rate limiter'))
+LOG_STORE_BYTES_WRITTEN: Counter = register(Counter(
+    'diorama_log_store_bytes_written_total', 'Bytes of log entries and index records written to the log store'))
+LOG_STORE_SEGMENTS_EVICTED: Counter = register(Counter(
+    'diorama_log_store_segments_evicted_total', 'Log store segments removed for exceeding the size or age limit'))
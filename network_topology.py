@@ -1,4 +1,6 @@
-from typing import Dict, Callable, Any, List, Set
+from typing import Dict, Callable, Any, List, Set, Tuple, Pattern, Optional
+from collections import OrderedDict
+import hashlib
 import re
 
 import yaml
@@ -10,6 +12,7 @@ import constants
 import dict_keys
 import network_topology_values
 import custom_config
+import resource_limits
 import util
 
 ERROR_MESSAGE_PARSING = "NT_ERROR_PARSING"
@@ -22,107 +25,302 @@ ERROR_MESSAGE_SINGLE_NODES_NID_STRING_TYPE = "NT_ERROR_NID_SINGLE_NODES_NOT_STRI
 ERROR_MESSAGE_SINGLE_NODES_PROGRAM_STRING_TYPE = "NT_ERROR_PROGRAM_SINGLE_NODES_NOT_STRING"
 ERROR_MESSAGE_SINGLE_NODES_CONNECTIONS_LIST_OF_STRING_TYPE = "NT_ERROR_CONNECTIONS_SINGLE_NODES_NOT_LIST_OF_STRINGS"
 ERROR_MESSAGE_INVALID_NID = "NT_ERROR_INVALID_NID"
+ERROR_MESSAGE_DUPLICATE_NID = "NT_ERROR_DUPLICATE_NID"
+ERROR_MESSAGE_DANGLING_CONNECTION = "NT_ERROR_DANGLING_CONNECTION"
+ERROR_MESSAGE_INVALID_GROUP_TYPE = "NT_ERROR_INVALID_GROUP_TYPE"
+ERROR_MESSAGE_MISSING_GROUP_PARAMETER = "NT_ERROR_MISSING_GROUP_PARAMETER"
+ERROR_MESSAGE_UNKNOWN_GROUP_PARAMETER = "NT_ERROR_UNKNOWN_GROUP_PARAMETER"
+ERROR_MESSAGE_GROUP_PARAMETER_TYPE = "NT_ERROR_GROUP_PARAMETER_TYPE"
+ERROR_MESSAGE_GROUP_PARAMETER_OUT_OF_RANGE = "NT_ERROR_GROUP_PARAMETER_OUT_OF_RANGE"
+ERROR_MESSAGE_GROUP_PARAMETER_LENGTH = "NT_ERROR_GROUP_PARAMETER_LENGTH"
+ERROR_MESSAGE_GROUP_CONNECTIONS_TYPE = "NT_ERROR_GROUP_CONNECTIONS_NOT_LIST_OF_FROM_TO_MAPS"
+ERROR_MESSAGE_DUPLICATE_GROUP_NAME = "NT_ERROR_DUPLICATE_GROUP_NAME"
+ERROR_MESSAGE_TIMEOUT = "NT_ERROR_TIMEOUT"
+ERROR_MESSAGE_SUPERSEDED = "NT_ERROR_SUPERSEDED"
+ERROR_MESSAGE_WORKER_DIED = "NT_ERROR_WORKER_DIED"
+ERROR_MESSAGE_INVALID_RESOURCE_LIMITS = "NT_ERROR_INVALID_RESOURCE_LIMITS"
+ERROR_MESSAGE_INVALID_PAGE_REQUEST = "NT_ERROR_INVALID_PAGE_REQUEST"
+ERROR_MESSAGE_INVALID_PATCH_REQUEST = "NT_ERROR_INVALID_PATCH_REQUEST"
 VALID_BASE_KEYS: List[str] = [dict_keys.NETWORK_TOPOLOGY_SINGLE_NODES, dict_keys.NETWORK_TOPOLOGY_NODE_GROUPS]
 VALID_NID_REGEX: str = r'^[a-zA-Z0-9][a-zA-Z0-9_\.\-]+$'
+VALID_NID_PATTERN: Pattern = re.compile(VALID_NID_REGEX)
 SINGLE_TYPE_NODE_GROUPS: List[str] = ['line', 'ring', 'fully_connected']
+# Single program groups whose connections are generated by graph_generators
+GENERATED_NODE_GROUPS: List[str] = ['grid', 'torus', 'random', 'small_world', 'barabasi_albert']
+MAX_REPORTED_VALIDATION_ERRORS: int = 100
+
+# The saved unpacked topology as pages are read from it: (database, topology, index of each nid, number of
+# connections). Pages are read far more often than the topology is saved, so it is kept until the next save rather
+# than read back from the database for every page.
+paged_unpacked_network_topology: Optional[Tuple[Any, List[Dict[str, Any]], Dict[str, int], int]] = None
+
+SINGLE_TYPE_GROUP_PARAMETERS: Dict[str, Tuple[type, bool]] = {
+    dict_keys.NODE_PROGRAM: (str, True),
+    dict_keys.NETWORK_TOPOLOGY_GROUP_NUMBER_NODES: (int, True),
+    dict_keys.NETWORK_TOPOLOGY_GROUP_NID_PREFIX: (str, False),
+    dict_keys.NETWORK_TOPOLOGY_GROUP_NID_SUFFIX: (str, False),
+    dict_keys.NETWORK_TOPOLOGY_GROUP_NID_STARTING_NUMBER: (int, False),
+    dict_keys.NETWORK_TOPOLOGY_GROUP_NID_NUMBER_INCREMENT: (int, False)
+}
+GRID_GROUP_PARAMETERS: Dict[str, Tuple[type, bool]] = {
+    **{key: value for key, value in SINGLE_TYPE_GROUP_PARAMETERS.items()
+       if key != dict_keys.NETWORK_TOPOLOGY_GROUP_NUMBER_NODES},
+    dict_keys.NETWORK_TOPOLOGY_GROUP_GRID_NUMBER_ROWS: (int, True),
+    dict_keys.NETWORK_TOPOLOGY_GROUP_GRID_NUMBER_COLUMNS: (int, True)
+}
+# For each group type, the type of each parameter and whether it is required
+GROUP_PARAMETERS: Dict[str, Dict[str, Tuple[type, bool]]] = {
+    'line': SINGLE_TYPE_GROUP_PARAMETERS,
+    'ring': SINGLE_TYPE_GROUP_PARAMETERS,
+    'fully_connected': SINGLE_TYPE_GROUP_PARAMETERS,
+    'grid': GRID_GROUP_PARAMETERS,
+    'torus': GRID_GROUP_PARAMETERS,
+    'random': {
+        **SINGLE_TYPE_GROUP_PARAMETERS,
+        dict_keys.NETWORK_TOPOLOGY_GROUP_RANDOM_CONNECTION_PROBABILITY: (float, True),
+        dict_keys.NETWORK_TOPOLOGY_GROUP_SEED: (int, False)
+    },
+    'small_world': {
+        **SINGLE_TYPE_GROUP_PARAMETERS,
+        dict_keys.NETWORK_TOPOLOGY_GROUP_SMALL_WORLD_NUMBER_NEIGHBOURS: (int, True),
+        dict_keys.NETWORK_TOPOLOGY_GROUP_SMALL_WORLD_REWIRING_PROBABILITY: (float, True),
+        dict_keys.NETWORK_TOPOLOGY_GROUP_SEED: (int, False)
+    },
+    'barabasi_albert': {
+        **SINGLE_TYPE_GROUP_PARAMETERS,
+        dict_keys.NETWORK_TOPOLOGY_GROUP_BARABASI_ALBERT_NUMBER_ATTACHMENTS: (int, True),
+        dict_keys.NETWORK_TOPOLOGY_GROUP_SEED: (int, False)
+    },
+    'star': {
+        dict_keys.NETWORK_TOPOLOGY_GROUP_STAR_HUB_NID: (str, True),
+        dict_keys.NETWORK_TOPOLOGY_GROUP_STAR_HUB_PROGRAM: (str, True),
+        dict_keys.NETWORK_TOPOLOGY_GROUP_STAR_NUMBER_HOSTS: (int, True),
+        dict_keys.NETWORK_TOPOLOGY_GROUP_STAR_HOST_PROGRAM: (str, True),
+        dict_keys.NETWORK_TOPOLOGY_GROUP_STAR_HOST_NID_PREFIX: (str, False),
+        dict_keys.NETWORK_TOPOLOGY_GROUP_STAR_HOST_NID_SUFFIX: (str, False),
+        dict_keys.NETWORK_TOPOLOGY_GROUP_STAR_HOST_NID_STARTING_NUMBER: (int, False),
+        dict_keys.NETWORK_TOPOLOGY_GROUP_STAR_HOST_NID_NUMBER_INCREMENT: (int, False)
+    },
+    'tree': {
+        dict_keys.NETWORK_TOPOLOGY_GROUP_TREE_NUMBER_LEVELS: (int, True),
+        dict_keys.NETWORK_TOPOLOGY_GROUP_TREE_NUMBER_CHILDREN: (int, True),
+        dict_keys.NETWORK_TOPOLOGY_GROUP_TREE_PROGRAMS: (list, True),
+        dict_keys.NETWORK_TOPOLOGY_GROUP_TREE_NID_PREFIXES: (list, True),
+        dict_keys.NETWORK_TOPOLOGY_GROUP_TREE_NID_STARTING_NUMBERS: (list, False),
+        dict_keys.NETWORK_TOPOLOGY_GROUP_TREE_NID_NUMBER_INCREMENTS: (list, False),
+        dict_keys.NETWORK_TOPOLOGY_GROUP_TREE_NID_SUFFIXES: (list, False)
+    }
+}
+COMMON_GROUP_PARAMETERS: Dict[str, Tuple[type, bool]] = {
+    dict_keys.NETWORK_TOPOLOGY_GROUP_TYPE: (str, True),
+    dict_keys.NETWORK_TOPOLOGY_GROUP_NAME: (str, False),
+    dict_keys.NETWORK_TOPOLOGY_GROUP_CONNECTIONS: (list, False),
+    dict_keys.NODE_RESOURCES: (dict, False)
+}
+GROUP_PARAMETER_MINIMUMS: Dict[str, int] = {
+    dict_keys.NETWORK_TOPOLOGY_GROUP_NUMBER_NODES: 1,
+    dict_keys.NETWORK_TOPOLOGY_GROUP_STAR_NUMBER_HOSTS: 0,
+    dict_keys.NETWORK_TOPOLOGY_GROUP_TREE_NUMBER_LEVELS: 1,
+    dict_keys.NETWORK_TOPOLOGY_GROUP_TREE_NUMBER_CHILDREN: 1,
+    dict_keys.NETWORK_TOPOLOGY_GROUP_GRID_NUMBER_ROWS: 1,
+    dict_keys.NETWORK_TOPOLOGY_GROUP_GRID_NUMBER_COLUMNS: 1,
+    dict_keys.NETWORK_TOPOLOGY_GROUP_RANDOM_CONNECTION_PROBABILITY: 0,
+    dict_keys.NETWORK_TOPOLOGY_GROUP_SMALL_WORLD_NUMBER_NEIGHBOURS: 0,
+    dict_keys.NETWORK_TOPOLOGY_GROUP_SMALL_WORLD_REWIRING_PROBABILITY: 0,
+    dict_keys.NETWORK_TOPOLOGY_GROUP_BARABASI_ALBERT_NUMBER_ATTACHMENTS: 1,
+    dict_keys.NETWORK_TOPOLOGY_GROUP_SEED: 0
+}
+GROUP_PARAMETER_MAXIMUMS: Dict[str, int] = {
+    dict_keys.NETWORK_TOPOLOGY_GROUP_RANDOM_CONNECTION_PROBABILITY: 1,
+    dict_keys.NETWORK_TOPOLOGY_GROUP_SMALL_WORLD_REWIRING_PROBABILITY: 1
+}
+# Parameters of generated groups that must be less than the number of nodes
+GROUP_PARAMETERS_BELOW_NUMBER_NODES: Dict[str, str] = {
+    'small_world': dict_keys.NETWORK_TOPOLOGY_GROUP_SMALL_WORLD_NUMBER_NEIGHBOURS,
+    'barabasi_albert': dict_keys.NETWORK_TOPOLOGY_GROUP_BARABASI_ALBERT_NUMBER_ATTACHMENTS
+}
+# Element types of tree parameters holding one value per level
+TREE_GROUP_LEVEL_PARAMETER_TYPES: Dict[str, type] = {
+    dict_keys.NETWORK_TOPOLOGY_GROUP_TREE_PROGRAMS: str,
+    dict_keys.NETWORK_TOPOLOGY_GROUP_TREE_NID_PREFIXES: str,
+    dict_keys.NETWORK_TOPOLOGY_GROUP_TREE_NID_STARTING_NUMBERS: int,
+    dict_keys.NETWORK_TOPOLOGY_GROUP_TREE_NID_NUMBER_INCREMENTS: int,
+    dict_keys.NETWORK_TOPOLOGY_GROUP_TREE_NID_SUFFIXES: str
+}
+
+
+def make_validation_error(message: str, data=None) -> Dict[str, Any]:
+    return {dict_keys.NETWORK_TOPOLOGY_ERROR_MESSAGE: message, dict_keys.NETWORK_TOPOLOGY_ERROR_DATA: data}
 
 
 class NetworkTopologyValidationException(Exception):
-    def __init__(self, message, data=None):
+    def __init__(self, message, data=None, errors=None):
         self.message = message
         self.data = data
+        self.errors = errors if errors else [make_validation_error(message, data)]
 
 
-def confirm_topology_is_a_dict(topology):
+def confirm_topology_structure(topology):
     topology_type = type(topology)
     if topology_type != dict:
         raise NetworkTopologyValidationException(ERROR_MESSAGE_MUST_BE_MAP, topology_type.__name__)
-
-
-def confirm_all_base_keys_are_valid(topology: Dict[str, List]):
     invalid_keys = [key for key in topology.keys() if key not in VALID_BASE_KEYS]
     if len(invalid_keys) > 0:
         raise NetworkTopologyValidationException(ERROR_MESSAGE_INVALID_BASE_KEYS, invalid_keys)
-
-
-def confirm_all_values_are_lists_of_dicts(topology: Dict[str, List]):
     for key in VALID_BASE_KEYS:
-        if key in topology:
-            if type(topology[key]) != list:
-                raise NetworkTopologyValidationException(ERROR_MESSAGE_BASE_VALUE_NOT_LIST_OF_DICTS_TYPE, key)
-            else:
-                for item in topology[key]:
-                    if type(item) != dict:
-                        raise NetworkTopologyValidationException(ERROR_MESSAGE_BASE_VALUE_NOT_LIST_OF_DICTS_TYPE, key)
+        if key in topology and (type(topology[key]) != list or any(type(item) != dict for item in topology[key])):
+            raise NetworkTopologyValidationException(ERROR_MESSAGE_BASE_VALUE_NOT_LIST_OF_DICTS_TYPE, key)
 
 
-def confirm_single_nodes_include_nid(single_nodes: List[Dict[str, Any]]):
-    for index, node in enumerate(single_nodes):
-        if dict_keys.NODE_NID not in node:
-            raise NetworkTopologyValidationException(ERROR_MESSAGE_NO_NID_IN_SINGLE_NODES_ITEM, index + 1)
+# The error data is the single node's or group's number and the invalid key
+def validate_resource_limits(item: Dict[str, Any], item_number: int, errors: List[Dict[str, Any]]):
+    if dict_keys.NODE_RESOURCES not in item:
+        return
+    if type(item[dict_keys.NODE_RESOURCES]) != dict:
+        errors.append(make_validation_error(ERROR_MESSAGE_INVALID_RESOURCE_LIMITS,
+                                            [item_number, dict_keys.NODE_RESOURCES]))
+        return
+    for key in resource_limits.get_invalid_resource_limit_keys(item[dict_keys.NODE_RESOURCES]):
+        errors.append(make_validation_error(ERROR_MESSAGE_INVALID_RESOURCE_LIMITS, [item_number, key]))
 
 
-def confirm_single_nodes_include_program(single_nodes: List[Dict[str, Any]]):
+def validate_single_nodes(single_nodes: List[Dict[str, Any]], errors: List[Dict[str, Any]], nids: List[str],
+                          connection_nids: List[str]):
     for index, node in enumerate(single_nodes):
+        if dict_keys.NODE_NID not in node:
+            errors.append(make_validation_error(ERROR_MESSAGE_NO_NID_IN_SINGLE_NODES_ITEM, index + 1))
+        elif type(node[dict_keys.NODE_NID]) != str:
+            errors.append(make_validation_error(ERROR_MESSAGE_SINGLE_NODES_NID_STRING_TYPE, index + 1))
+        else:
+            nids.append(node[dict_keys.NODE_NID])
         if dict_keys.NODE_PROGRAM not in node:
-            raise NetworkTopologyValidationException(ERROR_MESSAGE_NO_PROGRAM_IN_SINGLE_NODES_ITEM, index + 1)
-
-
-def confirm_single_nodes_nid_string_type(single_nodes: List[Dict[str, Any]]):
-    for index, node in enumerate(single_nodes):
-        if type(node[dict_keys.NODE_NID]) != str:
-            raise NetworkTopologyValidationException(ERROR_MESSAGE_SINGLE_NODES_NID_STRING_TYPE, index + 1)
-
-
-def confirm_single_nodes_program_string_type(single_nodes: List[Dict[str, Any]]):
-    for index, node in enumerate(single_nodes):
-        if type(node[dict_keys.NODE_PROGRAM]) != str:
-            raise NetworkTopologyValidationException(ERROR_MESSAGE_SINGLE_NODES_PROGRAM_STRING_TYPE, index + 1)
-
-
-def confirm_single_nodes_connections_list_of_strings_type(single_nodes: List[Dict[str, Any]]):
-    for index, node in enumerate(single_nodes):
+            errors.append(make_validation_error(ERROR_MESSAGE_NO_PROGRAM_IN_SINGLE_NODES_ITEM, index + 1))
+        elif type(node[dict_keys.NODE_PROGRAM]) != str:
+            errors.append(make_validation_error(ERROR_MESSAGE_SINGLE_NODES_PROGRAM_STRING_TYPE, index + 1))
         if dict_keys.NODE_CONNECTIONS in node:
             connections = node[dict_keys.NODE_CONNECTIONS]
-            if type(connections) != list:
-                raise NetworkTopologyValidationException(ERROR_MESSAGE_SINGLE_NODES_CONNECTIONS_LIST_OF_STRING_TYPE,
-                                                         index + 1)
-            for connection in connections:
-                if type(connection) != str:
-                    raise NetworkTopologyValidationException(ERROR_MESSAGE_SINGLE_NODES_CONNECTIONS_LIST_OF_STRING_TYPE,
-                                                             index + 1)
-
-
-def confirm_single_nodes_have_valid_nids(single_nodes: List[Dict[str, Any]]):
-    for node in single_nodes:
-        nid = node[dict_keys.NODE_NID]
-        if not re.match(VALID_NID_REGEX, nid):
-            raise NetworkTopologyValidationException(ERROR_MESSAGE_INVALID_NID, nid)
-
-
+            if type(connections) != list or any(type(connection) != str for connection in connections):
+                errors.append(
+                    make_validation_error(ERROR_MESSAGE_SINGLE_NODES_CONNECTIONS_LIST_OF_STRING_TYPE, index + 1))
+            else:
+                connection_nids.extend(connections)
+        validate_resource_limits(node, index + 1, errors)
+
+
+# Whole numbers are accepted where a float is expected, as YAML and JSON write them without a decimal point
+def is_group_parameter_type(value, parameter_type: type) -> bool:
+    return type(value) == parameter_type or (parameter_type == float and type(value) == int)
+
+
+# Returns whether the group's parameters are valid enough for its nids to be generated
+def validate_node_group_parameters(group: Dict[str, Any], group_number: int, errors: List[Dict[str, Any]]) -> bool:
+    group_type = group.get(dict_keys.NETWORK_TOPOLOGY_GROUP_TYPE)
+    if group_type not in GROUP_PARAMETERS:
+        errors.append(make_validation_error(ERROR_MESSAGE_INVALID_GROUP_TYPE, [group_number, group_type]))
+        return False
+    number_errors: int = len(errors)
+    parameters: Dict[str, Tuple[type, bool]] = {**COMMON_GROUP_PARAMETERS, **GROUP_PARAMETERS[group_type]}
+    for key in group:
+        if key not in parameters:
+            errors.append(make_validation_error(ERROR_MESSAGE_UNKNOWN_GROUP_PARAMETER, [group_number, key]))
+    for key, (parameter_type, is_required) in parameters.items():
+        if key not in group:
+            if is_required:
+                errors.append(make_validation_error(ERROR_MESSAGE_MISSING_GROUP_PARAMETER, [group_number, key]))
+        elif not is_group_parameter_type(group[key], parameter_type):
+            errors.append(make_validation_error(ERROR_MESSAGE_GROUP_PARAMETER_TYPE,
+                                                [group_number, key, parameter_type.__name__]))
+        elif ((key in GROUP_PARAMETER_MINIMUMS and group[key] < GROUP_PARAMETER_MINIMUMS[key])
+              or (key in GROUP_PARAMETER_MAXIMUMS and group[key] > GROUP_PARAMETER_MAXIMUMS[key])):
+            errors.append(make_validation_error(ERROR_MESSAGE_GROUP_PARAMETER_OUT_OF_RANGE, [group_number, key]))
+    if group_type in GROUP_PARAMETERS_BELOW_NUMBER_NODES and len(errors) == number_errors:
+        key: str = GROUP_PARAMETERS_BELOW_NUMBER_NODES[group_type]
+        if group[key] >= group[dict_keys.NETWORK_TOPOLOGY_GROUP_NUMBER_NODES]:
+            errors.append(make_validation_error(ERROR_MESSAGE_GROUP_PARAMETER_OUT_OF_RANGE, [group_number, key]))
+    if group_type == 'tree' and len(errors) == number_errors:
+        number_levels: int = group[dict_keys.NETWORK_TOPOLOGY_GROUP_TREE_NUMBER_LEVELS]
+        for key, element_type in TREE_GROUP_LEVEL_PARAMETER_TYPES.items():
+            if key not in group:
+                continue
+            if any(type(element) != element_type for element in group[key]):
+                errors.append(make_validation_error(ERROR_MESSAGE_GROUP_PARAMETER_TYPE,
+                                                    [group_number, key, element_type.__name__]))
+            elif len(group[key]) != number_levels:
+                errors.append(make_validation_error(ERROR_MESSAGE_GROUP_PARAMETER_LENGTH, [group_number, key]))
+    return len(errors) == number_errors
+
+
+def validate_node_groups(node_groups: List[Dict[str, Any]], errors: List[Dict[str, Any]], nids: List[str],
+                         connection_nids: List[str]):
+    group_names: Set[str] = set()
+    for index, group in enumerate(node_groups):
+        if validate_node_group_parameters(group, index + 1, errors):
+            nids.extend(get_node_group_nids(group))
+        # A resources parameter that is not a dict has already been reported, and bad limits do not stop the nids from
+        # being generated
+        if type(group.get(dict_keys.NODE_RESOURCES)) == dict:
+            validate_resource_limits(group, index + 1, errors)
+        group_name = group.get(dict_keys.NETWORK_TOPOLOGY_GROUP_NAME)
+        if type(group_name) == str:
+            if group_name in group_names:
+                errors.append(make_validation_error(ERROR_MESSAGE_DUPLICATE_GROUP_NAME, group_name))
+            group_names.add(group_name)
+        connections = group.get(dict_keys.NETWORK_TOPOLOGY_GROUP_CONNECTIONS, [])
+        if type(connections) != list:
+            continue
+        for connection in connections:
+            if type(connection) != dict or any(
+                    type(connection.get(key)) != str for key in [dict_keys.NETWORK_TOPOLOGY_GROUP_CONNECTIONS_FROM,
+                                                                 dict_keys.NETWORK_TOPOLOGY_GROUP_CONNECTIONS_TO]):
+                errors.append(make_validation_error(ERROR_MESSAGE_GROUP_CONNECTIONS_TYPE, index + 1))
+            else:
+                connection_nids.append(connection[dict_keys.NETWORK_TOPOLOGY_GROUP_CONNECTIONS_FROM])
+                connection_nids.append(connection[dict_keys.NETWORK_TOPOLOGY_GROUP_CONNECTIONS_TO])
+
+
+def validate_nids(nids: List[str], connection_nids: List[str], errors: List[Dict[str, Any]]):
+    nid_index: Set[str] = set()
+    reported_nids: Set[str] = set()
+    for nid in nids:
+        if nid in nid_index:
+            if nid not in reported_nids:
+                errors.append(make_validation_error(ERROR_MESSAGE_DUPLICATE_NID, nid))
+                reported_nids.add(nid)
+            continue
+        nid_index.add(nid)
+        if not VALID_NID_PATTERN.match(nid):
+            errors.append(make_validation_error(ERROR_MESSAGE_INVALID_NID, nid))
+    for connection_nid in connection_nids:
+        if connection_nid not in nid_index and connection_nid not in reported_nids:
+            errors.append(make_validation_error(ERROR_MESSAGE_DANGLING_CONNECTION, connection_nid))
+            reported_nids.add(connection_nid)
+
+
+# Checks every node and group once, collecting all errors rather than stopping at the first. Only a topology with
+# an invalid overall structure is rejected straight away.
 def validate_topology(topology):
-    confirm_topology_is_a_dict(topology)
-    confirm_all_base_keys_are_valid(topology)
-    confirm_all_values_are_lists_of_dicts(topology)
-
-    # Single nodes
-    single_nodes = topology[dict_keys.NETWORK_TOPOLOGY_SINGLE_NODES]
-    confirm_single_nodes_include_nid(single_nodes)
-    confirm_single_nodes_include_program(single_nodes)
-    confirm_single_nodes_nid_string_type(single_nodes)
-    confirm_single_nodes_program_string_type(single_nodes)
-    confirm_single_nodes_connections_list_of_strings_type(single_nodes)
-    confirm_single_nodes_have_valid_nids(single_nodes)
-    # TODO: more validation
-
-    # TODO: nid validation for group nodes [a-zA-Z0-9][a-zA-Z0-9_.-]+
-
-
-parsers: Dict[str, Callable] = {'YAML': lambda raw: yaml.load(raw, Loader=yaml.FullLoader), 'JSON': json.loads}
+    confirm_topology_structure(topology)
+    errors: List[Dict[str, Any]] = []
+    nids: List[str] = []
+    connection_nids: List[str] = []
+    validate_single_nodes(topology.get(dict_keys.NETWORK_TOPOLOGY_SINGLE_NODES, []), errors, nids, connection_nids)
+    validate_node_groups(topology.get(dict_keys.NETWORK_TOPOLOGY_NODE_GROUPS, []), errors, nids, connection_nids)
+    validate_nids(nids, connection_nids, errors)
+    if len(errors) > 0:
+        first_error: Dict[str, Any] = errors[0]
+        raise NetworkTopologyValidationException(first_error[dict_keys.NETWORK_TOPOLOGY_ERROR_MESSAGE],
+                                                 first_error[dict_keys.NETWORK_TOPOLOGY_ERROR_DATA],
+                                                 errors[:MAX_REPORTED_VALIDATION_ERRORS])
+
+
+# libyaml's C loader is only available when PyYAML was built against libyaml
+YAML_LOADER = getattr(yaml, 'CFullLoader', yaml.FullLoader)
+parsers: Dict[str, Callable] = {'YAML': lambda raw: yaml.load(raw, Loader=YAML_LOADER), 'JSON': json.loads}
 parsingErrors: Dict[str, Exception] = {'YAML': yaml.YAMLError, 'JSON': json.JSONDecodeError}
+validated_raw_topology_cache: 'OrderedDict[Tuple[str, str], Dict[str, Any]]' = OrderedDict()
 
 
-def validate_raw_topology(language: str, raw: str) -> Dict[str, Any]:
+def parse_and_validate_raw_topology(language: str, raw: str) -> Dict[str, Any]:
     try:
         topology = parsers[language](raw)
         validate_topology(topology)
@@ -134,16 +332,45 @@ def validate_raw_topology(language: str, raw: str) -> Dict[str, Any]:
         return {
             dict_keys.NETWORK_TOPOLOGY_IS_VALID: False,
             dict_keys.NETWORK_TOPOLOGY_ERROR_MESSAGE: ERROR_MESSAGE_PARSING,
-            dict_keys.NETWORK_TOPOLOGY_ERROR_DATA: str(parsingError)
+            dict_keys.NETWORK_TOPOLOGY_ERROR_DATA: str(parsingError),
+            dict_keys.NETWORK_TOPOLOGY_ERRORS: [make_validation_error(ERROR_MESSAGE_PARSING, str(parsingError))]
         }
     except NetworkTopologyValidationException as validationException:
         return {
             dict_keys.NETWORK_TOPOLOGY_IS_VALID: False,
             dict_keys.NETWORK_TOPOLOGY_ERROR_MESSAGE: validationException.message,
-            dict_keys.NETWORK_TOPOLOGY_ERROR_DATA: validationException.data
+            dict_keys.NETWORK_TOPOLOGY_ERROR_DATA: validationException.data,
+            dict_keys.NETWORK_TOPOLOGY_ERRORS: validationException.errors
         }
 
 
+def get_validated_raw_topology_cache_key(language: str, raw: str) -> Tuple[str, str]:
+    return language, hashlib.sha256(raw.encode('utf-8')).hexdigest()
+
+
+# Results are cached by language and a hash of the raw code, and are shared between callers, so must not be mutated
+def get_cached_validation_result(language: str, raw: str) -> Optional[Dict[str, Any]]:
+    cache_key: Tuple[str, str] = get_validated_raw_topology_cache_key(language, raw)
+    if cache_key not in validated_raw_topology_cache:
+        return None
+    validated_raw_topology_cache.move_to_end(cache_key)
+    return validated_raw_topology_cache[cache_key]
+
+
+def cache_validation_result(language: str, raw: str, validation_result: Dict[str, Any]):
+    validated_raw_topology_cache[get_validated_raw_topology_cache_key(language, raw)] = validation_result
+    if len(validated_raw_topology_cache) > constants.VALIDATED_RAW_TOPOLOGY_CACHE_SIZE:
+        validated_raw_topology_cache.popitem(last=False)
+
+
+def get_validation_result(language: str, raw: str) -> Dict[str, Any]:
+    validation_result: Optional[Dict[str, Any]] = get_cached_validation_result(language, raw)
+    if validation_result is None:
+        validation_result = parse_and_validate_raw_topology(language, raw)
+        cache_validation_result(language, raw, validation_result)
+    return validation_result
+
+
 def add_line_group_connections(nodes: List[Dict[str, Any]]):
     for index in range(1, len(nodes)):
         nodes[index][dict_keys.NODE_CONNECTIONS] = [nodes[index - 1][dict_keys.NODE_NID]]
@@ -173,6 +400,24 @@ def generate_single_type_node_group(nids: List[str], program: str, group_type: s
     return nodes
 
 
+# Connects each node to all of its neighbours in the generated graph, so the connections are already symmetric
+def generate_generated_node_group(nids: List[str], program: str, group: Dict[str, Any]) -> List[Dict[str, Any]]:
+    import graph_generators  # NumPy is slow to import and only needed for generated groups
+    offsets, neighbours = graph_generators.generate_adjacency(
+        group[dict_keys.NETWORK_TOPOLOGY_GROUP_TYPE], len(nids),
+        group.get(dict_keys.NETWORK_TOPOLOGY_GROUP_SEED, constants.DEFAULT_GROUP_SEED),
+        number_rows=group.get(dict_keys.NETWORK_TOPOLOGY_GROUP_GRID_NUMBER_ROWS, 0),
+        number_columns=group.get(dict_keys.NETWORK_TOPOLOGY_GROUP_GRID_NUMBER_COLUMNS, 0),
+        connection_probability=group.get(dict_keys.NETWORK_TOPOLOGY_GROUP_RANDOM_CONNECTION_PROBABILITY, 0),
+        number_neighbours=group.get(dict_keys.NETWORK_TOPOLOGY_GROUP_SMALL_WORLD_NUMBER_NEIGHBOURS, 0),
+        rewiring_probability=group.get(dict_keys.NETWORK_TOPOLOGY_GROUP_SMALL_WORLD_REWIRING_PROBABILITY, 0),
+        number_attachments=group.get(dict_keys.NETWORK_TOPOLOGY_GROUP_BARABASI_ALBERT_NUMBER_ATTACHMENTS, 0))
+    neighbour_nids: List[str] = list(map(nids.__getitem__, neighbours))
+    return [{dict_keys.NODE_NID: nid, dict_keys.NODE_PROGRAM: program,
+             dict_keys.NODE_CONNECTIONS: neighbour_nids[offsets[index]:offsets[index + 1]]}
+            for index, nid in enumerate(nids)]
+
+
 def generate_star_node_group(host_nids: List[str], host_program: str, hub_nid: str,
                              hub_program: str) -> List[Dict[str, Any]]:
     hub_node: Dict[str, Any] = {dict_keys.NODE_NID: hub_nid, dict_keys.NODE_PROGRAM: hub_program}
@@ -209,6 +454,64 @@ def generate_tree_node_group(nids_for_each_level: List[List[str]], programs: Lis
     return util.flatten(nodes_for_each_level)
 
 
+def generate_nids(nid_prefix: str, nid_starting_number: int, nid_number_increment: int, nid_suffix: str,
+                  number_nodes: int) -> List[str]:
+    return [f'{nid_prefix}{nid_starting_number + node_index * nid_number_increment}{nid_suffix}'
+            for node_index in range(0, number_nodes)]
+
+
+# Grid and torus groups have their size given as rows and columns, and their nids run along each row in turn
+def get_group_number_nodes(group: Dict[str, Any]) -> int:
+    if group[dict_keys.NETWORK_TOPOLOGY_GROUP_TYPE] in ['grid', 'torus']:
+        return (group[dict_keys.NETWORK_TOPOLOGY_GROUP_GRID_NUMBER_ROWS]
+                * group[dict_keys.NETWORK_TOPOLOGY_GROUP_GRID_NUMBER_COLUMNS])
+    return group[dict_keys.NETWORK_TOPOLOGY_GROUP_NUMBER_NODES]
+
+
+def get_single_type_group_nids(group: Dict[str, Any]) -> List[str]:
+    return generate_nids(group.get(dict_keys.NETWORK_TOPOLOGY_GROUP_NID_PREFIX, constants.DEFAULT_NID_PREFIX),
+                         group.get(dict_keys.NETWORK_TOPOLOGY_GROUP_NID_STARTING_NUMBER,
+                                   constants.DEFAULT_NID_STARTING_NUMBER),
+                         group.get(dict_keys.NETWORK_TOPOLOGY_GROUP_NID_NUMBER_INCREMENT,
+                                   constants.DEFAULT_NID_NUMBER_INCREMENT),
+                         group.get(dict_keys.NETWORK_TOPOLOGY_GROUP_NID_SUFFIX, constants.DEFAULT_NID_SUFFIX),
+                         get_group_number_nodes(group))
+
+
+def get_star_group_host_nids(group: Dict[str, Any]) -> List[str]:
+    return generate_nids(group.get(dict_keys.NETWORK_TOPOLOGY_GROUP_STAR_HOST_NID_PREFIX, constants.DEFAULT_NID_PREFIX),
+                         group.get(dict_keys.NETWORK_TOPOLOGY_GROUP_STAR_HOST_NID_STARTING_NUMBER,
+                                   constants.DEFAULT_NID_STARTING_NUMBER),
+                         group.get(dict_keys.NETWORK_TOPOLOGY_GROUP_STAR_HOST_NID_NUMBER_INCREMENT,
+                                   constants.DEFAULT_NID_NUMBER_INCREMENT),
+                         group.get(dict_keys.NETWORK_TOPOLOGY_GROUP_STAR_HOST_NID_SUFFIX, constants.DEFAULT_NID_SUFFIX),
+                         group[dict_keys.NETWORK_TOPOLOGY_GROUP_STAR_NUMBER_HOSTS])
+
+
+def get_tree_group_nids_for_each_level(group: Dict[str, Any]) -> List[List[str]]:
+    number_levels: int = group[dict_keys.NETWORK_TOPOLOGY_GROUP_TREE_NUMBER_LEVELS]
+    return generate_tree_nids(
+        number_levels,
+        group[dict_keys.NETWORK_TOPOLOGY_GROUP_TREE_NUMBER_CHILDREN],
+        group[dict_keys.NETWORK_TOPOLOGY_GROUP_TREE_NID_PREFIXES],
+        group.get(dict_keys.NETWORK_TOPOLOGY_GROUP_TREE_NID_STARTING_NUMBERS,
+                  [constants.DEFAULT_NID_STARTING_NUMBER] * number_levels),
+        group.get(dict_keys.NETWORK_TOPOLOGY_GROUP_TREE_NID_NUMBER_INCREMENTS,
+                  [constants.DEFAULT_NID_NUMBER_INCREMENT] * number_levels),
+        group.get(dict_keys.NETWORK_TOPOLOGY_GROUP_TREE_NID_SUFFIXES, [constants.DEFAULT_NID_SUFFIX] * number_levels))
+
+
+def get_node_group_nids(group: Dict[str, Any]) -> List[str]:
+    group_type: str = group[dict_keys.NETWORK_TOPOLOGY_GROUP_TYPE]
+    if group_type in SINGLE_TYPE_NODE_GROUPS or group_type in GENERATED_NODE_GROUPS:
+        return get_single_type_group_nids(group)
+    elif group_type == 'star':
+        return [group[dict_keys.NETWORK_TOPOLOGY_GROUP_STAR_HUB_NID]] + get_star_group_host_nids(group)
+    elif group_type == 'tree':
+        return util.flatten(get_tree_group_nids_for_each_level(group))
+    return []
+
+
 def unpack_node_groups(node_groups: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
     nodes = []
     for group in node_groups:
@@ -216,134 +519,154 @@ def unpack_node_groups(node_groups: List[Dict[str, Any]]) -> List[Dict[str, Any]
         group_type: str = group[dict_keys.NETWORK_TOPOLOGY_GROUP_TYPE]
         if group_type in SINGLE_TYPE_NODE_GROUPS:
             program: str = group[dict_keys.NODE_PROGRAM]
-            number_nodes: int = group[dict_keys.NETWORK_TOPOLOGY_GROUP_NUMBER_NODES]
-            nid_prefix: str = (group[dict_keys.NETWORK_TOPOLOGY_GROUP_NID_PREFIX]
-                               if dict_keys.NETWORK_TOPOLOGY_GROUP_NID_PREFIX in group
-                               else constants.DEFAULT_NID_PREFIX)
-            nid_suffix: str = (group[dict_keys.NETWORK_TOPOLOGY_GROUP_NID_SUFFIX]
-                               if dict_keys.NETWORK_TOPOLOGY_GROUP_NID_SUFFIX in group
-                               else constants.DEFAULT_NID_SUFFIX)
-            nid_starting_number: int = (group[dict_keys.NETWORK_TOPOLOGY_GROUP_NID_STARTING_NUMBER]
-                                        if dict_keys.NETWORK_TOPOLOGY_GROUP_NID_STARTING_NUMBER in group
-                                        else constants.DEFAULT_NID_STARTING_NUMBER)
-            nid_number_increment: int = (group[dict_keys.NETWORK_TOPOLOGY_GROUP_NID_NUMBER_INCREMENT]
-                                         if dict_keys.NETWORK_TOPOLOGY_GROUP_NID_NUMBER_INCREMENT in group
-                                         else constants.DEFAULT_NID_NUMBER_INCREMENT)
-            nids: List[str] = [f'{nid_prefix}{nid_starting_number + node_index * nid_number_increment}{nid_suffix}' for
-                               node_index in range(0, number_nodes)]
-            group_nodes.extend(generate_single_type_node_group(nids, program, group_type))
+            group_nodes.extend(generate_single_type_node_group(get_single_type_group_nids(group), program, group_type))
+        elif group_type in GENERATED_NODE_GROUPS:
+            group_nodes.extend(generate_generated_node_group(get_single_type_group_nids(group),
+                                                             group[dict_keys.NODE_PROGRAM], group))
         elif group_type == 'star':
             hub_nid: str = group[dict_keys.NETWORK_TOPOLOGY_GROUP_STAR_HUB_NID]
             hub_program: str = group[dict_keys.NETWORK_TOPOLOGY_GROUP_STAR_HUB_PROGRAM]
-            number_hosts: int = group[dict_keys.NETWORK_TOPOLOGY_GROUP_STAR_NUMBER_HOSTS]
             host_program: str = group[dict_keys.NETWORK_TOPOLOGY_GROUP_STAR_HOST_PROGRAM]
-            host_nid_prefix: str = (group[dict_keys.NETWORK_TOPOLOGY_GROUP_STAR_HOST_NID_PREFIX]
-                                    if dict_keys.NETWORK_TOPOLOGY_GROUP_STAR_HOST_NID_PREFIX in group
-                                    else constants.DEFAULT_NID_PREFIX)
-            host_nid_suffix: str = (group[dict_keys.NETWORK_TOPOLOGY_GROUP_STAR_HOST_NID_SUFFIX]
-                                    if dict_keys.NETWORK_TOPOLOGY_GROUP_STAR_HOST_NID_SUFFIX in group
-                                    else constants.DEFAULT_NID_SUFFIX)
-            host_nid_starting_number: int = (group[dict_keys.NETWORK_TOPOLOGY_GROUP_STAR_HOST_NID_STARTING_NUMBER]
-                                             if dict_keys.NETWORK_TOPOLOGY_GROUP_STAR_HOST_NID_STARTING_NUMBER in group
-                                             else constants.DEFAULT_NID_STARTING_NUMBER)
-            host_nid_number_increment: int = (group[dict_keys.NETWORK_TOPOLOGY_GROUP_STAR_HOST_NID_NUMBER_INCREMENT]
-                                              if (dict_keys.NETWORK_TOPOLOGY_GROUP_STAR_HOST_NID_NUMBER_INCREMENT
-                                                  in group)
-                                              else constants.DEFAULT_NID_NUMBER_INCREMENT)
-            host_nids: List[str] = [f'{host_nid_prefix}'
-                                    f'{host_nid_starting_number + host_node_index * host_nid_number_increment}'
-                                    f'{host_nid_suffix}'
-                                    for host_node_index in range(0, number_hosts)]
-            group_nodes.extend(generate_star_node_group(host_nids, host_program, hub_nid, hub_program))
+            group_nodes.extend(generate_star_node_group(get_star_group_host_nids(group), host_program, hub_nid,
+                                                        hub_program))
         elif group_type == 'tree':
             number_levels: int = group[dict_keys.NETWORK_TOPOLOGY_GROUP_TREE_NUMBER_LEVELS]
             number_children: int = group[dict_keys.NETWORK_TOPOLOGY_GROUP_TREE_NUMBER_CHILDREN]
             programs: List[str] = group[dict_keys.NETWORK_TOPOLOGY_GROUP_TREE_PROGRAMS]
-            nid_prefixes: List[str] = group[dict_keys.NETWORK_TOPOLOGY_GROUP_TREE_NID_PREFIXES]
-            nid_starting_numbers: List[int] = (group[dict_keys.NETWORK_TOPOLOGY_GROUP_TREE_NID_STARTING_NUMBERS]
-                                               if dict_keys.NETWORK_TOPOLOGY_GROUP_TREE_NID_STARTING_NUMBERS in group
-                                               else [constants.DEFAULT_NID_STARTING_NUMBER] * number_levels)
-            nid_number_increments: List[int] = (group[dict_keys.NETWORK_TOPOLOGY_GROUP_TREE_NID_NUMBER_INCREMENTS]
-                                                if dict_keys.NETWORK_TOPOLOGY_GROUP_TREE_NID_NUMBER_INCREMENTS in group
-                                                else [constants.DEFAULT_NID_NUMBER_INCREMENT] * number_levels)
-            nid_suffixes: List[str] = (group[dict_keys.NETWORK_TOPOLOGY_GROUP_TREE_NID_SUFFIXES]
-                                       if dict_keys.NETWORK_TOPOLOGY_GROUP_TREE_NID_SUFFIXES in group
-                                       else [constants.DEFAULT_NID_SUFFIX] * number_levels)
-            nids_for_each_level: List[List[str]] = generate_tree_nids(number_levels, number_children, nid_prefixes,
-                                                                      nid_starting_numbers, nid_number_increments,
-                                                                      nid_suffixes)
-            group_nodes.extend(generate_tree_node_group(nids_for_each_level, programs, number_levels, number_children))
+            group_nodes.extend(generate_tree_node_group(get_tree_group_nids_for_each_level(group), programs,
+                                                        number_levels, number_children))
 
         for node in group_nodes:
             if dict_keys.NODE_CONNECTIONS not in node:
                 node[dict_keys.NODE_CONNECTIONS] = []
+            if dict_keys.NETWORK_TOPOLOGY_GROUP_NAME in group:
+                node[dict_keys.NODE_GROUP] = group[dict_keys.NETWORK_TOPOLOGY_GROUP_NAME]
+            if dict_keys.NODE_RESOURCES in group:
+                node[dict_keys.NODE_RESOURCES] = group[dict_keys.NODE_RESOURCES]
 
         if dict_keys.NETWORK_TOPOLOGY_GROUP_CONNECTIONS in group:
+            group_nodes_by_nid: Dict[str, Dict[str, Any]] = {node[dict_keys.NODE_NID]: node for node in group_nodes}
             for connection in group[dict_keys.NETWORK_TOPOLOGY_GROUP_CONNECTIONS]:
                 nid_from: str = connection[dict_keys.NETWORK_TOPOLOGY_GROUP_CONNECTIONS_FROM]
                 nid_to: str = connection[dict_keys.NETWORK_TOPOLOGY_GROUP_CONNECTIONS_TO]
-                for node in group_nodes:
-                    if node[dict_keys.NODE_NID] == nid_from:
-                        node[dict_keys.NODE_CONNECTIONS].extend([nid_to])
-                    elif node[dict_keys.NODE_NID] == nid_to:
-                        node[dict_keys.NODE_CONNECTIONS].extend([nid_from])
+                if nid_from in group_nodes_by_nid:
+                    group_nodes_by_nid[nid_from][dict_keys.NODE_CONNECTIONS].append(nid_to)
+                if nid_to != nid_from and nid_to in group_nodes_by_nid:
+                    group_nodes_by_nid[nid_to][dict_keys.NODE_CONNECTIONS].append(nid_from)
         nodes.extend(group_nodes)
 
     return nodes
 
 
-def unpack_topology(topology: Dict[str, Any]) -> List[Dict[str, Any]]:
-    single_nodes = (topology[dict_keys.NETWORK_TOPOLOGY_SINGLE_NODES].copy()
+# Reads whether nodes are self-connected from the custom config unless it is given, as it is in worker processes,
+# which do not use the databases
+def unpack_topology(topology: Dict[str, Any], is_nodes_self_connected: Optional[bool] = None) -> List[Dict[str, Any]]:
+    single_nodes = ([node.copy() for node in topology[dict_keys.NETWORK_TOPOLOGY_SINGLE_NODES]]
                     if dict_keys.NETWORK_TOPOLOGY_SINGLE_NODES in topology
                     else [])
     group_nodes = (unpack_node_groups(topology[dict_keys.NETWORK_TOPOLOGY_NODE_GROUPS])
                    if dict_keys.NETWORK_TOPOLOGY_NODE_GROUPS in topology
                    else [])
 
-    is_nodes_self_connected = custom_config.get_custom_config()[dict_keys.CUSTOM_CONFIG_SELF_CONNECTED_NODES]
+    if is_nodes_self_connected is None:
+        is_nodes_self_connected = custom_config.get_custom_config()[dict_keys.CUSTOM_CONFIG_SELF_CONNECTED_NODES]
     nodes = single_nodes + group_nodes
+    # Each node's connections are kept as the keys of a dict, which drops repeats but keeps their order
+    connections_by_nid: Dict[str, Dict[str, None]] = {}
     for node in nodes:
-        if dict_keys.NODE_CONNECTIONS not in node:
-            node[dict_keys.NODE_CONNECTIONS] = []
+        connections: Dict[str, None] = dict.fromkeys(node.get(dict_keys.NODE_CONNECTIONS, []))
         if is_nodes_self_connected:
-            node[dict_keys.NODE_CONNECTIONS] = list(set(node[dict_keys.NODE_CONNECTIONS] + [node[dict_keys.NODE_NID]]))
+            connections[node[dict_keys.NODE_NID]] = None
+        connections_by_nid[node[dict_keys.NODE_NID]] = connections
 
+    # Makes every connection go both ways, looking each peer up by nid rather than searching the nodes
     for node in nodes:
-        peer_nids = node[dict_keys.NODE_CONNECTIONS]
-        peer_nodes = filter(lambda n: n[dict_keys.NODE_NID] in peer_nids, nodes)
-        for peer_node in peer_nodes:
-            peer_node[dict_keys.NODE_CONNECTIONS] = list(
-                set(peer_node[dict_keys.NODE_CONNECTIONS] + [node[dict_keys.NODE_NID]]))
+        nid: str = node[dict_keys.NODE_NID]
+        for peer_nid in node.get(dict_keys.NODE_CONNECTIONS, []):
+            if peer_nid in connections_by_nid:
+                connections_by_nid[peer_nid][nid] = None
 
+    for node in nodes:
+        node[dict_keys.NODE_CONNECTIONS] = list(connections_by_nid[node[dict_keys.NODE_NID]])
     return nodes
 
 
-def update_unpacked_topology_with_self_connected_nodes():
-    language = get_raw_network_topology_language()
-    raw = get_raw_network_topology_code()
-    topology = parsers[language](raw)
-    save_unpacked_network_topology(unpack_topology(topology))
-    update_self_connection_parameters()
+def find_explicitly_self_connected_nids(topology: Dict[str, Any]) -> List[str]:
+    self_connected_nids: List[str] = [
+        node[dict_keys.NODE_NID] for node in topology.get(dict_keys.NETWORK_TOPOLOGY_SINGLE_NODES, [])
+        if node[dict_keys.NODE_NID] in node.get(dict_keys.NODE_CONNECTIONS, [])]
+    for group in topology.get(dict_keys.NETWORK_TOPOLOGY_NODE_GROUPS, []):
+        for connection in group.get(dict_keys.NETWORK_TOPOLOGY_GROUP_CONNECTIONS, []):
+            if (connection[dict_keys.NETWORK_TOPOLOGY_GROUP_CONNECTIONS_FROM]
+                    == connection[dict_keys.NETWORK_TOPOLOGY_GROUP_CONNECTIONS_TO]):
+                self_connected_nids.append(connection[dict_keys.NETWORK_TOPOLOGY_GROUP_CONNECTIONS_FROM])
+    return self_connected_nids
+
+
+# Adds or removes each node's self-connection in place, keeping those written explicitly in the raw topology.
+# Returns the nids of the nodes that changed.
+def update_unpacked_topology_with_self_connected_nodes(is_nodes_self_connected: bool) -> List[str]:
+    unpacked_topology: List[Dict[str, Any]] = get_unpacked_network_topology()
+    explicitly_self_connected_nids: Set[str] = set(get_explicitly_self_connected_nids())
+    changed_nids: List[str] = []
+    for node in unpacked_topology:
+        nid: str = node[dict_keys.NODE_NID]
+        connections: List[str] = node[dict_keys.NODE_CONNECTIONS]
+        is_node_self_connected: bool = is_nodes_self_connected or nid in explicitly_self_connected_nids
+        if is_node_self_connected and nid not in connections:
+            connections.append(nid)
+            changed_nids.append(nid)
+        elif not is_node_self_connected and nid in connections:
+            connections.remove(nid)
+            changed_nids.append(nid)
+    if len(changed_nids) > 0:
+        save_unpacked_network_topology(unpacked_topology)
+        if not is_nodes_self_connected:
+            remove_self_connection_parameters(changed_nids)
+    return changed_nids
 
 
 def save_unpacked_network_topology(unpacked_topology: List[Dict]):
+    global paged_unpacked_network_topology
     database.network_topology_db.upsert(
         {dict_keys.NETWORK_TOPOLOGY_TYPE: network_topology_values.NETWORK_TOPOLOGY_UNPACKED_TYPE,
-         dict_keys.NETWORK_TOPOLOGY_DATA: unpacked_topology},
+         dict_keys.NETWORK_TOPOLOGY_DATA: unpacked_topology,
+         dict_keys.NETWORK_TOPOLOGY_NUMBER_CONNECTIONS: count_connections(unpacked_topology)},
         Query().type == network_topology_values.NETWORK_TOPOLOGY_UNPACKED_TYPE)
+    paged_unpacked_network_topology = None
 
 
 def initialise_unpacked_network_topology():
     save_unpacked_network_topology(constants.DEFAULT_UNPACKED_NETWORK_TOPOLOGY)
 
 
-def get_unpacked_network_topology() -> List[Dict]:
+def get_unpacked_network_topology_record() -> Dict[str, Any]:
     if len(database.network_topology_db.search(
             Query().type == network_topology_values.NETWORK_TOPOLOGY_UNPACKED_TYPE)) == 0:
         initialise_unpacked_network_topology()
-    return \
-        database.network_topology_db.search(Query().type == network_topology_values.NETWORK_TOPOLOGY_UNPACKED_TYPE)[0][
-            dict_keys.NETWORK_TOPOLOGY_DATA]
+    return database.network_topology_db.search(
+        Query().type == network_topology_values.NETWORK_TOPOLOGY_UNPACKED_TYPE)[0]
+
+
+def get_unpacked_network_topology() -> List[Dict]:
+    return get_unpacked_network_topology_record()[dict_keys.NETWORK_TOPOLOGY_DATA]
+
+
+# Returns the saved unpacked topology, the index of each nid in it and its number of connections. The topology must not
+# be modified, as it is shared between pages.
+def get_paged_unpacked_network_topology() -> Tuple[List[Dict[str, Any]], Dict[str, int], int]:
+    global paged_unpacked_network_topology
+    if paged_unpacked_network_topology is None or paged_unpacked_network_topology[0] is not \
+            database.network_topology_db:
+        record: Dict[str, Any] = get_unpacked_network_topology_record()
+        unpacked_topology: List[Dict[str, Any]] = record[dict_keys.NETWORK_TOPOLOGY_DATA]
+        # Topologies saved before the number of connections was stored with them are counted once here
+        number_connections: Optional[int] = record.get(dict_keys.NETWORK_TOPOLOGY_NUMBER_CONNECTIONS)
+        paged_unpacked_network_topology = (
+            database.network_topology_db, unpacked_topology,
+            {node[dict_keys.NODE_NID]: index for index, node in enumerate(unpacked_topology)},
+            count_connections(unpacked_topology) if number_connections is None else number_connections)
+    return paged_unpacked_network_topology[1:]
 
 
 def save_raw_network_topology_code(raw: str):
@@ -374,20 +697,43 @@ def save_raw_network_topology_language(language: str):
 
 
 def initialise_raw_network_topology_language():
-    save_raw_network_topology_code(constants.DEFAULT_RAW_NETWORK_TOPOLOGY_LANGUAGE)
+    save_raw_network_topology_language(constants.DEFAULT_RAW_NETWORK_TOPOLOGY_LANGUAGE)
 
 
 def get_raw_network_topology_language() -> str:
     if len(database.network_topology_db.search(
             Query().type == network_topology_values.NETWORK_TOPOLOGY_RAW_LANGUAGE_TYPE)) == 0:
-        initialise_raw_network_topology_code()
+        initialise_raw_network_topology_language()
     return \
         database.network_topology_db.search(Query().type == network_topology_values.NETWORK_TOPOLOGY_RAW_LANGUAGE_TYPE)[
             0][
             dict_keys.NETWORK_TOPOLOGY_DATA]
 
 
-def save_connection_parameters(connection_parameters: Dict[str, Dict[str, Dict[str, Any]]]):
+def save_explicitly_self_connected_nids(nids: List[str]):
+    database.network_topology_db.upsert(
+        {dict_keys.NETWORK_TOPOLOGY_TYPE: network_topology_values.NETWORK_TOPOLOGY_EXPLICIT_SELF_CONNECTIONS_TYPE,
+         dict_keys.NETWORK_TOPOLOGY_DATA: nids},
+        Query().type == network_topology_values.NETWORK_TOPOLOGY_EXPLICIT_SELF_CONNECTIONS_TYPE)
+
+
+# Topologies saved before the explicit self-connections were recorded with them have no record, so they are found from
+# the saved raw topology the first time they are needed
+def get_explicitly_self_connected_nids() -> List[str]:
+    records: List[Dict[str, Any]] = database.network_topology_db.search(
+        Query().type == network_topology_values.NETWORK_TOPOLOGY_EXPLICIT_SELF_CONNECTIONS_TYPE)
+    if len(records) > 0:
+        return records[0][dict_keys.NETWORK_TOPOLOGY_DATA]
+    language: str = get_raw_network_topology_language()
+    validation_result: Optional[Dict[str, Any]] = (
+        get_validation_result(language, get_raw_network_topology_code()) if language in parsers else None)
+    nids: List[str] = (find_explicitly_self_connected_nids(validation_result[dict_keys.NETWORK_TOPOLOGY_TOPOLOGY])
+                       if validation_result and validation_result[dict_keys.NETWORK_TOPOLOGY_IS_VALID] else [])
+    save_explicitly_self_connected_nids(nids)
+    return nids
+
+
+def save_connection_parameters(connection_parameters: Dict[str, Any]):
     database.network_topology_db.upsert(
         {dict_keys.NETWORK_TOPOLOGY_TYPE: network_topology_values.NETWORK_TOPOLOGY_CONNECTION_PARAMETERS_TYPE,
          dict_keys.NETWORK_TOPOLOGY_DATA: connection_parameters},
@@ -395,59 +741,264 @@ def save_connection_parameters(connection_parameters: Dict[str, Dict[str, Dict[s
     )
 
 
+def make_connection_parameters(default: Dict[str, Any], group_defaults: Dict[str, Dict[str, Any]],
+                               overrides: Dict[str, Dict[str, Dict[str, Any]]]) -> Dict[str, Any]:
+    return {
+        dict_keys.CONNECTION_PARAMETERS_DEFAULT: default,
+        dict_keys.CONNECTION_PARAMETERS_GROUP_DEFAULTS: group_defaults,
+        dict_keys.CONNECTION_PARAMETERS_OVERRIDES: overrides
+    }
+
+
+def is_dict_of(value: Any, is_item: Callable[[Any], bool]) -> bool:
+    return type(value) == dict and all(type(key) == str and is_item(item) for key, item in value.items())
+
+
+# Checks the shape of sparse connection parameters from outside, such as an imported topology's, before they are saved
+def is_valid_connection_parameters(connection_parameters: Any) -> bool:
+    def is_parameters(parameters: Any) -> bool:
+        return type(parameters) == dict
+
+    if type(connection_parameters) != dict:
+        return False
+    overrides = connection_parameters.get(dict_keys.CONNECTION_PARAMETERS_OVERRIDES)
+    return (is_parameters(connection_parameters.get(dict_keys.CONNECTION_PARAMETERS_DEFAULT))
+            and is_dict_of(connection_parameters.get(dict_keys.CONNECTION_PARAMETERS_GROUP_DEFAULTS), is_parameters)
+            and is_dict_of(overrides, lambda to_nid_overrides: is_dict_of(to_nid_overrides, is_parameters))
+            and all(from_nid <= to_nid for from_nid, to_nid_overrides in overrides.items()
+                    for to_nid in to_nid_overrides))
+
+
 def initialise_connection_parameters():
-    save_connection_parameters({})
+    save_connection_parameters(make_connection_parameters(constants.DEFAULT_CONNECTION_PARAMETERS, {}, {}))
+
+
+def migrate_dense_connection_parameters(dense: Dict[str, Dict[str, Dict[str, Any]]]) -> Dict[str, Any]:
+    overrides: Dict[str, Dict[str, Dict[str, Any]]] = {}
+    for from_nid in dense:
+        for to_nid in dense[from_nid]:
+            if dense[from_nid][to_nid] != constants.DEFAULT_CONNECTION_PARAMETERS:
+                overrides.setdefault(from_nid, {})[to_nid] = dense[from_nid][to_nid]
+    return make_connection_parameters(constants.DEFAULT_CONNECTION_PARAMETERS, {}, overrides)
 
 
-def get_connection_parameters() -> Dict[str, Dict[str, Dict[str, Any]]]:
+# Returns the sparse representation: a global default, per-group defaults and per-edge overrides keyed by the
+# lexicographically smaller nid. Use expand_connection_parameters or resolve_connection_parameters to read edges.
+def get_connection_parameters() -> Dict[str, Any]:
     if len(database.network_topology_db.search(
             Query().type == network_topology_values.NETWORK_TOPOLOGY_CONNECTION_PARAMETERS_TYPE)) == 0:
         initialise_connection_parameters()
-    return \
-        database.network_topology_db.search(
-            Query().type == network_topology_values.NETWORK_TOPOLOGY_CONNECTION_PARAMETERS_TYPE)[
-            0][
-            dict_keys.NETWORK_TOPOLOGY_DATA]
+    connection_parameters = database.network_topology_db.search(
+        Query().type == network_topology_values.NETWORK_TOPOLOGY_CONNECTION_PARAMETERS_TYPE)[0][
+        dict_keys.NETWORK_TOPOLOGY_DATA]
+    if dict_keys.CONNECTION_PARAMETERS_OVERRIDES not in connection_parameters:
+        connection_parameters = migrate_dense_connection_parameters(connection_parameters)
+        save_connection_parameters(connection_parameters)
+    return connection_parameters
+
+
+def get_group_by_nid(unpacked_topology: List[Dict[str, Any]]) -> Dict[str, str]:
+    return {node[dict_keys.NODE_NID]: node[dict_keys.NODE_GROUP]
+            for node in unpacked_topology if dict_keys.NODE_GROUP in node}
+
+
+def resolve_connection_parameters(connection_parameters: Dict[str, Any], group_by_nid: Dict[str, str],
+                                  nid_a: str, nid_b: str) -> Dict[str, Any]:
+    from_nid, to_nid = (nid_a, nid_b) if nid_a <= nid_b else (nid_b, nid_a)
+    overrides: Dict[str, Dict[str, Dict[str, Any]]] = connection_parameters[dict_keys.CONNECTION_PARAMETERS_OVERRIDES]
+    if from_nid in overrides and to_nid in overrides[from_nid]:
+        return overrides[from_nid][to_nid]
+    group_defaults: Dict[str, Dict[str, Any]] = connection_parameters[dict_keys.CONNECTION_PARAMETERS_GROUP_DEFAULTS]
+    group: str = group_by_nid.get(from_nid)
+    if group is not None and group == group_by_nid.get(to_nid) and group in group_defaults:
+        return group_defaults[group]
+    return connection_parameters[dict_keys.CONNECTION_PARAMETERS_DEFAULT]
+
+
+# Expands the sparse connection parameters into { from_nid: { to_nid: parameters } } for every connection with
+# from_nid <= to_nid. Resolved parameters are shared rather than copied. A group_by_nid covering the nodes and their
+# peers can be given in place of building one from the whole topology.
+def expand_connection_parameters(unpacked_topology: List[Dict[str, Any]], nodes: List[Dict[str, Any]] = None,
+                                 connection_parameters: Dict[str, Any] = None,
+                                 group_by_nid: Dict[str, str] = None) -> Dict[str, Dict[str, Dict[str, Any]]]:
+    connection_parameters = connection_parameters if connection_parameters else get_connection_parameters()
+    group_by_nid = group_by_nid if group_by_nid is not None else get_group_by_nid(unpacked_topology)
+    expanded: Dict[str, Dict[str, Dict[str, Any]]] = {}
+    for node in (unpacked_topology if nodes is None else nodes):
+        nid: str = node[dict_keys.NODE_NID]
+        for connection_nid in node[dict_keys.NODE_CONNECTIONS]:
+            if connection_nid >= nid:
+                expanded.setdefault(nid, {})[connection_nid] = resolve_connection_parameters(
+                    connection_parameters, group_by_nid, nid, connection_nid)
+    return expanded
+
+
+def get_expanded_connection_parameters() -> Dict[str, Dict[str, Dict[str, Any]]]:
+    return expand_connection_parameters(get_unpacked_network_topology())
 
 
 def save_initial_connection_parameters():
-    unpacked_topology: List[dict] = get_unpacked_network_topology()
-    connection_parameters: Dict[str, Dict[str, Dict[str, Any]]] = {}
-    for node in unpacked_topology:
-        nid = node[dict_keys.NODE_NID]
-        connections = node[dict_keys.NODE_CONNECTIONS]
-        for connection_nid in connections:
-            if connection_nid >= nid:
-                if nid not in connection_parameters:
-                    connection_parameters[nid] = {}
-                connection_parameters[nid][connection_nid] = constants.DEFAULT_CONNECTION_PARAMETERS
+    previous_connection_parameters: Dict[str, Any] = get_connection_parameters()
+    groups: Set[str] = set(get_group_by_nid(get_unpacked_network_topology()).values())
+    group_defaults: Dict[str, Dict[str, Any]] = {
+        group: parameters
+        for group, parameters in previous_connection_parameters[dict_keys.CONNECTION_PARAMETERS_GROUP_DEFAULTS].items()
+        if group in groups
+    }
+    save_connection_parameters(make_connection_parameters(
+        previous_connection_parameters[dict_keys.CONNECTION_PARAMETERS_DEFAULT], group_defaults, {}))
+
+
+def remove_self_connection_parameters(nids: List[str]):
+    connection_parameters: Dict[str, Any] = get_connection_parameters()
+    overrides: Dict[str, Dict[str, Dict[str, Any]]] = connection_parameters[dict_keys.CONNECTION_PARAMETERS_OVERRIDES]
+    removable_nids: List[str] = [nid for nid in nids if nid in overrides.get(nid, {})]
+    for nid in removable_nids:
+        del overrides[nid][nid]
+        if len(overrides[nid]) == 0:
+            del overrides[nid]
+    if len(removable_nids) > 0:
+        save_connection_parameters(connection_parameters)
+
+
+# An edge set explicitly keeps its parameters even if they equal the defaults it would inherit, so that changing the
+# defaults later does not change it
+def set_connection_parameters_override(connection_parameters: Dict[str, Any], from_nid: str, to_nid: str,
+                                       parameters: Dict[str, Any]):
+    from_nid, to_nid = (from_nid, to_nid) if from_nid <= to_nid else (to_nid, from_nid)
+    connection_parameters[dict_keys.CONNECTION_PARAMETERS_OVERRIDES].setdefault(from_nid, {})[to_nid] = parameters
+
+
+def modify_connection_parameters(from_nid: str, to_nid: str, parameters: Dict[str, Any]):
+    connection_parameters: Dict[str, Any] = get_connection_parameters()
+    set_connection_parameters_override(connection_parameters, from_nid, to_nid, parameters)
     save_connection_parameters(connection_parameters)
 
 
-def update_self_connection_parameters():
-    connection_parameters: Dict[str, Dict[str, Dict[str, Any]]] = get_connection_parameters()
-    unpacked_topology: List[dict] = get_unpacked_network_topology()
+def select_connections(unpacked_topology: List[Dict[str, Any]], from_nid_prefix: str,
+                       to_nid_prefix: str) -> Set[Tuple[str, str]]:
+    selected_connections: Set[Tuple[str, str]] = set()
     for node in unpacked_topology:
         nid: str = node[dict_keys.NODE_NID]
-        is_node_self_connected: bool = nid in node[dict_keys.NODE_CONNECTIONS]
-        if is_node_self_connected:
-            if nid in connection_parameters:
-                if nid not in connection_parameters[nid]:
-                    connection_parameters[nid][nid] = constants.DEFAULT_CONNECTION_PARAMETERS
-            else:
-                connection_parameters[nid] = {nid: constants.DEFAULT_CONNECTION_PARAMETERS}
+        if nid.startswith(from_nid_prefix):
+            for connection_nid in node[dict_keys.NODE_CONNECTIONS]:
+                if connection_nid.startswith(to_nid_prefix):
+                    selected_connections.add((nid, connection_nid) if nid <= connection_nid else (connection_nid, nid))
+    return selected_connections
+
+
+# Each patch is merged into the edge's current parameters. All patches are applied in one pass and saved in one write.
+# Patches of pairs of nodes that are not connected are skipped. Returns the number of patches applied and the
+# [from nid, to nid] pairs that were skipped.
+def patch_connection_parameters(patches: List[Dict[str, Any]],
+                                selector: Dict[str, Any] = None) -> Tuple[int, List[List[str]]]:
+    connection_parameters: Dict[str, Any] = get_connection_parameters()
+    unpacked_topology: List[Dict[str, Any]] = get_unpacked_network_topology()
+    group_by_nid: Dict[str, str] = get_group_by_nid(unpacked_topology)
+    connections_by_nid: Dict[str, Set[str]] = {node[dict_keys.NODE_NID]: set(node[dict_keys.NODE_CONNECTIONS])
+                                               for node in unpacked_topology}
+    edge_patches: List[Tuple[str, str, Dict[str, Any]]] = []
+    skipped_connections: List[List[str]] = []
+    for patch in patches:
+        from_nid: str = patch[dict_keys.MODIFY_NODE_CONNECTIONS_FROM_NID]
+        to_nid: str = patch[dict_keys.MODIFY_NODE_CONNECTIONS_TO_NID]
+        if to_nid in connections_by_nid.get(from_nid, ()):
+            edge_patches.append((from_nid, to_nid, patch[dict_keys.MODIFY_NODE_CONNECTIONS_PARAMETERS]))
         else:
-            connection_parameters_keys_to_remove: Set[str] = set()  # remove empty dictionaries
-            if nid in connection_parameters[nid]:
-                del connection_parameters[nid][nid]
-            if len(connection_parameters[nid]) == 0:
-                connection_parameters_keys_to_remove.add(nid)
-            for nid_to_remove in connection_parameters_keys_to_remove:
-                del connection_parameters[nid_to_remove]
+            skipped_connections.append([from_nid, to_nid])
+    if selector:
+        selector_parameters: Dict[str, Any] = selector[dict_keys.MODIFY_NODE_CONNECTIONS_PARAMETERS]
+        edge_patches.extend((from_nid, to_nid, selector_parameters) for from_nid, to_nid in select_connections(
+            unpacked_topology, selector.get(dict_keys.MODIFY_NODE_CONNECTIONS_FROM_NID_PREFIX, ''),
+            selector.get(dict_keys.MODIFY_NODE_CONNECTIONS_TO_NID_PREFIX, '')))
+    for from_nid, to_nid, parameters_patch in edge_patches:
+        current_parameters: Dict[str, Any] = resolve_connection_parameters(connection_parameters, group_by_nid,
+                                                                           from_nid, to_nid)
+        set_connection_parameters_override(connection_parameters, from_nid, to_nid,
+                                           {**current_parameters, **parameters_patch})
+    if len(edge_patches) > 0:
+        save_connection_parameters(connection_parameters)
+    return len(edge_patches), skipped_connections
+
+
+def set_default_connection_parameters(parameters: Dict[str, Any], group: str = None):
+    connection_parameters: Dict[str, Any] = get_connection_parameters()
+    if group is None:
+        connection_parameters[dict_keys.CONNECTION_PARAMETERS_DEFAULT] = parameters
+    else:
+        connection_parameters[dict_keys.CONNECTION_PARAMETERS_GROUP_DEFAULTS][group] = parameters
     save_connection_parameters(connection_parameters)
 
 
-def modify_connection_parameters(from_nid: str, to_nid: str, parameters: Dict[str, Any]):
-    connection_parameters: Dict[str, Dict[str, Dict[str, Any]]] = get_connection_parameters()
-    connection_parameters[from_nid][to_nid] = parameters
-    save_connection_parameters(connection_parameters)
+def count_connections(unpacked_topology: List[Dict[str, Any]]) -> int:
+    return sum(1 for node in unpacked_topology for connection_nid in node[dict_keys.NODE_CONNECTIONS]
+               if connection_nid >= node[dict_keys.NODE_NID])
+
+
+# Only the page's nodes and their peers are looked at, so reading every page costs as much as reading the topology once
+def get_unpacked_network_topology_page(cursor: int, page_size: int) -> Dict[str, Any]:
+    unpacked_topology, nid_indices, number_connections = get_paged_unpacked_network_topology()
+    cursor = max(cursor, 0)
+    page_size = min(max(page_size, 1), constants.MAX_UNPACKED_NETWORK_TOPOLOGY_PAGE_SIZE)
+    nodes: List[Dict[str, Any]] = unpacked_topology[cursor:(cursor + page_size)]
+    next_cursor: int = cursor + len(nodes)
+    peer_nids: Set[str] = {connection_nid for node in nodes for connection_nid in node[dict_keys.NODE_CONNECTIONS]}
+    group_by_nid: Dict[str, str] = get_group_by_nid(nodes + [unpacked_topology[nid_indices[nid]] for nid in peer_nids
+                                                             if nid in nid_indices])
+    page: Dict[str, Any] = {
+        dict_keys.NETWORK_TOPOLOGY_PAGE_CURSOR: cursor,
+        dict_keys.NETWORK_TOPOLOGY_PAGE_NEXT_CURSOR: next_cursor if next_cursor < len(unpacked_topology) else None,
+        dict_keys.NETWORK_TOPOLOGY_PAGE_NODES: nodes,
+        dict_keys.NETWORK_TOPOLOGY_PAGE_CONNECTION_PARAMETERS: expand_connection_parameters(
+            unpacked_topology, nodes, group_by_nid=group_by_nid)
+    }
+    if cursor == 0:  # the first page carries summary counts so clients can render progressively
+        page[dict_keys.NETWORK_TOPOLOGY_PAGE_TOTAL_NODES] = len(unpacked_topology)
+        page[dict_keys.NETWORK_TOPOLOGY_PAGE_TOTAL_CONNECTIONS] = number_connections
+    return page
+
+
+def validate_page_request_value(data: Dict[str, Any], key: str, default: int) -> int:
+    value = data.get(key, default)
+    if type(value) != int:
+        raise NetworkTopologyValidationException(ERROR_MESSAGE_INVALID_PAGE_REQUEST, key)
+    return value
+
+
+# The error data is the key, or the patch's number and key, that is missing or has the wrong type
+def validate_patch_request_item(item, item_key, required_keys: Dict[str, type], optional_keys: Dict[str, type]):
+    if type(item) != dict:
+        raise NetworkTopologyValidationException(ERROR_MESSAGE_INVALID_PATCH_REQUEST, item_key)
+    for key, value_type in {**required_keys, **optional_keys}.items():
+        if (key in item or key in required_keys) and type(item.get(key)) != value_type:
+            raise NetworkTopologyValidationException(ERROR_MESSAGE_INVALID_PATCH_REQUEST,
+                                                     key if item_key is None else [item_key, key])
+
+
+# Returns the patches and the selector, if there is one
+def get_connection_parameters_patch_from_request(data: Dict[str, Any]) \
+        -> Tuple[List[Dict[str, Any]], Optional[Dict[str, Any]]]:
+    validate_patch_request_item(data, None, {}, {dict_keys.MODIFY_NODE_CONNECTIONS_PATCHES: list,
+                                                 dict_keys.MODIFY_NODE_CONNECTIONS_SELECTOR: dict})
+    patches: List[Dict[str, Any]] = data.get(dict_keys.MODIFY_NODE_CONNECTIONS_PATCHES, [])
+    for index, patch in enumerate(patches):
+        validate_patch_request_item(patch, index + 1, {dict_keys.MODIFY_NODE_CONNECTIONS_FROM_NID: str,
+                                                       dict_keys.MODIFY_NODE_CONNECTIONS_TO_NID: str,
+                                                       dict_keys.MODIFY_NODE_CONNECTIONS_PARAMETERS: dict}, {})
+    selector: Optional[Dict[str, Any]] = data.get(dict_keys.MODIFY_NODE_CONNECTIONS_SELECTOR)
+    if selector is not None:
+        validate_patch_request_item(selector, dict_keys.MODIFY_NODE_CONNECTIONS_SELECTOR,
+                                    {dict_keys.MODIFY_NODE_CONNECTIONS_PARAMETERS: dict},
+                                    {dict_keys.MODIFY_NODE_CONNECTIONS_FROM_NID_PREFIX: str,
+                                     dict_keys.MODIFY_NODE_CONNECTIONS_TO_NID_PREFIX: str})
+    return patches, selector
+
+
+def get_unpacked_network_topology_page_from_request(data: Dict[str, Any]) -> Dict[str, Any]:
+    data = data if data else {}
+    if type(data) != dict:
+        raise NetworkTopologyValidationException(ERROR_MESSAGE_INVALID_PAGE_REQUEST)
+    return get_unpacked_network_topology_page(
+        validate_page_request_value(data, dict_keys.NETWORK_TOPOLOGY_PAGE_CURSOR, 0),
+        validate_page_request_value(data, dict_keys.NETWORK_TOPOLOGY_PAGE_SIZE,
+                                    constants.DEFAULT_UNPACKED_NETWORK_TOPOLOGY_PAGE_SIZE))
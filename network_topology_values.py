@@ -2,3 +2,4 @@ NETWORK_TOPOLOGY_RAW_CODE_TYPE = 'rawCode'
 NETWORK_TOPOLOGY_UNPACKED_TYPE = 'unpacked'
 NETWORK_TOPOLOGY_RAW_LANGUAGE_TYPE = 'language'
 NETWORK_TOPOLOGY_CONNECTION_PARAMETERS_TYPE = 'connectionParameters'
+NETWORK_TOPOLOGY_EXPLICIT_SELF_CONNECTIONS_TYPE = 'explicitSelfConnections'
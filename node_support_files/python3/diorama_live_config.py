@@ -0,0 +1,91 @@
+# Reads this node's slice of the connection parameters from the live config directory named by DIORAMA_LIVE_CONFIG_DIR,
+# which the server rewrites when they change while the simulation runs. Until a slice has been read, the parameters the
+# simulation was set up with are used, from node_config.msgpack if there is one, or else connection_parameters.yml.
+# The slices and the YAML file are read with PyYAML, so a node using them needs it in its requirements.
+from typing import Dict, Any, Optional, Callable, Tuple
+import os
+import threading
+
+import diorama_node_config
+
+LIVE_CONFIG_DIRECTORY_ENVIRONMENT_VARIABLE: str = 'DIORAMA_LIVE_CONFIG_DIR'
+LIVE_CONFIG_FILE_EXTENSION: str = '.yml'
+CONNECTION_PARAMETERS_FILE_NAME: str = 'connection_parameters.yml'
+DEFAULT_POLL_INTERVAL_SECONDS: float = 1.0
+
+
+def get_live_config_file_path(nid: str) -> Optional[str]:
+    directory = os.environ.get(LIVE_CONFIG_DIRECTORY_ENVIRONMENT_VARIABLE)
+    return os.path.join(directory, f'{nid}{LIVE_CONFIG_FILE_EXTENSION}') if directory else None
+
+
+def load_yaml(path: str) -> Any:
+    import yaml  # Only needed for the YAML files, so a node that only uses node_config.msgpack can import this module
+    with open(path) as yaml_file:
+        return yaml.safe_load(yaml_file)
+
+
+# Each node's parameters are a dict of its peers' nids to the parameters of its connection to them
+def load_initial_connection_parameters(nid: str, directory: str = '.') -> Dict[str, Dict[str, Any]]:
+    if diorama_node_config.has_node_config(directory):
+        return diorama_node_config.load_node_config(
+            os.path.join(directory, diorama_node_config.NODE_CONFIG_FILE_NAME)).get_connection_parameters(nid)
+    return (load_yaml(os.path.join(directory, CONNECTION_PARAMETERS_FILE_NAME)) or {}).get(nid, {})
+
+
+# The server replaces a slice by renaming a new file over it, so a changed slice has a new inode as well as a new
+# modification time. Polling, rather than inotify, works on every platform and through bind mounts.
+class LiveConnectionParameters:
+    def __init__(self, nid: str, on_change: Optional[Callable[[Dict[str, Dict[str, Any]]], None]] = None,
+                 poll_interval_seconds: float = DEFAULT_POLL_INTERVAL_SECONDS, directory: str = '.'):
+        self.nid: str = nid
+        self.on_change = on_change
+        self.poll_interval_seconds: float = poll_interval_seconds
+        self.path: Optional[str] = get_live_config_file_path(nid)
+        self.version: Optional[Tuple[int, int, int]] = None
+        self.connection_parameters: Dict[str, Dict[str, Any]] = load_initial_connection_parameters(nid, directory)
+        self.stopped: threading.Event = threading.Event()
+        self.thread: Optional[threading.Thread] = None
+        self.reload()
+
+    # Returns whether the slice changed since it was last read. A slice that is missing, as it is before the server
+    # first publishes it and after the simulation is cleaned, leaves the last parameters in place.
+    def reload(self) -> bool:
+        if self.path is None:
+            return False
+        try:
+            stat = os.stat(self.path)
+            version = (stat.st_ino, stat.st_mtime_ns, stat.st_size)
+            if version == self.version:
+                return False
+            connection_parameters = load_yaml(self.path) or {}
+        except FileNotFoundError:
+            return False
+        self.version = version
+        self.connection_parameters = connection_parameters
+        if self.on_change is not None:
+            self.on_change(connection_parameters)
+        return True
+
+    def get(self, peer_nid: str) -> Dict[str, Any]:
+        return self.connection_parameters.get(peer_nid, {})
+
+    def get_all(self) -> Dict[str, Dict[str, Any]]:
+        return self.connection_parameters
+
+    def watch(self):
+        while not self.stopped.wait(self.poll_interval_seconds):
+            self.reload()
+
+    # Reloads the slice on a daemon thread, calling on_change from it, until stopped
+    def start(self) -> 'LiveConnectionParameters':
+        if self.thread is None:
+            self.thread = threading.Thread(target=self.watch, name=f'diorama-live-config-{self.nid}', daemon=True)
+            self.thread.start()
+        return self
+
+    def stop(self):
+        self.stopped.set()
+        if self.thread is not None:
+            self.thread.join()
+            self.thread = None
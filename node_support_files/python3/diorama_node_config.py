@@ -0,0 +1,135 @@
+# Reads node_config.msgpack, which the server writes in place of node_addresses.yml and connection_parameters.yml when
+# DIORAMA_BINARY_NODE_CONFIG is set. It has its own msgpack decoder, so nodes need no extra dependencies.
+from typing import List, Dict, Any, Tuple
+from array import array
+import os
+import struct
+import sys
+
+NODE_CONFIG_FILE_NAME: str = 'node_config.msgpack'
+NODE_CONFIG_FORMAT: str = 'diorama-node-config'
+FORMAT_VERSION: int = 1
+UINT32_TYPECODE: str = 'I' if array('I').itemsize == 4 else 'L'
+
+
+class NodeConfigFormatException(Exception):
+    pass
+
+
+# Decodes the subset of msgpack the server writes: nil, booleans, integers, floats, strings, binary, arrays and maps
+class Decoder:
+    def __init__(self, data: bytes):
+        self.data: memoryview = memoryview(data)
+        self.position: int = 0
+
+    def take(self, length: int) -> memoryview:
+        if self.position + length > len(self.data):
+            raise NodeConfigFormatException('Unexpected end of data')
+        taken = self.data[self.position:self.position + length]
+        self.position += length
+        return taken
+
+    def unpack(self, format_string: str) -> Any:
+        return struct.unpack('>' + format_string, self.take(struct.calcsize('>' + format_string)))[0]
+
+    def decode_array(self, length: int) -> List[Any]:
+        return [self.decode() for _ in range(length)]
+
+    def decode_map(self, length: int) -> Dict[Any, Any]:
+        decoded = {}
+        for _ in range(length):
+            key = self.decode()
+            decoded[key] = self.decode()
+        return decoded
+
+    def decode(self) -> Any:
+        first_byte = self.take(1)[0]
+        if first_byte <= 0x7f:
+            return first_byte
+        if first_byte >= 0xe0:
+            return first_byte - 0x100
+        if 0x80 <= first_byte <= 0x8f:
+            return self.decode_map(first_byte & 0x0f)
+        if 0x90 <= first_byte <= 0x9f:
+            return self.decode_array(first_byte & 0x0f)
+        if 0xa0 <= first_byte <= 0xbf:
+            return str(self.take(first_byte & 0x1f), 'utf-8')
+        if first_byte == 0xc0:
+            return None
+        if first_byte in (0xc2, 0xc3):
+            return first_byte == 0xc3
+        if first_byte in (0xc4, 0xc5, 0xc6):
+            return bytes(self.take(self.unpack({0xc4: 'B', 0xc5: 'H', 0xc6: 'I'}[first_byte])))
+        if first_byte in (0xca, 0xcb):
+            return self.unpack('f' if first_byte == 0xca else 'd')
+        if 0xcc <= first_byte <= 0xd3:
+            return self.unpack('BHIQbhiq'[first_byte - 0xcc])
+        if first_byte in (0xd9, 0xda, 0xdb):
+            return str(self.take(self.unpack({0xd9: 'B', 0xda: 'H', 0xdb: 'I'}[first_byte])), 'utf-8')
+        if first_byte in (0xdc, 0xdd):
+            return self.decode_array(self.unpack('H' if first_byte == 0xdc else 'I'))
+        if first_byte in (0xde, 0xdf):
+            return self.decode_map(self.unpack('H' if first_byte == 0xde else 'I'))
+        raise NodeConfigFormatException(f'Unsupported msgpack type 0x{first_byte:02x}')
+
+
+def unpack_uint32s(data: bytes) -> array:
+    unpacked = array(UINT32_TYPECODE)
+    unpacked.frombytes(data)
+    if sys.byteorder == 'big':
+        unpacked.byteswap()
+    return unpacked
+
+
+# Each node's connections are a slice of the connections column, starting at its offset, and each connection's
+# parameters are an index into the table of distinct parameter sets
+class NodeConfig:
+    def __init__(self, decoded: Dict[str, Any]):
+        if decoded.get('format') != NODE_CONFIG_FORMAT or decoded.get('version') != FORMAT_VERSION:
+            raise NodeConfigFormatException(f'Not a version {FORMAT_VERSION} {NODE_CONFIG_FORMAT} file')
+        self.nids: List[str] = decoded['nids']
+        self.nid_indices: Dict[str, int] = {nid: index for index, nid in enumerate(self.nids)}
+        self.ip_addresses: bytes = decoded['ipAddresses']
+        self.ports: array = unpack_uint32s(decoded['ports'])
+        self.parameter_sets: List[Dict[str, Any]] = decoded['parameterSets']
+        self.connection_offsets: array = unpack_uint32s(decoded['connectionOffsets'])
+        self.connections: array = unpack_uint32s(decoded['connections'])
+        self.connection_parameter_sets: array = unpack_uint32s(decoded['connectionParameterSets'])
+
+    def get_address(self, nid: str) -> Tuple[str, int]:
+        index = self.nid_indices[nid]
+        return '.'.join(str(octet) for octet in self.ip_addresses[index * 4:index * 4 + 4]), self.ports[index]
+
+    def get_connections(self, nid: str) -> List[str]:
+        index = self.nid_indices[nid]
+        return [self.nids[peer_index] for peer_index in
+                self.connections[self.connection_offsets[index]:self.connection_offsets[index + 1]]]
+
+    def get_connection_parameters(self, nid: str) -> Dict[str, Dict[str, Any]]:
+        index = self.nid_indices[nid]
+        start, end = self.connection_offsets[index], self.connection_offsets[index + 1]
+        return {self.nids[peer_index]: self.parameter_sets[parameter_set_index] for peer_index, parameter_set_index in
+                zip(self.connections[start:end], self.connection_parameter_sets[start:end])}
+
+    # The contents of node_addresses.yml, for code written against the YAML files
+    def get_node_addresses(self) -> List[Dict[str, Any]]:
+        return [{'nid': nid, 'ip_address': ip_address, 'port': port}
+                for nid, (ip_address, port) in ((nid, self.get_address(nid)) for nid in self.nids)
+                if ip_address != '0.0.0.0']
+
+    # The contents of connection_parameters.yml
+    def get_connection_parameters_by_node(self) -> Dict[str, Dict[str, Dict[str, Any]]]:
+        return {nid: self.get_connection_parameters(nid) for nid in self.nids}
+
+
+def load_node_config(path: str = NODE_CONFIG_FILE_NAME) -> NodeConfig:
+    with open(path, 'rb') as node_config_file:
+        decoder = Decoder(node_config_file.read())
+    decoded = decoder.decode()
+    if not isinstance(decoded, dict):
+        raise NodeConfigFormatException('The node config is not a map')
+    return NodeConfig(decoded)
+
+
+def has_node_config(directory: str = '.') -> bool:
+    return os.path.exists(os.path.join(directory, NODE_CONFIG_FILE_NAME))
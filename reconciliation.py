@@ -0,0 +1,141 @@
+from typing import List, Dict, Any, Set
+import tempfile
+import threading
+import time
+
+from tinydb import Query
+
+import constants
+import container_pool
+import database
+import dict_keys
+import docker_interface
+import simulation
+import simulation_values
+
+ACTIVE_STATES: List[str] = [simulation_values.READY_TO_RUN_STATE, simulation_values.RUNNING_STATE]
+# Set by the server before it starts listening and cleared once startup reconciliation, which runs on an executor
+# thread, has finished
+reconciling: threading.Event = threading.Event()
+
+
+class ReconciliationInProgressException(Exception):
+    pass
+
+
+# Called by the handlers of events that set up, reset or act on simulations, which would race the repairs
+def check_not_reconciling():
+    if reconciling.is_set():
+        raise ReconciliationInProgressException('Simulations are still being reconciled after startup')
+
+
+def get_names_for_simulation(labelled_objects: Dict[str, Dict[str, str]], simulation_id: str) -> Set[str]:
+    return {name for name, labels in labelled_objects.items()
+            if labels.get(constants.SIMULATION_LABEL) == simulation_id}
+
+
+def get_pooled_container_names() -> Set[str]:
+    return {record[dict_keys.CONTAINER_POOL_NAME] for record in
+            database.container_pool_db.search(Query().type == container_pool.CONTAINER_RECORD_TYPE)}
+
+
+def make_report(simulation_id: str) -> Dict[str, Any]:
+    return {
+        dict_keys.SIMULATION_ID: simulation_id,
+        dict_keys.SIMULATION_STATE: simulation.get_simulation_state(simulation_id),
+        dict_keys.RECONCILIATION_ADOPTED_CONTAINERS: 0,
+        dict_keys.RECONCILIATION_CREATED_CONTAINERS: 0,
+        dict_keys.RECONCILIATION_REMOVED_CONTAINERS: 0,
+        dict_keys.RECONCILIATION_REBUILT_IMAGES: 0,
+        dict_keys.RECONCILIATION_REMOVED_IMAGES: 0,
+        dict_keys.RECONCILIATION_RECREATED_NETWORK: False,
+        dict_keys.RECONCILIATION_RESET: False
+    }
+
+
+# Compares what the simulation's records say should exist with the labelled objects that do, and creates or removes
+# only the differences. Pooled containers are left alone, as are the images and network of a pooled network, which
+# the pool keeps for the next run.
+def reconcile_simulation(simulation_id: str, container_names: Set[str], image_names: Set[str],
+                         network_names: Set[str], pooled_container_names: Set[str]) -> Dict[str, Any]:
+    report = make_report(simulation_id)
+    state = report[dict_keys.SIMULATION_STATE]
+    if state == simulation_values.UNINITIALISED_STATE:
+        orphaned_container_names = list(container_names - pooled_container_names)
+        docker_interface.remove_containers(orphaned_container_names)
+        report[dict_keys.RECONCILIATION_REMOVED_CONTAINERS] = len(orphaned_container_names)
+        if not container_pool.is_network_pooled(simulation.get_network_name(simulation_id)):
+            docker_interface.remove_images(list(image_names))
+            report[dict_keys.RECONCILIATION_REMOVED_IMAGES] = len(image_names)
+            for network_name in network_names:
+                docker_interface.remove_network(network_name)
+        return report
+    if state not in ACTIVE_STATES:
+        # A setup or reset was interrupted part way through, so there is nothing consistent to resume
+        simulation.stop_and_reset_simulation(lambda event, data: 0, simulation_id)
+        report[dict_keys.RECONCILIATION_RESET] = True
+        return report
+
+    nids_by_container_name = {simulation.get_container_name(simulation_id, node[dict_keys.NODE_NID]):
+                              node[dict_keys.NODE_NID] for node in simulation.get_simulation_node_list(simulation_id)}
+    program_names_by_image_name = {simulation.get_image_name(simulation_id, program[dict_keys.PROGRAM_NAME]):
+                                   program[dict_keys.PROGRAM_NAME]
+                                   for program in simulation.get_simulation_program_list(simulation_id)}
+
+    network_name = simulation.get_network_name(simulation_id)
+    if network_name not in network_names:
+        # Containers lose their addresses along with their network, so they all have to be recreated
+        container_pool.forget_network(network_name)
+        docker_interface.remove_containers(list(container_names & nids_by_container_name.keys()))
+        container_names = container_names - nids_by_container_name.keys()
+        simulation.create_network(simulation_id)
+        report[dict_keys.RECONCILIATION_RECREATED_NETWORK] = True
+
+    missing_program_names = {program_name for image_name, program_name in program_names_by_image_name.items()
+                             if image_name not in image_names}
+    if missing_program_names:
+        with tempfile.TemporaryDirectory() as temp_dir:
+            simulation.create_program_images(temp_dir, simulation_id, missing_program_names)
+        report[dict_keys.RECONCILIATION_REBUILT_IMAGES] = len(missing_program_names)
+    extra_image_names = list(image_names - program_names_by_image_name.keys())
+    docker_interface.remove_images(extra_image_names)
+    report[dict_keys.RECONCILIATION_REMOVED_IMAGES] = len(extra_image_names)
+
+    extra_container_names = list(container_names - nids_by_container_name.keys() - pooled_container_names)
+    docker_interface.remove_containers(extra_container_names)
+    report[dict_keys.RECONCILIATION_REMOVED_CONTAINERS] = len(extra_container_names)
+    missing_nids = {nid for container_name, nid in nids_by_container_name.items()
+                    if container_name not in container_names}
+    if missing_nids:
+        simulation.create_node_containers(simulation_id, missing_nids)
+    report[dict_keys.RECONCILIATION_CREATED_CONTAINERS] = len(missing_nids)
+    report[dict_keys.RECONCILIATION_ADOPTED_CONTAINERS] = len(nids_by_container_name) - len(missing_nids)
+    return report
+
+
+# Lists the labelled containers, images and networks in one query each, then reconciles every simulation that has
+# records or labelled objects of any kind
+def reconcile() -> List[Dict[str, Any]]:
+    containers = docker_interface.list_labelled_containers(constants.SIMULATION_LABEL)
+    images = docker_interface.list_labelled_images(constants.SIMULATION_LABEL)
+    networks = docker_interface.list_labelled_networks(constants.SIMULATION_LABEL)
+    pooled_container_names = get_pooled_container_names()
+    simulation_ids = set(simulation.get_simulation_ids()) | {
+        labels[constants.SIMULATION_LABEL] for labelled_objects in [containers, images, networks]
+        for labels in labelled_objects.values()}
+    return [reconcile_simulation(simulation_id, get_names_for_simulation(containers, simulation_id),
+                                 get_names_for_simulation(images, simulation_id),
+                                 get_names_for_simulation(networks, simulation_id), pooled_container_names)
+            for simulation_id in sorted(simulation_ids)]
+
+
+def reconcile_and_report():
+    start = time.perf_counter()
+    try:
+        for report in reconcile():
+            print(f'Reconciled simulation {report[dict_keys.SIMULATION_ID]}: {report}')
+        print(f'Reconciliation finished after {time.perf_counter() - start:.3f}s')
+    except Exception as e:
+        print(f'WARNING: startup reconciliation failed: {e}')
+    finally:
+        reconciling.clear()
@@ -0,0 +1,164 @@
+from typing import List, Dict, Any, Optional, Callable
+import math
+import os
+import re
+
+import constants
+import dict_keys
+
+MEMORY_PATTERN = re.compile(r'^(\d+)([bkmg]?)$')
+MEMORY_UNIT_BYTES: Dict[str, int] = {'': 1, 'b': 1, 'k': 1024, 'm': 1024 ** 2, 'g': 1024 ** 3}
+CPUSET_PATTERN = re.compile(r'^\d+(-\d+)?(,\d+(-\d+)?)*$')
+
+
+def is_int(value) -> bool:
+    return type(value) == int
+
+
+# A memory limit is a number of bytes, or a string such as 512m as Docker accepts
+def parse_memory(value) -> Optional[int]:
+    if is_int(value):
+        return value
+    match = MEMORY_PATTERN.match(value.lower()) if type(value) == str else None
+    return int(match.group(1)) * MEMORY_UNIT_BYTES[match.group(2)] if match else None
+
+
+# Returns the cpus in a cpuset such as 0-3,6, or None if it is not one
+def parse_cpuset(value) -> Optional[List[int]]:
+    if type(value) != str or not CPUSET_PATTERN.match(value):
+        return None
+    cpus = set()
+    for cpu_range in value.split(','):
+        first, _, last = cpu_range.partition('-')
+        if last and int(last) < int(first):
+            return None
+        cpus.update(range(int(first), int(last or first) + 1))
+    return sorted(cpus)
+
+
+# Each resource limit is named after the Docker host config option it sets, and is checked by its validator
+RESOURCE_LIMIT_VALIDATORS: Dict[str, Callable[[Any], bool]] = {
+    dict_keys.RESOURCE_LIMITS_CPU_SHARES: lambda value: is_int(value) and value >= constants.MIN_CPU_SHARES,
+    dict_keys.RESOURCE_LIMITS_CPU_QUOTA: lambda value: is_int(value) and value >= constants.MIN_CPU_QUOTA_MICROSECONDS,
+    dict_keys.RESOURCE_LIMITS_CPU_PERIOD: lambda value: is_int(value) and (
+        constants.MIN_CPU_PERIOD_MICROSECONDS <= value <= constants.MAX_CPU_PERIOD_MICROSECONDS),
+    dict_keys.RESOURCE_LIMITS_CPUSET_CPUS: lambda value: parse_cpuset(value) is not None,
+    dict_keys.RESOURCE_LIMITS_MEM_LIMIT: lambda value: (parse_memory(value) or 0) >= constants.MIN_MEMORY_LIMIT_BYTES,
+    dict_keys.RESOURCE_LIMITS_PIDS_LIMIT: lambda value: is_int(value) and value >= 1
+}
+
+
+# Returns the keys of the resource limits that are unknown or have invalid values
+def get_invalid_resource_limit_keys(resource_limits: Dict[str, Any]) -> List[str]:
+    return [key for key, value in resource_limits.items()
+            if key not in RESOURCE_LIMIT_VALIDATORS or not RESOURCE_LIMIT_VALIDATORS[key](value)]
+
+
+def get_valid_resource_limits(resource_limits: Any) -> Dict[str, Any]:
+    if type(resource_limits) != dict:
+        return {}
+    invalid_keys = get_invalid_resource_limit_keys(resource_limits)
+    return {key: value for key, value in resource_limits.items() if key not in invalid_keys}
+
+
+# A node's limits are its program's, overridden key by key by those of its group or, for single nodes, its own
+def get_node_resource_limits(program: Dict[str, Any], node: Dict[str, Any]) -> Dict[str, Any]:
+    return {**get_valid_resource_limits(program.get(dict_keys.PROGRAM_RESOURCES)),
+            **get_valid_resource_limits(node.get(dict_keys.NODE_RESOURCES))}
+
+
+# Gives memory in bytes, and a quota without a period Docker's default period, so that the same limits always give the
+# same host config options
+def normalise_resource_limits(resource_limits: Dict[str, Any]) -> Dict[str, Any]:
+    normalised = dict(resource_limits)
+    if dict_keys.RESOURCE_LIMITS_MEM_LIMIT in normalised:
+        normalised[dict_keys.RESOURCE_LIMITS_MEM_LIMIT] = parse_memory(normalised[dict_keys.RESOURCE_LIMITS_MEM_LIMIT])
+    if dict_keys.RESOURCE_LIMITS_CPU_QUOTA in normalised:
+        normalised.setdefault(dict_keys.RESOURCE_LIMITS_CPU_PERIOD, constants.DEFAULT_CPU_PERIOD_MICROSECONDS)
+    return normalised
+
+
+# The most cpus the node can use: its quota, or failing that the size of its cpuset, or None if it is unbounded
+def get_cpu_limit(resource_limits: Dict[str, Any]) -> Optional[float]:
+    if dict_keys.RESOURCE_LIMITS_CPU_QUOTA in resource_limits:
+        return resource_limits[dict_keys.RESOURCE_LIMITS_CPU_QUOTA] / resource_limits.get(
+            dict_keys.RESOURCE_LIMITS_CPU_PERIOD, constants.DEFAULT_CPU_PERIOD_MICROSECONDS)
+    if dict_keys.RESOURCE_LIMITS_CPUSET_CPUS in resource_limits:
+        return len(parse_cpuset(resource_limits[dict_keys.RESOURCE_LIMITS_CPUSET_CPUS]))
+    return None
+
+
+def get_node_memory_estimate() -> int:
+    return int(os.environ.get(constants.NODE_MEMORY_ESTIMATE_ENVIRONMENT_VARIABLE,
+                              constants.DEFAULT_NODE_MEMORY_ESTIMATE_BYTES))
+
+
+def format_bytes(number_bytes: float) -> str:
+    return f'{number_bytes / 1024 ** 3:.1f} GiB'
+
+
+# Adds up what the nodes could use against what the host has, and warns where it would be overcommitted. Nodes with a
+# cpu quota or cpuset count at that many cpus, and nodes without a memory limit at the node memory estimate. Shares only
+# weigh nodes against each other, so nodes with only cpu shares are unbounded.
+def plan_resources(nodes: List[Dict[str, Any]], program_list: List[Dict[str, Any]],
+                   host_capacity: Dict[str, Any]) -> Dict[str, Any]:
+    programs_by_name = {program[dict_keys.PROGRAM_NAME]: program for program in program_list}
+    host_cpus: int = host_capacity[dict_keys.HOST_CAPACITY_CPUS]
+    host_memory_bytes: int = host_capacity[dict_keys.HOST_CAPACITY_MEMORY_BYTES]
+    node_memory_estimate = get_node_memory_estimate()
+    warnings: List[str] = []
+    for program in program_list:
+        resource_limits = program.get(dict_keys.PROGRAM_RESOURCES)
+        invalid_keys = (get_invalid_resource_limit_keys(resource_limits) if type(resource_limits) == dict
+                        else [] if resource_limits is None else [dict_keys.PROGRAM_RESOURCES])
+        if invalid_keys:
+            warnings.append(f'Program {program[dict_keys.PROGRAM_NAME]} has invalid resource limits, which are '
+                            f'ignored: {", ".join(invalid_keys)}')
+    cpu_quota_demand = 0.0
+    memory_demand_bytes = 0
+    nodes_without_cpu_limit = 0
+    nodes_without_memory_limit = 0
+    pinned_cpu_demand: Dict[int, float] = {}
+    for node in nodes:
+        resource_limits = get_node_resource_limits(programs_by_name.get(node[dict_keys.NODE_PROGRAM], {}), node)
+        cpu_limit = get_cpu_limit(resource_limits)
+        if cpu_limit is None:
+            nodes_without_cpu_limit += 1
+        else:
+            cpu_quota_demand += cpu_limit
+        if dict_keys.RESOURCE_LIMITS_CPUSET_CPUS in resource_limits:
+            cpuset = parse_cpuset(resource_limits[dict_keys.RESOURCE_LIMITS_CPUSET_CPUS])
+            for cpu in cpuset:
+                pinned_cpu_demand[cpu] = pinned_cpu_demand.get(cpu, 0) + cpu_limit / len(cpuset)
+        if dict_keys.RESOURCE_LIMITS_MEM_LIMIT in resource_limits:
+            memory_demand_bytes += parse_memory(resource_limits[dict_keys.RESOURCE_LIMITS_MEM_LIMIT])
+        else:
+            nodes_without_memory_limit += 1
+            memory_demand_bytes += node_memory_estimate
+    usable_memory_bytes = host_memory_bytes * constants.HOST_MEMORY_USABLE_FRACTION
+    if memory_demand_bytes > usable_memory_bytes:
+        warnings.append(f'The nodes could use {format_bytes(memory_demand_bytes)} of memory, more than the '
+                        f'{format_bytes(usable_memory_bytes)} usable on the host')
+    if cpu_quota_demand > host_cpus:
+        warnings.append(f'The nodes\' cpu quotas and cpusets add up to {cpu_quota_demand:g} cpus, more than the '
+                        f'host\'s {host_cpus}')
+    missing_cpus = sorted(cpu for cpu in pinned_cpu_demand if cpu >= host_cpus)
+    if missing_cpus:
+        warnings.append(f'Nodes are pinned to cpus the host does not have: {", ".join(map(str, missing_cpus))}')
+    overcommitted_cpus = sorted(cpu for cpu, demand in pinned_cpu_demand.items() if demand > 1 and cpu < host_cpus)
+    if overcommitted_cpus:
+        warnings.append(f'Nodes pinned to cpus {", ".join(map(str, overcommitted_cpus))} could use more than all of '
+                        f'them')
+    return {
+        dict_keys.RESOURCE_PLAN_NUMBER_NODES: len(nodes),
+        dict_keys.RESOURCE_PLAN_HOST_CPUS: host_cpus,
+        dict_keys.RESOURCE_PLAN_HOST_MEMORY_BYTES: host_memory_bytes,
+        dict_keys.RESOURCE_PLAN_CPU_QUOTA_DEMAND: cpu_quota_demand,
+        dict_keys.RESOURCE_PLAN_MEMORY_DEMAND_BYTES: memory_demand_bytes,
+        dict_keys.RESOURCE_PLAN_NODES_WITHOUT_CPU_LIMIT: nodes_without_cpu_limit,
+        dict_keys.RESOURCE_PLAN_NODES_WITHOUT_MEMORY_LIMIT: nodes_without_memory_limit,
+        # How many nodes of the planned average size would fit in the host's usable memory
+        dict_keys.RESOURCE_PLAN_MAX_NODES_BY_MEMORY:
+            math.floor(usable_memory_bytes / (memory_demand_bytes / len(nodes))) if nodes else None,
+        dict_keys.RESOURCE_PLAN_WARNINGS: warnings
+    }
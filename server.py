@@ -1,10 +1,19 @@
-import tornado.ioloop
-import tornado.web
-import tornado.websocket
+import time
 
-from WSHandler import WSHandler
-from http_handlers import BaseHandler, ZipFileUploadHandler, SaveNetworkTopologyHandler, LoggingMessageHandler
-import constants
+# Taken before the other imports so the startup time printed below includes them, which is why they are marked noqa
+STARTUP_START: float = time.perf_counter()
+
+import tornado.ioloop  # noqa: E402
+import tornado.web  # noqa: E402
+import tornado.websocket  # noqa: E402
+
+from WSHandler import WSHandler  # noqa: E402
+from http_handlers import (BaseHandler, ZipFileUploadHandler, SaveNetworkTopologyHandler,  # noqa: E402
+                           LoggingMessageHandler, MetricsHandler, WsEventProfileHandler, LogQueryHandler,
+                           ExportNetworkTopologyHandler, ImportNetworkTopologyHandler, send_log_suppression_summaries)
+import constants  # noqa: E402
+import log_store  # noqa: E402
+import reconciliation  # noqa: E402
 
 
 def make_server() -> tornado.web.Application:
@@ -12,12 +21,30 @@ def make_server() -> tornado.web.Application:
         (r"/", BaseHandler),
         (r"/uploadZipFile/(.*)", ZipFileUploadHandler),
         (r"/saveNetworkTopology", SaveNetworkTopologyHandler),
+        (r"/exportNetworkTopology", ExportNetworkTopologyHandler),
+        (r"/importNetworkTopology", ImportNetworkTopologyHandler),
         (r'/ws', WSHandler),
-        (r'/loggingMessage', LoggingMessageHandler)
+        (r'/loggingMessage', LoggingMessageHandler),
+        (r'/metrics', MetricsHandler),
+        (r'/wsEventProfiles/?(.*)', WsEventProfileHandler),
+        (r'/logs/([^/]+)', LogQueryHandler)
     ])
 
 
 if __name__ == "__main__":
+    imports_done = time.perf_counter()
+    # Set before listening, so no client can set up, reset or act on a simulation until its records and objects have
+    # been repaired, which happens on the executor so that startup does not wait for Docker
+    reconciliation.reconciling.set()
     server = make_server()
     server.listen(constants.DEFAULT_MAIN_SERVER_PORT)
-    tornado.ioloop.IOLoop.current().start()
+    listening = time.perf_counter()
+    print(f'Listening on port {constants.DEFAULT_MAIN_SERVER_PORT} after {listening - STARTUP_START:.3f}s '
+          f'(imports {imports_done - STARTUP_START:.3f}s, application and listen {listening - imports_done:.3f}s)')
+    io_loop = tornado.ioloop.IOLoop.current()
+    io_loop.run_in_executor(None, reconciliation.reconcile_and_report)
+    # Segments are otherwise only evicted when a simulation's log rolls over, which an idle simulation's never does
+    tornado.ioloop.PeriodicCallback(log_store.evict_all, constants.LOG_STORE_EVICTION_INTERVAL_SECONDS * 1000).start()
+    tornado.ioloop.PeriodicCallback(send_log_suppression_summaries,
+                                    constants.LOG_SUPPRESSION_SUMMARY_INTERVAL_SECONDS * 1000).start()
+    io_loop.start()
@@ -1,16 +1,27 @@
-from typing import List, Dict, Any, Callable
+from typing import List, Dict, Any, Callable, Tuple, Optional, Set
+from concurrent.futures import ThreadPoolExecutor
+from ipaddress import IPv4Address, IPv4Network
+import asyncio
+import math
 import shutil
 import os
+import re
 import tempfile
-from ipaddress import IPv4Address
+import time
 from zipfile import ZipFile
 
 from tinydb import Query
 import yaml
-from git import Repo
 
 import network_topology
 import docker_interface
+import container_pool
+import dependency_images
+import live_config
+import link_emulation
+import resource_limits
+import topology_binary
+import metrics
 import constants
 import database
 import programs
@@ -22,80 +33,249 @@ import simulation_values
 import util
 
 
-def get_from_simulation_db(type_key: str, result_if_none=None):
-    if len(database.simulation_db.search(getattr(Query(), dict_keys.SIMULATION_TYPE) == type_key)) == 0:
+VALID_SIMULATION_ID_PATTERN = re.compile(constants.VALID_SIMULATION_ID_REGEX)
+
+
+class SimulationIdException(Exception):
+    pass
+
+
+class SimulationAddressException(Exception):
+    pass
+
+
+class NodeActionException(Exception):
+    pass
+
+
+node_action_executor: Optional[ThreadPoolExecutor] = None
+
+
+def validate_simulation_id(simulation_id: str) -> str:
+    if not isinstance(simulation_id, str) or not VALID_SIMULATION_ID_PATTERN.match(simulation_id):
+        raise SimulationIdException(f'Invalid simulation id {simulation_id!r}')
+    return simulation_id
+
+
+# The default simulation's images and network keep the unprefixed names used before simulations were namespaced
+def get_namespaced_name(simulation_id: str, name: str) -> str:
+    if simulation_id == constants.DEFAULT_SIMULATION_ID:
+        return name
+    return f'{simulation_id}{constants.SIMULATION_NAMESPACE_SEPARATOR}{name}'
+
+
+# Container names are prefixed for every simulation, the default one included, so the simulation can be told apart
+# from a nid that itself contains the separator
+def get_container_name(simulation_id: str, nid: str) -> str:
+    return f'{simulation_id}{constants.SIMULATION_NAMESPACE_SEPARATOR}{nid}'
+
+
+def get_image_name(simulation_id: str, program_name: str) -> str:
+    return get_namespaced_name(simulation_id, program_name)
+
+
+def get_network_name(simulation_id: str) -> str:
+    return get_namespaced_name(simulation_id, constants.DOCKER_NETWORK_NAME)
+
+
+# Simulation ids cannot contain the separator, so the first one ends the id. Names without one are of default
+# simulation containers created before their names were prefixed.
+def split_container_name(container_name: str) -> Tuple[str, str]:
+    simulation_id, separator, nid = container_name.partition(constants.SIMULATION_NAMESPACE_SEPARATOR)
+    if separator:
+        return simulation_id, nid
+    return constants.DEFAULT_SIMULATION_ID, container_name
+
+
+# Records written before simulations were namespaced have no simulation id and belong to the default simulation
+def simulation_record_query(type_key: str, simulation_id: str):
+    simulation_id_query = getattr(Query(), dict_keys.SIMULATION_ID) == simulation_id
+    if simulation_id == constants.DEFAULT_SIMULATION_ID:
+        simulation_id_query = simulation_id_query | ~getattr(Query(), dict_keys.SIMULATION_ID).exists()
+    if type_key is None:
+        return simulation_id_query
+    return (getattr(Query(), dict_keys.SIMULATION_TYPE) == type_key) & simulation_id_query
+
+
+def get_from_simulation_db(type_key: str, result_if_none=None, simulation_id: str = constants.DEFAULT_SIMULATION_ID):
+    records = database.simulation_db.search(simulation_record_query(type_key, simulation_id))
+    if len(records) == 0:
         return result_if_none
-    return database.simulation_db.search(getattr(Query(), dict_keys.SIMULATION_TYPE) == type_key)[0][
-        dict_keys.SIMULATION_DATA]
+    return records[0][dict_keys.SIMULATION_DATA]
+
+
+def store_to_simulation_db(type_key: str, data, simulation_id: str = constants.DEFAULT_SIMULATION_ID):
+    database.simulation_db.upsert({dict_keys.SIMULATION_TYPE: type_key, dict_keys.SIMULATION_DATA: data,
+                                   dict_keys.SIMULATION_ID: simulation_id},
+                                  simulation_record_query(type_key, simulation_id))
+
 
+def clear_simulation_data(simulation_id: str = constants.DEFAULT_SIMULATION_ID):
+    database.simulation_db.remove(simulation_record_query(None, simulation_id))
 
-def store_to_simulation_db(type_key: str, data):
-    database.simulation_db.upsert({dict_keys.SIMULATION_TYPE: type_key, dict_keys.SIMULATION_DATA: data},
-                                  getattr(Query(), dict_keys.SIMULATION_TYPE) == type_key)
 
+def get_simulation_ids() -> List[str]:
+    simulation_ids = {record.get(dict_keys.SIMULATION_ID, constants.DEFAULT_SIMULATION_ID)
+                      for record in database.simulation_db.all()}
+    return sorted(simulation_ids | {constants.DEFAULT_SIMULATION_ID})
 
-def clear_simulation_data():
-    database.simulation_db.purge()
 
+def get_simulations() -> List[Dict[str, Any]]:
+    return [{dict_keys.SIMULATION_ID: simulation_id, dict_keys.SIMULATION_STATE: get_simulation_state(simulation_id)}
+            for simulation_id in get_simulation_ids()]
 
-def store_simulation_node_list(simulation_nodes: List[Dict[str, Any]]):
-    store_to_simulation_db(dict_keys.SIMULATION_NODE_LIST, simulation_nodes)
 
+def store_simulation_node_list(simulation_nodes: List[Dict[str, Any]],
+                               simulation_id: str = constants.DEFAULT_SIMULATION_ID):
+    store_to_simulation_db(dict_keys.SIMULATION_NODE_LIST, simulation_nodes, simulation_id)
 
-def get_simulation_node_list() -> List[Dict[str, Any]]:
-    return get_from_simulation_db(dict_keys.SIMULATION_NODE_LIST, result_if_none=[])
 
+def get_simulation_node_list(simulation_id: str = constants.DEFAULT_SIMULATION_ID) -> List[Dict[str, Any]]:
+    return get_from_simulation_db(dict_keys.SIMULATION_NODE_LIST, [], simulation_id)
 
-def store_simulation_program_list(simulation_programs: List[Dict[str, Any]]):
+
+def store_simulation_program_list(simulation_programs: List[Dict[str, Any]],
+                                  simulation_id: str = constants.DEFAULT_SIMULATION_ID):
     for simulation_program in simulation_programs:
         if simulation_program[dict_keys.PROGRAM_CODE_SOURCE] == program_values.CODE_SOURCE_RAW:
             simulation_program[
                 dict_keys.PROGRAM_MAIN_HANDLER] = f'{constants.NODE_MAIN_FILE_NAME_FOR_RAW}.' \
                                                   f'{simulation_program[dict_keys.PROGRAM_MAIN_HANDLER]}'
-    store_to_simulation_db(dict_keys.SIMULATION_PROGRAM_LIST, simulation_programs)
+    store_to_simulation_db(dict_keys.SIMULATION_PROGRAM_LIST, simulation_programs, simulation_id)
+
+
+def get_current_simulation_hash(simulation_id: str = constants.DEFAULT_SIMULATION_ID) -> str:
+    return get_from_simulation_db(dict_keys.SIMULATION_CURRENT_SIMULATION_HASH, "", simulation_id)
+
 
+def store_simulation_current_simulation_hash(current_simulation_hash: str,
+                                             simulation_id: str = constants.DEFAULT_SIMULATION_ID):
+    store_to_simulation_db(dict_keys.SIMULATION_CURRENT_SIMULATION_HASH, current_simulation_hash, simulation_id)
 
-def get_current_simulation_hash() -> str:
-    return get_from_simulation_db(dict_keys.SIMULATION_CURRENT_SIMULATION_HASH, result_if_none="")
 
+def get_simulation_program_list(simulation_id: str = constants.DEFAULT_SIMULATION_ID) -> List[Dict[str, Any]]:
+    return get_from_simulation_db(dict_keys.SIMULATION_PROGRAM_LIST, [], simulation_id)
 
-def store_simulation_current_simulation_hash(current_simulation_hash: str):
-    store_to_simulation_db(dict_keys.SIMULATION_CURRENT_SIMULATION_HASH, current_simulation_hash)
 
+def store_simulation_config(simulation_config: List[Dict[str, Any]],
+                            simulation_id: str = constants.DEFAULT_SIMULATION_ID):
+    store_to_simulation_db(dict_keys.SIMULATION_CONFIG, simulation_config, simulation_id)
 
-def get_simulation_program_list() -> List[Dict[str, Any]]:
-    return get_from_simulation_db(dict_keys.SIMULATION_PROGRAM_LIST, result_if_none=[])
 
+def get_simulation_config(simulation_id: str = constants.DEFAULT_SIMULATION_ID) -> Dict[str, Any]:
+    return get_from_simulation_db(dict_keys.SIMULATION_CONFIG, {}, simulation_id)
 
-def store_simulation_config(simulation_config: List[Dict[str, Any]]):
-    store_to_simulation_db(dict_keys.SIMULATION_CONFIG, simulation_config)
 
+def store_simulation_node_addresses(node_addresses: List[Dict[str, Any]],
+                                    simulation_id: str = constants.DEFAULT_SIMULATION_ID):
+    store_to_simulation_db(dict_keys.SIMULATION_NODE_ADDRESSES, node_addresses, simulation_id)
 
-def get_simulation_config() -> Dict[str, Any]:
-    return get_from_simulation_db(dict_keys.SIMULATION_CONFIG, result_if_none={})
 
+def get_simulation_node_addresses(simulation_id: str = constants.DEFAULT_SIMULATION_ID) -> Dict[str, Any]:
+    return get_from_simulation_db(dict_keys.SIMULATION_NODE_ADDRESSES, {}, simulation_id)
 
-def store_simulation_node_addresses(node_addresses: List[Dict[str, Any]]):
-    store_to_simulation_db(dict_keys.SIMULATION_NODE_ADDRESSES, node_addresses)
 
+def store_simulation_state(simulation_state: str, simulation_id: str = constants.DEFAULT_SIMULATION_ID):
+    store_to_simulation_db(dict_keys.SIMULATION_STATE, simulation_state, simulation_id)
 
-def get_simulation_node_addresses() -> Dict[str, Any]:
-    return get_from_simulation_db(dict_keys.SIMULATION_NODE_ADDRESSES, result_if_none={})
 
+def get_simulation_state(simulation_id: str = constants.DEFAULT_SIMULATION_ID) -> str:
+    return get_from_simulation_db(dict_keys.SIMULATION_STATE, simulation_values.UNINITIALISED_STATE, simulation_id)
 
-def store_simulation_state(simulation_state: str):
-    store_to_simulation_db(dict_keys.SIMULATION_STATE, simulation_state)
 
+def store_simulation_namespace_slot(slot: int, simulation_id: str = constants.DEFAULT_SIMULATION_ID):
+    store_to_simulation_db(dict_keys.SIMULATION_NAMESPACE_SLOT, slot, simulation_id)
 
-def get_simulation_state() -> str:
-    return get_from_simulation_db(dict_keys.SIMULATION_STATE, result_if_none=simulation_values.UNINITIALISED_STATE)
+
+# The default simulation always has slot 0, so it keeps the configured addresses. Other simulations take the lowest
+# slot not held by another simulation.
+def allocate_namespace_slot(simulation_id: str) -> int:
+    if simulation_id == constants.DEFAULT_SIMULATION_ID:
+        return 0
+    used_slots = {get_from_simulation_db(dict_keys.SIMULATION_NAMESPACE_SLOT, None, other_simulation_id)
+                  for other_simulation_id in get_simulation_ids() if other_simulation_id != simulation_id}
+    slot = 1
+    while slot in used_slots:
+        slot += 1
+    return slot
+
+
+# Each slot gets the configured subnet shifted along by a whole subnet per slot, with the base ip address moved along
+# with it, and its own block of ports for backends where nodes share a host address
+def apply_namespace_slot(simulation_config: Dict[str, Any], slot: int) -> Dict[str, Any]:
+    network_subnet = IPv4Network(simulation_config[dict_keys.CUSTOM_CONFIG_NETWORK_SUBNET], strict=False)
+    offset = slot * network_subnet.num_addresses
+    return {
+        **simulation_config,
+        dict_keys.CUSTOM_CONFIG_NETWORK_SUBNET: str(IPv4Network(
+            (int(network_subnet.network_address) + offset, network_subnet.prefixlen))),
+        dict_keys.CUSTOM_CONFIG_BASE_IP_ADDRESS: str(
+            IPv4Address(simulation_config[dict_keys.CUSTOM_CONFIG_BASE_IP_ADDRESS]) + offset),
+        dict_keys.CUSTOM_CONFIG_BASE_PORT: (simulation_config[dict_keys.CUSTOM_CONFIG_BASE_PORT]
+                                            + slot * constants.SIMULATION_NAMESPACE_PORT_BLOCK_SIZE)
+    }
 
 
-def clean():
-    docker_interface.remove_containers(list(map(lambda node: node[dict_keys.NODE_NID], get_simulation_node_list())))
+def uses_container_pool(simulation_id: str = constants.DEFAULT_SIMULATION_ID) -> bool:
+    return get_from_simulation_db(dict_keys.SIMULATION_CONTAINER_POOL, False, simulation_id)
+
+
+def uses_link_emulation(simulation_id: str = constants.DEFAULT_SIMULATION_ID) -> bool:
+    return get_from_simulation_db(dict_keys.SIMULATION_LINK_EMULATION, False, simulation_id)
+
+
+def get_node_containers(simulation_id: str) -> List[Dict[str, Any]]:
+    nodes = util.combine_dict_lists_by_key([get_simulation_node_list(simulation_id),
+                                            get_simulation_node_addresses(simulation_id)], dict_keys.NODE_NID)
+    programs_by_name = {program[dict_keys.PROGRAM_NAME]: program
+                        for program in get_simulation_program_list(simulation_id)}
+    use_link_emulation = uses_link_emulation(simulation_id)
+    return [{dict_keys.CONTAINER_POOL_NAME: get_container_name(simulation_id, node[dict_keys.NODE_NID]),
+             dict_keys.CONTAINER_POOL_IMAGE: get_image_name(simulation_id, node[dict_keys.NODE_PROGRAM]),
+             dict_keys.CONTAINER_POOL_IP_ADDRESS: node[dict_keys.NODE_ADDRESSES_IP_ADDRESS],
+             dict_keys.CONTAINER_POOL_PORT: node[dict_keys.NODE_ADDRESSES_PORT],
+             dict_keys.CONTAINER_POOL_LINK_EMULATION: use_link_emulation,
+             dict_keys.CONTAINER_POOL_RESOURCE_LIMITS: get_node_resource_limits(
+                 programs_by_name.get(node[dict_keys.NODE_PROGRAM], {}), node)}
+            for node in nodes if dict_keys.NODE_ADDRESSES_IP_ADDRESS in node]
+
+
+def get_node_resource_limits(program: Dict[str, Any], node: Dict[str, Any]) -> Dict[str, Any]:
+    return resource_limits.normalise_resource_limits(resource_limits.get_node_resource_limits(program, node))
+
+
+# Plans the resources of the simulation's loaded nodes, or with no simulation id, of the current topology and programs
+def plan_resources(simulation_id: Optional[str] = None) -> Dict[str, Any]:
+    if simulation_id is None:
+        nodes, program_list = network_topology.get_unpacked_network_topology(), programs.get_programs()
+    else:
+        nodes, program_list = get_simulation_node_list(simulation_id), get_simulation_program_list(simulation_id)
+    return resource_limits.plan_resources(nodes, program_list, docker_interface.get_host_capacity())
+
+
+def plan_and_store_resources(send_func: Callable, simulation_id: str):
+    resource_plan = plan_resources(simulation_id)
+    for warning in resource_plan[dict_keys.RESOURCE_PLAN_WARNINGS]:
+        print(f'WARNING: {warning} in simulation {simulation_id}')
+    store_to_simulation_db(dict_keys.SIMULATION_RESOURCE_PLAN, resource_plan, simulation_id)
+    send_func(ws_events.SIMULATION_RESOURCE_PLAN, resource_plan)
+
+
+# Containers created for the container pool are stopped and kept, along with their images and network, for the next
+# run to reuse
+def clean(simulation_id: str = constants.DEFAULT_SIMULATION_ID):
+    live_config.clear(simulation_id)
+    if uses_container_pool(simulation_id) and container_pool.is_enabled():
+        container_pool.release_containers(get_network_name(simulation_id), get_node_containers(simulation_id))
+        return
+    container_pool.forget_network(get_network_name(simulation_id))
+    docker_interface.remove_containers(
+        list(map(lambda node: get_container_name(simulation_id, node[dict_keys.NODE_NID]),
+                 get_simulation_node_list(simulation_id))))
     docker_interface.remove_images(
-        list(map(lambda program: program[dict_keys.PROGRAM_NAME], get_simulation_program_list())))
-    docker_interface.remove_network(constants.DOCKER_NETWORK_NAME)
+        list(map(lambda program: get_image_name(simulation_id, program[dict_keys.PROGRAM_NAME]),
+                 get_simulation_program_list(simulation_id))))
+    docker_interface.remove_network(get_network_name(simulation_id))
 
 
 def add_self_connections(simulation_node_list):
@@ -104,65 +284,167 @@ def add_self_connections(simulation_node_list):
             set(simulation_node[dict_keys.NODE_CONNECTIONS] + [simulation_node[dict_keys.NODE_NID]]))
 
 
-def load_simulation_data():
+def load_simulation_data(simulation_id: str = constants.DEFAULT_SIMULATION_ID):
     simulation_node_list = network_topology.get_unpacked_network_topology()
-    simulation_config = custom_config.get_custom_config()
+    slot = allocate_namespace_slot(simulation_id)
+    simulation_config = apply_namespace_slot(custom_config.get_custom_config(), slot)
 
     if simulation_config[dict_keys.CUSTOM_CONFIG_SELF_CONNECTED_NODES]:
         add_self_connections(simulation_node_list)
 
-    store_simulation_program_list(programs.get_programs())
-    store_simulation_node_list(simulation_node_list)
-    store_simulation_config(simulation_config)
+    store_simulation_namespace_slot(slot, simulation_id)
+    store_simulation_program_list(programs.get_programs(), simulation_id)
+    store_simulation_node_list(simulation_node_list, simulation_id)
+    store_simulation_config(simulation_config, simulation_id)
+
+
+# Parameters are resolved from the sparse defaults and overrides here, at the point of use. Edges resolving to the
+# same defaults share one dict, which yaml.dump writes once and then refers to by alias.
+def generate_connection_parameters_by_node(simulation_id: str = constants.DEFAULT_SIMULATION_ID,
+                                           nids: Optional[Set[str]] = None) -> Dict[str, Dict[str, Dict[str, Any]]]:
+    simulation_node_list: List[Dict[str, Any]] = get_simulation_node_list(simulation_id)
+    connection_parameters: Dict[str, Any] = network_topology.get_connection_parameters()
+    group_by_nid: Dict[str, str] = network_topology.get_group_by_nid(simulation_node_list)
+    return {
+        node[dict_keys.NODE_NID]: {
+            peer_nid: network_topology.resolve_connection_parameters(connection_parameters, group_by_nid,
+                                                                     node[dict_keys.NODE_NID], peer_nid)
+            for peer_nid in node[dict_keys.NODE_CONNECTIONS]
+        }
+        for node in simulation_node_list if nids is None or node[dict_keys.NODE_NID] in nids
+    }
 
 
-def generate_connection_parameters_by_node() -> Dict[str, Dict[str, Dict[str, Any]]]:
-    connection_parameters_by_node: Dict[str, Dict[str, Dict[str, Any]]] = {
-        node[dict_keys.NODE_NID]: {} for node in get_simulation_node_list()
-    }
-    all_connection_parameters: Dict[str, Dict[str, Dict[str, Any]]] = network_topology.get_connection_parameters()
-    for from_nid in all_connection_parameters:
-        for to_nid in all_connection_parameters[from_nid]:
-            this_connection_parameters: Dict[str, Any] = all_connection_parameters[from_nid][to_nid]
-            connection_parameters_by_node[from_nid][to_nid] = this_connection_parameters
-            connection_parameters_by_node[to_nid][from_nid] = this_connection_parameters
-    return connection_parameters_by_node
-
-
-def create_node_containers():
-    programs_by_name = {program[dict_keys.PROGRAM_NAME]: program for program in get_simulation_program_list()}
-    simulation_nodes: List[Dict[str, Any]] = get_simulation_node_list()
-    node_addresses = get_simulation_node_addresses()
+# With link emulation, the links that netem emulates are left with neutral parameters for the nodes themselves
+def generate_user_space_connection_parameters_by_node(
+        simulation_id: str = constants.DEFAULT_SIMULATION_ID,
+        connection_parameters_by_node: Optional[Dict[str, Dict[str, Dict[str, Any]]]] = None) \
+        -> Dict[str, Dict[str, Dict[str, Any]]]:
+    if connection_parameters_by_node is None:
+        connection_parameters_by_node = generate_connection_parameters_by_node(simulation_id)
+    if not uses_link_emulation(simulation_id):
+        return connection_parameters_by_node
+    return link_emulation.get_user_space_connection_parameters_by_node(connection_parameters_by_node)
+
+
+def get_node_ip_addresses(simulation_id: str = constants.DEFAULT_SIMULATION_ID) -> Dict[str, str]:
+    return {node_address[dict_keys.NODE_ADDRESSES_NID]: node_address[dict_keys.NODE_ADDRESSES_IP_ADDRESS]
+            for node_address in get_simulation_node_addresses(simulation_id)}
+
+
+def apply_link_emulation_script(container_name: str, ip_address: str):
+    error = link_emulation.apply_script(container_name, ip_address)
+    if error is not None:
+        print(f'WARNING: Could not update the link emulation of {container_name}: {error}')
+
+
+# Runs the changed scripts in the background, as each one is a call into its container. Only running containers need
+# them now, as the others run their script when they start.
+def apply_link_emulation_scripts(simulation_id: str, nids: List[str]):
+    ip_addresses = get_node_ip_addresses(simulation_id)
+    container_names = {nid: get_container_name(simulation_id, nid) for nid in nids}
+    statuses: Dict[str, str] = docker_interface.get_container_statuses(list(container_names.values()))
+    for nid, container_name in container_names.items():
+        if statuses.get(container_name) == 'running':
+            get_node_action_executor().submit(apply_link_emulation_script, container_name, ip_addresses[nid])
+
+
+# Returns the nids whose connection parameters changed, so they were written to the simulation's live config. With
+# link emulation, their scripts are rewritten too, and run again in those of their containers that are running.
+def publish_connection_parameters(simulation_id: str = constants.DEFAULT_SIMULATION_ID,
+                                  nids: Optional[Set[str]] = None) -> List[str]:
+    connection_parameters_by_node = generate_connection_parameters_by_node(simulation_id, nids)
+    changed_nids = live_config.publish_connection_parameters(
+        simulation_id, generate_user_space_connection_parameters_by_node(simulation_id, connection_parameters_by_node))
+    if not uses_link_emulation(simulation_id):
+        return changed_nids
+    changed_script_nids = link_emulation.publish_scripts(simulation_id, connection_parameters_by_node,
+                                                         get_node_ip_addresses(simulation_id))
+    if changed_script_nids:
+        apply_link_emulation_scripts(simulation_id, changed_script_nids)
+    return sorted(set(changed_nids) | set(changed_script_nids))
+
+
+# Only connections from the given nids can have changed, or from any node if none are given. Returns the nids
+# republished for each simulation that had any.
+def publish_connection_parameters_to_active_simulations(nids: Optional[Set[str]] = None) -> Dict[str, List[str]]:
+    changed_nids_by_simulation: Dict[str, List[str]] = {}
+    for simulation_id in get_simulation_ids():
+        if get_simulation_state(simulation_id) not in [simulation_values.READY_TO_RUN_STATE,
+                                                       simulation_values.RUNNING_STATE]:
+            continue
+        changed_nids = publish_connection_parameters(simulation_id, nids)
+        if changed_nids:
+            changed_nids_by_simulation[simulation_id] = changed_nids
+    return changed_nids_by_simulation
+
+
+def get_labels(simulation_id: str, **labels: str) -> Dict[str, str]:
+    return {constants.SIMULATION_LABEL: simulation_id, **labels}
+
+
+# Creates the containers for the given nids, or for every node. When only some are created, pooled containers that
+# were not reused are left for the next full run.
+def create_node_containers(simulation_id: str = constants.DEFAULT_SIMULATION_ID, nids: Optional[Set[str]] = None):
+    programs_by_name = {program[dict_keys.PROGRAM_NAME]: program
+                        for program in get_simulation_program_list(simulation_id)}
+    simulation_nodes: List[Dict[str, Any]] = get_simulation_node_list(simulation_id)
+    node_addresses = get_simulation_node_addresses(simulation_id)
     nodes = util.combine_dict_lists_by_key([simulation_nodes, node_addresses], dict_keys.NODE_NID)
+    if nids is not None:
+        nodes = [node for node in nodes if node[dict_keys.NODE_NID] in nids]
+    network_name = get_network_name(simulation_id)
+    live_config_directory_path = live_config.get_live_config_directory(simulation_id)
+    use_container_pool = uses_container_pool(simulation_id)
+    use_link_emulation = uses_link_emulation(simulation_id)
+    image_ids: Dict[str, str] = {
+        program_name: docker_interface.get_image_id(get_image_name(simulation_id, program_name))
+        for program_name in programs_by_name} if use_container_pool else {}
     for node in nodes:
         program = programs_by_name[node[dict_keys.NODE_PROGRAM]]
         peer_nid_list = ','.join(node[dict_keys.NODE_CONNECTIONS])
         run_args = [peer_nid_list, node[dict_keys.NODE_NID], str(node[dict_keys.NODE_ADDRESSES_PORT]),
                     program[dict_keys.PROGRAM_MAIN_HANDLER]]
-        docker_interface.create_container_and_connect(node[dict_keys.NODE_PROGRAM], node[dict_keys.NODE_NID],
+        labels = get_labels(simulation_id, **{constants.NID_LABEL: node[dict_keys.NODE_NID]})
+        link_emulation_script_path = (link_emulation.get_container_script_path(
+            node[dict_keys.NODE_ADDRESSES_IP_ADDRESS]) if use_link_emulation else None)
+        node_resource_limits = get_node_resource_limits(program, node)
+        if use_container_pool:
+            container_pool.create_or_reuse_container(get_image_name(simulation_id, node[dict_keys.NODE_PROGRAM]),
+                                                     image_ids[node[dict_keys.NODE_PROGRAM]],
+                                                     get_container_name(simulation_id, node[dict_keys.NODE_NID]),
+                                                     program[dict_keys.PROGRAM_RUNTIME], run_args,
+                                                     node[dict_keys.NODE_ADDRESSES_IP_ADDRESS],
+                                                     node[dict_keys.NODE_ADDRESSES_PORT], network_name, labels,
+                                                     live_config_directory_path, link_emulation_script_path,
+                                                     node_resource_limits)
+            continue
+        docker_interface.create_container_and_connect(get_image_name(simulation_id, node[dict_keys.NODE_PROGRAM]),
+                                                      get_container_name(simulation_id, node[dict_keys.NODE_NID]),
                                                       program[dict_keys.PROGRAM_RUNTIME],
                                                       run_args, node[dict_keys.NODE_ADDRESSES_IP_ADDRESS],
                                                       [node[dict_keys.NODE_ADDRESSES_PORT]],
-                                                      constants.DOCKER_NETWORK_NAME)
+                                                      network_name, labels=labels,
+                                                      live_config_directory_path=live_config_directory_path,
+                                                      link_emulation_script_path=link_emulation_script_path,
+                                                      resource_limits=node_resource_limits or None)
+    if use_container_pool and nids is None:
+        container_pool.drain(network_name)
 
 
-def get_ip_address_for_node_index(index: int, base_ip_address: str) -> str:
-    return str(IPv4Address(int(IPv4Address(base_ip_address)) + index))
-
-
-def generate_node_addresses():
-    simulation_config = get_simulation_config()
+def generate_node_addresses(simulation_id: str = constants.DEFAULT_SIMULATION_ID):
+    simulation_config = get_simulation_config(simulation_id)
     base_ip_address = simulation_config[dict_keys.CUSTOM_CONFIG_BASE_IP_ADDRESS]
-    node_port = simulation_config[dict_keys.CUSTOM_CONFIG_BASE_PORT]
-    return [
-        {
+    base_port = simulation_config[dict_keys.CUSTOM_CONFIG_BASE_PORT]
+    node_addresses = []
+    for index, simulation_node in enumerate(get_simulation_node_list(simulation_id)):
+        ip_address, port = docker_interface.get_node_address(index, base_ip_address, base_port)
+        node_addresses.append({
             dict_keys.NODE_ADDRESSES_NID: simulation_node[dict_keys.NODE_NID],
-            dict_keys.NODE_ADDRESSES_IP_ADDRESS: get_ip_address_for_node_index(index, base_ip_address),
-            dict_keys.NODE_ADDRESSES_PORT: node_port
-        }
-        for index, simulation_node
-        in enumerate(get_simulation_node_list())
-    ]
+            dict_keys.NODE_ADDRESSES_IP_ADDRESS: ip_address,
+            dict_keys.NODE_ADDRESSES_PORT: port
+        })
+    return node_addresses
 
 
 def get_code_for_program(program, temp_dir):
@@ -183,111 +465,173 @@ def get_code_for_program(program, temp_dir):
         with ZipFile(f"out/program_zip_files/{program[dict_keys.PROGRAM_NAME]}.zip", 'r') as zip_file_obj:
             zip_file_obj.extractall(dir_to_write_to)
     elif code_source == program_values.CODE_SOURCE_GIT:
+        from git import Repo  # GitPython is slow to import and only needed for git programs
         git_repo: Repo = Repo.clone_from(program[dict_keys.PROGRAM_CODE_DATA][dict_keys.PROGRAM_CODE_DATA_GIT_REPO_URL],
                                          dir_to_write_to)
         git_repo.git.checkout(
             program[dict_keys.PROGRAM_CODE_DATA][dict_keys.PROGRAM_CODE_DATA_GIT_CHECKOUT_BRANCH_OR_TAG])
 
 
-def inject_user_dependencies(program, temp_dir):
-    if program[dict_keys.PROGRAM_CODE_SOURCE] != program_values.CODE_SOURCE_RAW:
-        return
-    if program[dict_keys.PROGRAM_RUNTIME] == 'python3':
-        user_dependencies = program[dict_keys.PROGRAM_CODE_DATA][dict_keys.PROGRAM_CODE_DATA_RAW_CODE_DEPENDENCIES]
-        with open(os.path.join(temp_dir, 'requirements.txt'), 'a') as requirements_txt:
-            requirements_txt.write('\n')
-            requirements_txt.write(user_dependencies)
-
-
-def generate_and_store_node_addresses():
-    store_simulation_node_addresses(generate_node_addresses())
-
-
-def create_program_images(temp_dir: tempfile.TemporaryDirectory):
-    node_addresses = get_simulation_node_addresses()
-    node_addresses_file_path = os.path.join(str(temp_dir), constants.NODE_ADDRESSES_FILE_NAME)
+# Each slot's block of ports holds constants.SIMULATION_NAMESPACE_PORT_BLOCK_SIZE nodes on backends where nodes share
+# a host address, so a larger simulation would run into the next slot's ports
+def validate_node_addresses(node_addresses: List[Dict[str, Any]], simulation_id: str):
+    used_addresses = {(node_address[dict_keys.NODE_ADDRESSES_IP_ADDRESS], node_address[dict_keys.NODE_ADDRESSES_PORT])
+                      for other_simulation_id in get_simulation_ids() if other_simulation_id != simulation_id
+                      for node_address in get_simulation_node_addresses(other_simulation_id)}
+    for node_address in node_addresses:
+        address = (node_address[dict_keys.NODE_ADDRESSES_IP_ADDRESS], node_address[dict_keys.NODE_ADDRESSES_PORT])
+        if address in used_addresses:
+            raise SimulationAddressException(
+                f'Address {address[0]}:{address[1]} of node {node_address[dict_keys.NODE_ADDRESSES_NID]} is used by '
+                f'another simulation. Simulations whose nodes share a host address can have at most '
+                f'{constants.SIMULATION_NAMESPACE_PORT_BLOCK_SIZE} nodes')
+
+
+def generate_and_store_node_addresses(simulation_id: str = constants.DEFAULT_SIMULATION_ID):
+    node_addresses = generate_node_addresses(simulation_id)
+    validate_node_addresses(node_addresses, simulation_id)
+    store_simulation_node_addresses(node_addresses, simulation_id)
+
+
+# Writes the node addresses and connection parameters that go into every program's image as the two YAML files, which
+# the base node files read, and returns their paths. With binary node config, they are also written as a single
+# msgpack file for programs that read it with the support files.
+def write_node_config_files(directory: str, node_addresses: List[Dict[str, Any]],
+                            connection_parameters_by_node: Dict[str, Dict[str, Dict[str, Any]]]) -> List[str]:
+    node_config_file_paths: List[str] = []
+    if topology_binary.is_node_config_enabled():
+        node_config_file_path = os.path.join(directory, constants.NODE_CONFIG_FILE_NAME)
+        with open(node_config_file_path, 'wb') as node_config_file:
+            node_config_file.write(topology_binary.encode_node_config(node_addresses, connection_parameters_by_node))
+        node_config_file_paths.append(node_config_file_path)
+    node_addresses_file_path = os.path.join(directory, constants.NODE_ADDRESSES_FILE_NAME)
     with open(node_addresses_file_path, 'w') as node_addresses_file:
         yaml.dump(node_addresses, node_addresses_file, default_flow_style=False)
-    connection_parameters_by_node = generate_connection_parameters_by_node()
-    connection_parameters_by_node_file_path = os.path.join(str(temp_dir), constants.CONNECTION_PARAMETERS_FILE_NAME)
+    connection_parameters_by_node_file_path = os.path.join(directory, constants.CONNECTION_PARAMETERS_FILE_NAME)
     with open(connection_parameters_by_node_file_path, 'w') as connection_parameters_by_node_file:
         yaml.dump(connection_parameters_by_node, connection_parameters_by_node_file, default_flow_style=False)
-    for program in get_simulation_program_list():
+    return node_config_file_paths + [node_addresses_file_path, connection_parameters_by_node_file_path]
+
+
+# The support files are readers for the binary node config and the live config, for the runtimes that have them. Every
+# node has a live config directory, so they are always copied.
+def copy_node_support_files(runtime: str, program_temp_dir: str):
+    support_files_directory = os.path.join(constants.NODE_SUPPORT_FILES_DIRECTORY, runtime)
+    if not os.path.isdir(support_files_directory):
+        return
+    for file_name in os.listdir(support_files_directory):
+        if os.path.isfile(os.path.join(support_files_directory, file_name)):
+            shutil.copy2(os.path.join(support_files_directory, file_name), program_temp_dir)
+
+
+def create_program_images(temp_dir: tempfile.TemporaryDirectory, simulation_id: str = constants.DEFAULT_SIMULATION_ID,
+                          program_names: Optional[Set[str]] = None):
+    node_addresses = get_simulation_node_addresses(simulation_id)
+    connection_parameters_by_node = generate_user_space_connection_parameters_by_node(simulation_id)
+    system_packages = constants.LINK_EMULATION_SYSTEM_PACKAGES if uses_link_emulation(simulation_id) else None
+    node_config_file_paths = write_node_config_files(str(temp_dir), node_addresses, connection_parameters_by_node)
+    for program in get_simulation_program_list(simulation_id):
+        if program_names is not None and program[dict_keys.PROGRAM_NAME] not in program_names:
+            continue
         with tempfile.TemporaryDirectory() as _program_temp_dir:
             program_temp_dir = os.path.join(str(_program_temp_dir), 'tmp')  # workaround as copytree requires empty dst
             shutil.copytree(os.path.join(constants.BASE_NODE_FILES_DIRECTORY, program[dict_keys.PROGRAM_RUNTIME]),
                             program_temp_dir)
-            shutil.copy2(node_addresses_file_path, program_temp_dir)
-            shutil.copy2(connection_parameters_by_node_file_path, program_temp_dir)
+            for node_config_file_path in node_config_file_paths:
+                shutil.copy2(node_config_file_path, program_temp_dir)
+            copy_node_support_files(program[dict_keys.PROGRAM_RUNTIME], program_temp_dir)
             get_code_for_program(program, program_temp_dir)
-            inject_user_dependencies(program, program_temp_dir)
-            docker_interface.create_image(str(program_temp_dir), program[dict_keys.PROGRAM_NAME])
+            dependency_image_tag = dependency_images.ensure_dependency_image(program, program_temp_dir,
+                                                                             system_packages)
+            docker_interface.create_image(str(program_temp_dir),
+                                          get_image_name(simulation_id, program[dict_keys.PROGRAM_NAME]),
+                                          dependency_image_tag,
+                                          get_labels(simulation_id,
+                                                     **{constants.PROGRAM_LABEL: program[dict_keys.PROGRAM_NAME]}))
+
+
+def create_network(simulation_id: str = constants.DEFAULT_SIMULATION_ID):
+    network_subnet = get_simulation_config(simulation_id)[dict_keys.CUSTOM_CONFIG_NETWORK_SUBNET]
+    if uses_container_pool(simulation_id):
+        container_pool.ensure_network(get_network_name(simulation_id), network_subnet, get_labels(simulation_id))
+    else:
+        docker_interface.create_network(get_network_name(simulation_id), network_subnet, get_labels(simulation_id))
 
 
-def create_network():
-    network_subnet = get_simulation_config()[dict_keys.CUSTOM_CONFIG_NETWORK_SUBNET]
-    docker_interface.create_network(constants.DOCKER_NETWORK_NAME, network_subnet)
+def set_state_and_send(simulation_state: str, send_func: Callable, simulation_id: str):
+    store_simulation_state(simulation_state, simulation_id)
+    send_func(ws_events.SIMULATION_STATE, simulation_state)
 
 
-def set_up_simulation(send_func: Callable):
+def set_up_simulation(send_func: Callable, simulation_id: str = constants.DEFAULT_SIMULATION_ID):
     send_func(ws_events.SIMULATION_STATE, simulation_values.INITIALISING_STATE)
-    clean()
-    clear_simulation_data()
-    load_simulation_data()
-    generate_and_store_node_addresses()
+    with metrics.SIMULATION_SETUP_PHASE_SECONDS.time('clean'):
+        clean(simulation_id)
+        clear_simulation_data(simulation_id)
+    with metrics.SIMULATION_SETUP_PHASE_SECONDS.time('load_simulation_data'):
+        load_simulation_data(simulation_id)
+        store_to_simulation_db(dict_keys.SIMULATION_CONTAINER_POOL, container_pool.is_enabled(), simulation_id)
+        store_to_simulation_db(dict_keys.SIMULATION_LINK_EMULATION, link_emulation.is_enabled(), simulation_id)
     with tempfile.TemporaryDirectory() as temp_dir:
         try:
-            store_simulation_state(simulation_values.CREATING_VIRTUAL_NETWORK_STATE)
-            send_func(ws_events.SIMULATION_STATE, simulation_values.CREATING_VIRTUAL_NETWORK_STATE)
+            with metrics.SIMULATION_SETUP_PHASE_SECONDS.time('generate_node_addresses'):
+                generate_and_store_node_addresses(simulation_id)
 
-            create_network()
+            with metrics.SIMULATION_SETUP_PHASE_SECONDS.time('plan_resources'):
+                plan_and_store_resources(send_func, simulation_id)
 
-            store_simulation_state(simulation_values.CREATING_PROGRAM_IMAGES_STATE)
-            send_func(ws_events.SIMULATION_STATE, simulation_values.CREATING_PROGRAM_IMAGES_STATE)
+            set_state_and_send(simulation_values.CREATING_VIRTUAL_NETWORK_STATE, send_func, simulation_id)
 
-            create_program_images(temp_dir)
+            with metrics.SIMULATION_SETUP_PHASE_SECONDS.time('create_network'):
+                create_network(simulation_id)
 
-            store_simulation_state(simulation_values.CREATING_NODES_STATE)
-            send_func(ws_events.SIMULATION_STATE, simulation_values.CREATING_NODES_STATE)
+            set_state_and_send(simulation_values.CREATING_PROGRAM_IMAGES_STATE, send_func, simulation_id)
 
-            create_node_containers()
+            with metrics.SIMULATION_SETUP_PHASE_SECONDS.time('create_program_images'):
+                create_program_images(temp_dir, simulation_id)
 
-            store_simulation_state(simulation_values.READY_TO_RUN_STATE)
-            send_func(ws_events.SIMULATION_STATE, simulation_values.READY_TO_RUN_STATE)
+            set_state_and_send(simulation_values.CREATING_NODES_STATE, send_func, simulation_id)
+
+            with metrics.SIMULATION_SETUP_PHASE_SECONDS.time('create_node_containers'):
+                publish_connection_parameters(simulation_id)
+                create_node_containers(simulation_id)
+
+            set_state_and_send(simulation_values.READY_TO_RUN_STATE, send_func, simulation_id)
         except Exception as e:
             print(f'ERROR: {e}')
-            stop_and_reset_simulation(send_func)
+            stop_and_reset_simulation(send_func, simulation_id)
 
 
-def stop_and_reset_simulation(send_func: Callable):
-    store_simulation_state(simulation_values.RESETTING_STATE)
-    send_func(ws_events.SIMULATION_STATE, simulation_values.RESETTING_STATE)
+def stop_and_reset_simulation(send_func: Callable, simulation_id: str = constants.DEFAULT_SIMULATION_ID):
+    set_state_and_send(simulation_values.RESETTING_STATE, send_func, simulation_id)
 
-    clean()
-    clear_simulation_data()
+    clean(simulation_id)
+    clear_simulation_data(simulation_id)
 
-    store_simulation_state(simulation_values.UNINITIALISED_STATE)
+    if simulation_id == constants.DEFAULT_SIMULATION_ID:
+        store_simulation_state(simulation_values.UNINITIALISED_STATE)
     send_func(ws_events.SIMULATION_STATE, simulation_values.UNINITIALISED_STATE)
 
 
-def get_simulation_nodes():
-    if get_simulation_state() not in [simulation_values.READY_TO_RUN_STATE, simulation_values.RUNNING_STATE]:
+def get_simulation_nodes(simulation_id: str = constants.DEFAULT_SIMULATION_ID):
+    if get_simulation_state(simulation_id) not in [simulation_values.READY_TO_RUN_STATE,
+                                                   simulation_values.RUNNING_STATE]:
         return []
-    nodes = get_simulation_node_list()
-    program_list = get_simulation_program_list()
+    nodes = get_simulation_node_list(simulation_id)
+    program_list = get_simulation_program_list(simulation_id)
     program_runtimes: Dict[str, str] = {p[dict_keys.PROGRAM_NAME]: p[dict_keys.PROGRAM_RUNTIME] for p in
                                         program_list}
     program_descriptions: Dict[str, str] = {p[dict_keys.PROGRAM_NAME]: p[dict_keys.PROGRAM_DESCRIPTION] for p in
                                             program_list}
     statuses: Dict[str, str] = docker_interface.get_container_statuses(
-        list(map(lambda n: n[dict_keys.NODE_NID], nodes)))
+        list(map(lambda n: get_container_name(simulation_id, n[dict_keys.NODE_NID]), nodes)))
     simulation_nodes: List[Dict[str, Any]] = []
     for node in nodes:
         nid: str = node[dict_keys.NODE_NID]
         program: str = node[dict_keys.NODE_PROGRAM]
         simulation_nodes.append({
             dict_keys.NODE_NID: nid,
-            dict_keys.CONTAINER_STATUS: statuses[nid],
+            dict_keys.CONTAINER_STATUS: statuses[get_container_name(simulation_id, nid)],
             dict_keys.NODE_PROGRAM: node[dict_keys.NODE_PROGRAM],
             dict_keys.PROGRAM_RUNTIME: program_runtimes[program],
             dict_keys.PROGRAM_DESCRIPTION: program_descriptions[program]
@@ -295,18 +639,74 @@ def get_simulation_nodes():
     return simulation_nodes
 
 
-def perform_node_action(data: Dict[str, str]):
+def perform_node_action(data: Dict[str, str], simulation_id: str = constants.DEFAULT_SIMULATION_ID):
     nid = data[dict_keys.NODE_NID]
     action = data[dict_keys.NODE_ACTION]
-    docker_interface.action_container(nid, action)
-
-
-def stream_node_logs(data: Dict[str, str]):
+    docker_interface.action_container(get_container_name(simulation_id, nid), action)
+
+
+def get_node_action_executor() -> ThreadPoolExecutor:
+    global node_action_executor
+    if node_action_executor is None:
+        node_action_executor = ThreadPoolExecutor(max_workers=constants.BULK_NODE_ACTION_MAX_WORKERS,
+                                                  thread_name_prefix='node-action')
+    return node_action_executor
+
+
+def select_bulk_node_action_nids(data: Dict[str, Any], simulation_id: str) -> List[str]:
+    if dict_keys.BULK_NODE_ACTION_NIDS in data:
+        return data[dict_keys.BULK_NODE_ACTION_NIDS]
+    nodes = get_simulation_node_list(simulation_id)
+    if data.get(dict_keys.BULK_NODE_ACTION_ALL):
+        return [node[dict_keys.NODE_NID] for node in nodes]
+    if dict_keys.BULK_NODE_ACTION_PROGRAM in data:
+        return [node[dict_keys.NODE_NID] for node in nodes
+                if node[dict_keys.NODE_PROGRAM] == data[dict_keys.BULK_NODE_ACTION_PROGRAM]]
+    if dict_keys.BULK_NODE_ACTION_GROUP in data:
+        return [node[dict_keys.NODE_NID] for node in nodes
+                if node.get(dict_keys.NODE_GROUP) == data[dict_keys.BULK_NODE_ACTION_GROUP]]
+    raise NodeActionException('A bulk node action needs all, nids, program or group to select its nodes')
+
+
+# The backend calls run on a bounded thread pool so that the loop keeps serving other events. With a stagger, each
+# node's action is started that long after the previous one's.
+async def perform_bulk_node_action(data: Dict[str, Any], send_func: Callable,
+                                   simulation_id: str = constants.DEFAULT_SIMULATION_ID):
+    if type(data) != dict:
+        raise NodeActionException('A bulk node action must be an object')
+    action = data.get(dict_keys.NODE_ACTION)
+    if action not in constants.NODE_ACTIONS:
+        raise NodeActionException(f'Unknown node action {action!r}')
+    stagger_milliseconds = data.get(dict_keys.BULK_NODE_ACTION_STAGGER_MILLISECONDS, 0)
+    if type(stagger_milliseconds) not in (int, float) or not 0 <= stagger_milliseconds < math.inf:
+        raise NodeActionException(f'{dict_keys.BULK_NODE_ACTION_STAGGER_MILLISECONDS} must be a non-negative number')
+    nids = select_bulk_node_action_nids(data, simulation_id)
+    stagger_seconds = stagger_milliseconds / 1000
+    loop = asyncio.get_running_loop()
+    start = time.perf_counter()
+    pending = []
+    for index, nid in enumerate(nids):
+        if stagger_seconds and index > 0:
+            await asyncio.sleep(stagger_seconds)
+        pending.append(loop.run_in_executor(get_node_action_executor(), docker_interface.action_container,
+                                            get_container_name(simulation_id, nid), action))
+    errors = await asyncio.gather(*pending, return_exceptions=True)
+    failed = {nid: str(error) for nid, error in zip(nids, errors) if error is not None}
+    send_func(ws_events.BULK_NODE_ACTION_RESULT, {
+        dict_keys.NODE_ACTION: action,
+        dict_keys.BULK_NODE_ACTION_REQUESTED: len(nids),
+        dict_keys.BULK_NODE_ACTION_SUCCEEDED: len(nids) - len(failed),
+        dict_keys.BULK_NODE_ACTION_FAILED: failed,
+        dict_keys.BULK_NODE_ACTION_SECONDS: time.perf_counter() - start
+    })
+
+
+def stream_node_logs(data: Dict[str, str], simulation_id: str = constants.DEFAULT_SIMULATION_ID):
     if 'all' in data:
-        for nid in map(lambda node: node[dict_keys.NODE_NID], get_simulation_node_list()):
-            docker_interface.stream_container_logs(nid, None)
+        for nid in map(lambda node: node[dict_keys.NODE_NID], get_simulation_node_list(simulation_id)):
+            docker_interface.stream_container_logs(get_container_name(simulation_id, nid), None)
     else:
-        docker_interface.stream_container_logs(data[dict_keys.NODE_NID],
+        docker_interface.stream_container_logs(get_container_name(simulation_id, data[dict_keys.NODE_NID]),
                                                (data[dict_keys.STREAM_SINCE]
                                                 if dict_keys.STREAM_SINCE in data
                                                 else None))
@@ -0,0 +1,118 @@
+from abc import ABC, abstractmethod
+from typing import List, Dict, Any, Tuple, Optional
+import os
+
+import dict_keys
+
+
+# The operations the simulation needs from whatever runs its nodes. Containers are identified by name and images by
+# tag, as with Docker.
+class SimulationBackend(ABC):
+    @abstractmethod
+    def create_network(self, network_name: str, network_subnet: str, labels: Optional[Dict[str, str]] = None):
+        pass
+
+    @abstractmethod
+    def remove_network(self, network_name: str):
+        pass
+
+    # With a dependency image, the image is built on top of it and only adds the build context
+    @abstractmethod
+    def create_image(self, path: str, tag: str, dependency_image_tag: Optional[str] = None,
+                     labels: Optional[Dict[str, str]] = None):
+        pass
+
+    # Builds an image for the runtime with these requirements, and any of these system packages, installed, for program
+    # images to share
+    @abstractmethod
+    def create_dependency_image(self, tag: str, runtime: str, requirements: List[str],
+                                system_packages: Optional[List[str]] = None):
+        pass
+
+    @abstractmethod
+    def dependency_image_exists(self, tag: str) -> bool:
+        pass
+
+    # Returns the id of the image a runtime's base image tag currently refers to, pulling it if need be, or None for
+    # backends that do not build on base images
+    def resolve_base_image_id(self, tag: str) -> Optional[str]:
+        return None
+
+    @abstractmethod
+    def remove_images(self, image_names: List[str]):
+        pass
+
+    # With a run args file, the container reads its run args from that file each time it starts instead. With a live
+    # config directory, the container can read it at the path in its DIORAMA_LIVE_CONFIG_DIR environment variable. With
+    # a link emulation script, which is a path inside the container, the container runs it before the program.
+    @abstractmethod
+    def create_container(self, image_name: str, name: str, runtime: str, run_args: List[str], ip_address: str,
+                         udp_ports: List[int], network_name: str, run_args_file_path: Optional[str] = None,
+                         labels: Optional[Dict[str, str]] = None, live_config_directory_path: Optional[str] = None,
+                         link_emulation_script_path: Optional[str] = None,
+                         resource_limits: Optional[Dict[str, Any]] = None):
+        pass
+
+    @abstractmethod
+    def remove_containers(self, container_names: List[str]):
+        pass
+
+    # Returns an error message if the action could not be performed. May be called from several threads at once.
+    @abstractmethod
+    def action_container(self, name: str, action: str) -> Optional[str]:
+        pass
+
+    @abstractmethod
+    def get_container_statuses(self, names: List[str]) -> Dict[str, Any]:
+        pass
+
+    @abstractmethod
+    def stream_container_logs(self, name: str, since):
+        pass
+
+    # Each of these lists the objects with the label, in a single query, as a dict from their names to their labels
+    @abstractmethod
+    def list_labelled_containers(self, label: str) -> Dict[str, Dict[str, str]]:
+        pass
+
+    @abstractmethod
+    def list_labelled_images(self, label: str) -> Dict[str, Dict[str, str]]:
+        pass
+
+    @abstractmethod
+    def list_labelled_networks(self, label: str) -> Dict[str, Dict[str, str]]:
+        pass
+
+    # Returns the (ip address, port) that the node at this index in the simulation should use
+    @abstractmethod
+    def get_node_address(self, index: int, base_ip_address: str, base_port: int) -> Tuple[str, int]:
+        pass
+
+    # Backends that can stop, rename and restart containers with new run args can keep them in the container pool. Only
+    # the pool uses the three methods after this one, so the defaults find no image, rename nothing and stop nothing.
+    def supports_container_pool(self) -> bool:
+        return False
+
+    def get_image_id(self, tag: str) -> Optional[str]:
+        return None
+
+    # Returns whether the container existed
+    def rename_container(self, name: str, new_name: str) -> bool:
+        return False
+
+    def stop_containers(self, container_names: List[str]):
+        pass
+
+    # Backends whose containers can run tc with NET_ADMIN can emulate links with netem instead of in user space
+    def supports_link_emulation(self) -> bool:
+        return False
+
+    # Returns an error message if the command could not be run or failed, which it cannot be unless the backend
+    # supports link emulation
+    def run_in_container(self, name: str, command: List[str]) -> Optional[str]:
+        return f'Cannot run commands in the containers of {type(self).__name__}'
+
+    # The cpus and memory of the machine the nodes run on, which is this one unless the backend says otherwise
+    def get_host_capacity(self) -> Dict[str, Any]:
+        return {dict_keys.HOST_CAPACITY_CPUS: os.cpu_count() or 1,
+                dict_keys.HOST_CAPACITY_MEMORY_BYTES: os.sysconf('SC_PAGE_SIZE') * os.sysconf('SC_PHYS_PAGES')}
@@ -0,0 +1,190 @@
+from typing import List, Dict, Any, Optional, Tuple
+from array import array
+from ipaddress import IPv4Address
+import os
+import sys
+
+import constants
+import dict_keys
+
+UNPACKED_TOPOLOGY_FORMAT: str = 'diorama-unpacked-topology'
+NODE_CONFIG_FORMAT: str = 'diorama-node-config'
+FORMAT_VERSION: int = 1
+FORMAT_KEY: str = 'format'
+VERSION_KEY: str = 'version'
+NIDS_KEY: str = 'nids'
+PROGRAMS_KEY: str = 'programs'
+GROUPS_KEY: str = 'groups'
+NODE_PROGRAMS_KEY: str = 'nodePrograms'
+NODE_GROUPS_KEY: str = 'nodeGroups'
+NODE_EXTRAS_KEY: str = 'nodeExtras'
+CONNECTION_OFFSETS_KEY: str = 'connectionOffsets'
+CONNECTIONS_KEY: str = 'connections'
+CONNECTION_PARAMETERS_KEY: str = 'connectionParameters'
+IP_ADDRESSES_KEY: str = 'ipAddresses'
+PORTS_KEY: str = 'ports'
+PARAMETER_SETS_KEY: str = 'parameterSets'
+CONNECTION_PARAMETER_SETS_KEY: str = 'connectionParameterSets'
+UINT32_TYPECODE: str = 'I' if array('I').itemsize == 4 else 'L'
+UNPACKED_NODE_KEYS: List[str] = [dict_keys.NODE_NID, dict_keys.NODE_PROGRAM, dict_keys.NODE_GROUP,
+                                 dict_keys.NODE_CONNECTIONS]
+
+
+class TopologyFormatException(Exception):
+    pass
+
+
+def is_node_config_enabled() -> bool:
+    return os.environ.get(constants.BINARY_NODE_CONFIG_ENVIRONMENT_VARIABLE, '').lower() in ['1', 'true', 'yes']
+
+
+# Integer columns are stored as little-endian uint32 byte strings, which msgpack writes as a single bin object
+def pack_uint32s(values: List[int]) -> bytes:
+    packed = array(UINT32_TYPECODE, values)
+    if sys.byteorder == 'big':
+        packed.byteswap()
+    return packed.tobytes()
+
+
+def unpack_uint32s(data: bytes) -> array:
+    unpacked = array(UINT32_TYPECODE)
+    unpacked.frombytes(data)
+    if sys.byteorder == 'big':
+        unpacked.byteswap()
+    return unpacked
+
+
+# Returns a table of the distinct values in order of first appearance, and each value's index in it
+def intern(values: List[Any]) -> Tuple[List[Any], Dict[Any, int]]:
+    indices: Dict[Any, int] = {}
+    for value in values:
+        if value not in indices:
+            indices[value] = len(indices)
+    return list(indices), indices
+
+
+def packb(data: Dict[str, Any]) -> bytes:
+    import msgpack  # only needed for the binary formats
+    return msgpack.packb(data, use_bin_type=True)
+
+
+def unpackb(data: bytes, expected_format: str) -> Dict[str, Any]:
+    import msgpack  # only needed for the binary formats
+    try:
+        unpacked = msgpack.unpackb(data, raw=False)
+    except (ValueError, msgpack.UnpackException) as e:
+        raise TopologyFormatException(f'Not valid msgpack: {e}')
+    if not isinstance(unpacked, dict) or unpacked.get(FORMAT_KEY) != expected_format:
+        raise TopologyFormatException(f'Not a {expected_format} file')
+    if unpacked.get(VERSION_KEY) != FORMAT_VERSION:
+        raise TopologyFormatException(f'Unsupported {expected_format} version {unpacked.get(VERSION_KEY)!r}')
+    return unpacked
+
+
+# Nids, programs and groups are each written once in a table and referred to by index. Each node's connections are
+# a slice of one connections column, which starts at the node's offset. Group indices are offset by one, so that zero
+# means no group.
+def encode_unpacked_topology(unpacked_topology: List[Dict[str, Any]],
+                             connection_parameters: Optional[Dict[str, Any]] = None) -> bytes:
+    nids, nid_indices = intern([node[dict_keys.NODE_NID] for node in unpacked_topology])
+    programs, program_indices = intern([node[dict_keys.NODE_PROGRAM] for node in unpacked_topology])
+    groups, group_indices = intern([node[dict_keys.NODE_GROUP] for node in unpacked_topology
+                                    if dict_keys.NODE_GROUP in node])
+    connection_offsets: List[int] = [0]
+    connections: List[int] = []
+    for node in unpacked_topology:
+        connections.extend(nid_indices[peer_nid] for peer_nid in node[dict_keys.NODE_CONNECTIONS])
+        connection_offsets.append(len(connections))
+    encoded: Dict[str, Any] = {
+        FORMAT_KEY: UNPACKED_TOPOLOGY_FORMAT,
+        VERSION_KEY: FORMAT_VERSION,
+        NIDS_KEY: nids,
+        PROGRAMS_KEY: programs,
+        GROUPS_KEY: groups,
+        NODE_PROGRAMS_KEY: pack_uint32s([program_indices[node[dict_keys.NODE_PROGRAM]] for node in unpacked_topology]),
+        NODE_GROUPS_KEY: pack_uint32s([group_indices[node[dict_keys.NODE_GROUP]] + 1 if dict_keys.NODE_GROUP in node
+                                       else 0 for node in unpacked_topology]),
+        NODE_EXTRAS_KEY: [[index, {key: value for key, value in node.items() if key not in UNPACKED_NODE_KEYS}]
+                          for index, node in enumerate(unpacked_topology)
+                          if any(key not in UNPACKED_NODE_KEYS for key in node)],
+        CONNECTION_OFFSETS_KEY: pack_uint32s(connection_offsets),
+        CONNECTIONS_KEY: pack_uint32s(connections)
+    }
+    if connection_parameters is not None:
+        encoded[CONNECTION_PARAMETERS_KEY] = connection_parameters
+    return packb(encoded)
+
+
+# Returns the unpacked topology and, if the file has them, the sparse connection parameters. A node's extras cannot
+# replace the keys held in the columns, such as its nid or connections.
+def decode_unpacked_topology(data: bytes) -> Tuple[List[Dict[str, Any]], Optional[Dict[str, Any]]]:
+    decoded = unpackb(data, UNPACKED_TOPOLOGY_FORMAT)
+    try:
+        nids: List[str] = decoded[NIDS_KEY]
+        programs: List[str] = decoded[PROGRAMS_KEY]
+        groups: List[str] = decoded[GROUPS_KEY]
+        node_programs = unpack_uint32s(decoded[NODE_PROGRAMS_KEY])
+        node_groups = unpack_uint32s(decoded[NODE_GROUPS_KEY])
+        connection_offsets = unpack_uint32s(decoded[CONNECTION_OFFSETS_KEY])
+        connections = unpack_uint32s(decoded[CONNECTIONS_KEY])
+        if any(type(value) != str for table in [nids, programs, groups] for value in table):
+            raise TopologyFormatException('The nid, program and group tables can only hold strings')
+        if not len(node_programs) == len(node_groups) == len(connection_offsets) - 1 == len(nids):
+            raise TopologyFormatException('The node columns have different lengths')
+        unpacked_topology: List[Dict[str, Any]] = []
+        for index, nid in enumerate(nids):
+            node: Dict[str, Any] = {dict_keys.NODE_NID: nid, dict_keys.NODE_PROGRAM: programs[node_programs[index]],
+                                    dict_keys.NODE_CONNECTIONS: [nids[peer_index] for peer_index in connections[
+                                        connection_offsets[index]:connection_offsets[index + 1]]]}
+            if node_groups[index] > 0:
+                node[dict_keys.NODE_GROUP] = groups[node_groups[index] - 1]
+            unpacked_topology.append(node)
+        for index, extras in decoded.get(NODE_EXTRAS_KEY, []):
+            unpacked_topology[index].update({key: value for key, value in extras.items()
+                                             if key not in UNPACKED_NODE_KEYS})
+    except (KeyError, IndexError, TypeError, ValueError, AttributeError) as e:
+        raise TopologyFormatException(f'Malformed {UNPACKED_TOPOLOGY_FORMAT} file: {e!r}')
+    return unpacked_topology, decoded.get(CONNECTION_PARAMETERS_KEY)
+
+
+# Holds what node_addresses.yml and connection_parameters.yml hold. Each distinct set of connection parameters is
+# written once, and each connection refers to its set by index.
+def encode_node_config(node_addresses: List[Dict[str, Any]],
+                       connection_parameters_by_node: Dict[str, Dict[str, Dict[str, Any]]]) -> bytes:
+    nids, nid_indices = intern([node_address[dict_keys.NODE_ADDRESSES_NID] for node_address in node_addresses]
+                               + list(connection_parameters_by_node))
+    parameter_sets: List[Dict[str, Any]] = []
+    parameter_set_indices: Dict[int, int] = {}
+    parameter_set_indices_by_value: Dict[str, int] = {}
+    connection_offsets: List[int] = [0]
+    connections: List[int] = []
+    connection_parameter_sets: List[int] = []
+    for nid in nids:
+        for peer_nid, parameters in connection_parameters_by_node.get(nid, {}).items():
+            # Edges resolving to the same parameters usually share one dict, so most lookups hit the identity cache
+            if id(parameters) not in parameter_set_indices:
+                value_key = repr(sorted(parameters.items()))
+                if value_key not in parameter_set_indices_by_value:
+                    parameter_set_indices_by_value[value_key] = len(parameter_sets)
+                    parameter_sets.append(parameters)
+                parameter_set_indices[id(parameters)] = parameter_set_indices_by_value[value_key]
+            connections.append(nid_indices[peer_nid] if peer_nid in nid_indices else nid_indices.setdefault(
+                peer_nid, len(nid_indices)))
+            connection_parameter_sets.append(parameter_set_indices[id(parameters)])
+        connection_offsets.append(len(connections))
+    addresses_by_nid = {node_address[dict_keys.NODE_ADDRESSES_NID]: node_address for node_address in node_addresses}
+    return packb({
+        FORMAT_KEY: NODE_CONFIG_FORMAT,
+        VERSION_KEY: FORMAT_VERSION,
+        NIDS_KEY: list(nid_indices),
+        IP_ADDRESSES_KEY: b''.join(
+            IPv4Address(addresses_by_nid[nid][dict_keys.NODE_ADDRESSES_IP_ADDRESS]).packed if nid in addresses_by_nid
+            else bytes(4) for nid in nid_indices),
+        PORTS_KEY: pack_uint32s([addresses_by_nid[nid][dict_keys.NODE_ADDRESSES_PORT] if nid in addresses_by_nid
+                                 else 0 for nid in nid_indices]),
+        PARAMETER_SETS_KEY: parameter_sets,
+        CONNECTION_OFFSETS_KEY: pack_uint32s(connection_offsets + [connection_offsets[-1]] * (
+            len(nid_indices) - len(nids))),
+        CONNECTIONS_KEY: pack_uint32s(connections),
+        CONNECTION_PARAMETER_SETS_KEY: pack_uint32s(connection_parameter_sets)
+    })
@@ -0,0 +1,136 @@
+from typing import Dict, Any, Optional, Callable, Set
+from multiprocessing.pool import Pool
+import asyncio
+import multiprocessing
+
+import constants
+import custom_config
+import dict_keys
+import network_topology
+
+topology_pool: Optional[Pool] = None
+save_generation: int = 0
+pending_save: Optional[asyncio.Future] = None
+
+
+class TopologyWorkerDiedException(Exception):
+    pass
+
+
+def get_topology_pool() -> Pool:
+    global topology_pool
+    if topology_pool is None:
+        topology_pool = multiprocessing.Pool(processes=constants.TOPOLOGY_WORKER_PROCESSES)
+    return topology_pool
+
+
+# A worker that is still running cannot be cancelled, so the pool, unlike a ProcessPoolExecutor, is used for its
+# terminate, which stops its workers
+def replace_topology_pool():
+    global topology_pool
+    pool, topology_pool = topology_pool, None
+    if pool is not None:
+        pool.terminate()
+
+
+def get_topology_worker_pids() -> Set[int]:
+    return {process.pid for process in multiprocessing.active_children() if 'PoolWorker' in process.name}
+
+
+# The pool replaces a worker that dies, such as one killed for running out of memory, but loses the job it was running,
+# whose callbacks are then never called. With one worker, the job's worker is the one that was alive when it was
+# submitted.
+async def watch_topology_workers(future: asyncio.Future, worker_pids: Set[int]):
+    while not future.done():
+        await asyncio.sleep(constants.TOPOLOGY_WORKER_LIVENESS_INTERVAL_SECONDS)
+        if not future.done() and not worker_pids <= get_topology_worker_pids():
+            future.set_exception(TopologyWorkerDiedException())
+
+
+# Returns a future on the running loop for the function's result in a worker process, which fails with
+# TopologyWorkerDiedException if a worker dies before the result arrives
+def submit_to_topology_pool(function: Callable, *args) -> asyncio.Future:
+    loop = asyncio.get_running_loop()
+    future: asyncio.Future = loop.create_future()
+    pool: Pool = get_topology_pool()
+
+    def resolve(set_outcome: Callable, outcome):
+        if not future.done():
+            set_outcome(outcome)
+
+    pool.apply_async(
+        function, args, callback=lambda result: loop.call_soon_threadsafe(resolve, future.set_result, result),
+        error_callback=lambda error: loop.call_soon_threadsafe(resolve, future.set_exception, error))
+    loop.create_task(watch_topology_workers(future, get_topology_worker_pids()))
+    return future
+
+
+def make_failed_validation_result(message: str, data=None) -> Dict[str, Any]:
+    return {
+        dict_keys.NETWORK_TOPOLOGY_IS_VALID: False,
+        dict_keys.NETWORK_TOPOLOGY_ERROR_MESSAGE: message,
+        dict_keys.NETWORK_TOPOLOGY_ERROR_DATA: data,
+        dict_keys.NETWORK_TOPOLOGY_ERRORS: [network_topology.make_validation_error(message, data)]
+    }
+
+
+# Runs in a worker process, so it is given everything it needs rather than reading the databases. A valid topology's
+# cached validation result is given to skip parsing it again.
+def validate_and_unpack_raw_topology(language: str, raw: str, is_nodes_self_connected: bool,
+                                     cached_validation_result: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    validation_result: Dict[str, Any] = (cached_validation_result if cached_validation_result is not None
+                                         else network_topology.parse_and_validate_raw_topology(language, raw))
+    if not validation_result[dict_keys.NETWORK_TOPOLOGY_IS_VALID]:
+        return {dict_keys.NETWORK_TOPOLOGY_VALIDATION_RESULT: validation_result}
+    topology: Dict[str, Any] = validation_result[dict_keys.NETWORK_TOPOLOGY_TOPOLOGY]
+    return {
+        dict_keys.NETWORK_TOPOLOGY_VALIDATION_RESULT: validation_result,
+        dict_keys.NETWORK_TOPOLOGY_UNPACKED_TOPOLOGY: network_topology.unpack_topology(topology,
+                                                                                       is_nodes_self_connected),
+        dict_keys.NETWORK_TOPOLOGY_EXPLICITLY_SELF_CONNECTED_NIDS:
+            network_topology.find_explicitly_self_connected_nids(topology)
+    }
+
+
+# Parses, validates and unpacks the raw topology in a worker process, so the loop keeps serving other requests.
+# Topologies already known to be invalid are answered from the validation cache, and those known to be valid are only
+# unpacked, which the worker still does so the unpacked topology, changed in place once saved, is never shared. There
+# is one saved topology, shared by every client, so a save is abandoned, and its worker replaced, if another starts
+# before it finishes, whichever client it comes from, as well as if it runs past the timeout or its worker dies. Its
+# result then has a failed validation result and nothing to save.
+async def validate_and_unpack_raw_topology_in_worker(language: str, raw: str) -> Dict[str, Any]:
+    global save_generation, pending_save
+    cached_validation_result: Optional[Dict[str, Any]] = network_topology.get_cached_validation_result(language, raw)
+    if cached_validation_result is not None and not cached_validation_result[dict_keys.NETWORK_TOPOLOGY_IS_VALID]:
+        return {dict_keys.NETWORK_TOPOLOGY_VALIDATION_RESULT: cached_validation_result}
+    if pending_save is not None:
+        # A worker already running the superseded save cannot be cancelled, and would hold up this one
+        pending_save.cancel()
+        replace_topology_pool()
+    save_generation += 1
+    generation: int = save_generation
+    is_nodes_self_connected: bool = custom_config.get_custom_config()[dict_keys.CUSTOM_CONFIG_SELF_CONNECTED_NODES]
+    save = submit_to_topology_pool(validate_and_unpack_raw_topology, language, raw, is_nodes_self_connected,
+                                   cached_validation_result)
+    pending_save = save
+    try:
+        result: Dict[str, Any] = await asyncio.wait_for(save, constants.TOPOLOGY_SAVE_TIMEOUT_SECONDS)
+    except asyncio.TimeoutError:
+        replace_topology_pool()
+        return {dict_keys.NETWORK_TOPOLOGY_VALIDATION_RESULT: make_failed_validation_result(
+            network_topology.ERROR_MESSAGE_TIMEOUT, constants.TOPOLOGY_SAVE_TIMEOUT_SECONDS)}
+    except TopologyWorkerDiedException:
+        replace_topology_pool()
+        return {dict_keys.NETWORK_TOPOLOGY_VALIDATION_RESULT: make_failed_validation_result(
+            network_topology.ERROR_MESSAGE_WORKER_DIED)}
+    except asyncio.CancelledError:
+        if generation == save_generation:
+            raise
+        return {dict_keys.NETWORK_TOPOLOGY_VALIDATION_RESULT: make_failed_validation_result(
+            network_topology.ERROR_MESSAGE_SUPERSEDED)}
+    finally:
+        if pending_save is save:
+            pending_save = None
+    if cached_validation_result is None:
+        network_topology.cache_validation_result(language, raw, result[dict_keys.NETWORK_TOPOLOGY_VALIDATION_RESULT])
+    return result
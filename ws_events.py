@@ -5,27 +5,46 @@ MODIFY_PROGRAM: str = 'modifyProgram'
 GET_PROGRAMS: str = 'getPrograms'
 GET_RAW_NETWORK_TOPOLOGY: str = 'getRawNetworkTopology'
 GET_UNPACKED_NETWORK_TOPOLOGY: str = 'getUnpackedNetworkTopology'
+GET_UNPACKED_NETWORK_TOPOLOGY_PAGE: str = 'getUnpackedNetworkTopologyPage'
 GET_CONNECTION_PARAMETERS: str = 'getConnectionParameters'
 MODIFY_CONNECTION_PARAMETERS: str = 'modifyConnectionParameters'
+PATCH_CONNECTION_PARAMETERS: str = 'patchConnectionParameters'
+GET_SPARSE_CONNECTION_PARAMETERS: str = 'getSparseConnectionParameters'
+SET_DEFAULT_CONNECTION_PARAMETERS: str = 'setDefaultConnectionParameters'
 SET_CUSTOM_CONFIG: str = 'setCustomConfig'
 GET_CUSTOM_CONFIG: str = 'getCustomConfig'
 SET_UP_SIMULATION: str = 'setUpSimulation'
 STOP_AND_RESET_SIMULATION: str = 'stopAndResetSimulation'
+GET_SIMULATIONS: str = 'getSimulations'
 GET_SIMULATION_STATE: str = 'getSimulationState'
 GET_SIMULATION_NODES: str = 'getSimulationNodes'
 PERFORM_NODE_ACTION: str = 'performNodeAction'
+PERFORM_BULK_NODE_ACTION: str = 'performBulkNodeAction'
 STREAM_NODE_LOGS: str = 'streamNodeLogs'
 GET_CURRENT_SIMULATION_HASH: str = 'getCurrentSimulationHash'
 SET_CURRENT_SIMULATION_HASH: str = 'setCurrentSimulationHash'
+START_WS_EVENT_PROFILING: str = 'startWsEventProfiling'
+GET_WS_EVENT_PROFILES: str = 'getWsEventProfiles'
+PLAN_SIMULATION_RESOURCES: str = 'planSimulationResources'
 
 
 # Send
 PROGRAMS: str = 'programs'
 RAW_NETWORK_TOPOLOGY: str = 'rawNetworkTopology'
 CONNECTION_PARAMETERS: str = 'connectionParameters'
+SPARSE_CONNECTION_PARAMETERS: str = 'sparseConnectionParameters'
 UNPACKED_NETWORK_TOPOLOGY: str = 'unpackedNetworkTopology'
+UNPACKED_NETWORK_TOPOLOGY_PAGE: str = 'unpackedNetworkTopologyPage'
+UNPACKED_NETWORK_TOPOLOGY_SELF_CONNECTIONS: str = 'unpackedNetworkTopologySelfConnections'
 CUSTOM_CONFIG: str = 'customConfig'
+SIMULATIONS: str = 'simulations'
 SIMULATION_STATE: str = 'simulationState'
 SIMULATION_NODES: str = 'simulationNodes'
 SIMULATION_LOGS: str = 'simulationLogs'
+BULK_NODE_ACTION_RESULT: str = 'bulkNodeActionResult'
+CONNECTION_PARAMETERS_PUBLISHED: str = 'connectionParametersPublished'
+CONNECTION_PARAMETERS_PATCHED: str = 'connectionParametersPatched'
 CURRENT_SIMULATION_HASH: str = 'currentSimulationHash'
+WS_EVENT_PROFILES: str = 'wsEventProfiles'
+SIMULATION_RESOURCE_PLAN: str = 'simulationResourcePlan'
+ERROR: str = 'error'
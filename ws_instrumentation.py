@@ -0,0 +1,148 @@
+from typing import Dict, List, Callable, Any, Optional, Collection
+import cProfile
+import inspect
+import io
+import marshal
+import pstats
+import time
+
+import constants
+import dict_keys
+import metrics
+
+ERROR_MESSAGE_UNKNOWN_EVENT = "WS_ERROR_UNKNOWN_EVENT"
+ERROR_MESSAGE_INVALID_INVOCATIONS = "WS_ERROR_INVALID_INVOCATIONS"
+
+
+class ProfilingRequestException(Exception):
+    def __init__(self, message, data=None):
+        self.message = message
+        self.data = data
+
+
+class DispatchRecord:
+    def __init__(self, event: str, bytes_in: int):
+        self.event: str = event
+        self.bytes_in: int = bytes_in
+        self.bytes_out: int = 0
+        self.seconds: float = 0
+        self.blocking_seconds: float = 0
+        self.exception: Optional[Exception] = None
+
+
+# Profiles the next invocations of one event type, accumulating them into a single profile
+class EventProfile:
+    def __init__(self, event: str, invocations: int):
+        self.event: str = event
+        self.remaining_invocations: int = invocations
+        self.completed_invocations: int = 0
+        self.profiler: cProfile.Profile = cProfile.Profile()
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {dict_keys.PROFILING_EVENT: self.event,
+                dict_keys.PROFILING_REMAINING_INVOCATIONS: self.remaining_invocations,
+                dict_keys.PROFILING_COMPLETED_INVOCATIONS: self.completed_invocations}
+
+    def get_stats_text(self) -> str:
+        stats_stream = io.StringIO()
+        pstats.Stats(self.profiler, stream=stats_stream).sort_stats('cumulative').print_stats()
+        return stats_stream.getvalue()
+
+    # In the format written by pstats.Stats.dump_stats, so it can be loaded with pstats or snakeviz
+    def get_stats_dump(self) -> bytes:
+        return marshal.dumps(pstats.Stats(self.profiler).stats)
+
+
+instruments: List[Callable[[DispatchRecord], None]] = []
+profiles: Dict[str, EventProfile] = {}
+
+
+def add_instrument(instrument: Callable[[DispatchRecord], None]):
+    instruments.append(instrument)
+
+
+# Only events that can be dispatched can be profiled, so there is at most one profile for each
+def start_profiling(event: str, invocations: int, events: Collection[str]):
+    if event not in events:
+        raise ProfilingRequestException(ERROR_MESSAGE_UNKNOWN_EVENT, event)
+    if type(invocations) != int or invocations < 1:
+        raise ProfilingRequestException(ERROR_MESSAGE_INVALID_INVOCATIONS, invocations)
+    profiles[event] = EventProfile(event, invocations)
+
+
+def get_profiles() -> List[Dict[str, Any]]:
+    return [profile.to_dict() for profile in profiles.values()]
+
+
+def dispatch(event: str, data, bytes_in: int, handler: Callable, send_func: Callable[[str, Any], int]):
+    record: DispatchRecord = DispatchRecord(event, bytes_in)
+
+    def counting_send_func(send_event: str, send_data):
+        record.bytes_out += send_func(send_event, send_data)
+
+    profile: Optional[EventProfile] = profiles.get(event)
+    if profile and profile.remaining_invocations <= 0:
+        profile = None
+    start: float = time.perf_counter()
+    try:
+        if profile:
+            profile.profiler.enable()
+        try:
+            result = handler(data, counting_send_func)
+        finally:
+            if profile:
+                profile.profiler.disable()
+                profile.remaining_invocations -= 1
+                profile.completed_invocations += 1
+            record.blocking_seconds = time.perf_counter() - start
+    except Exception as e:
+        record.exception = e
+        complete_record(record, start)
+        raise
+    if inspect.isawaitable(result):
+        return complete_record_when_done(result, record, start)
+    complete_record(record, start)
+
+
+def complete_record(record: DispatchRecord, start: float):
+    record.seconds = time.perf_counter() - start
+    for instrument in instruments:
+        instrument(record)
+
+
+# Awaitable handlers are timed until they finish, but only the call that returned the awaitable blocks the loop or is
+# profiled
+async def complete_record_when_done(awaitable, record: DispatchRecord, start: float):
+    try:
+        return await awaitable
+    except Exception as e:
+        record.exception = e
+        raise
+    finally:
+        complete_record(record, start)
+
+
+WS_EVENT_BYTES_IN: metrics.Counter = metrics.register(metrics.Counter(
+    'diorama_ws_event_bytes_in_total', 'Bytes received in each type of WebSocket event', ['event']))
+WS_EVENT_BYTES_OUT: metrics.Counter = metrics.register(metrics.Counter(
+    'diorama_ws_event_bytes_out_total', 'Bytes sent while handling each type of WebSocket event', ['event']))
+WS_EVENT_EXCEPTIONS: metrics.Counter = metrics.register(metrics.Counter(
+    'diorama_ws_event_exceptions_total', 'Exceptions raised handling each type of WebSocket event', ['event']))
+
+
+def record_metrics(record: DispatchRecord):
+    metrics.WS_EVENT_HANDLER_SECONDS.observe(record.seconds, record.event)
+    WS_EVENT_BYTES_IN.inc(record.bytes_in, record.event)
+    WS_EVENT_BYTES_OUT.inc(record.bytes_out, record.event)
+    if record.exception:
+        WS_EVENT_EXCEPTIONS.inc(1, record.event)
+
+
+def warn_if_slow(record: DispatchRecord):
+    if record.blocking_seconds > constants.SLOW_WS_EVENT_WARNING_SECONDS:
+        print(f'WARNING: WebSocket event {record.event} blocked for {record.blocking_seconds:.3f}s '
+              f'({record.bytes_in} bytes in, {record.bytes_out} bytes out)')
+
+
+add_instrument(record_metrics)
+add_instrument(warn_if_slow)